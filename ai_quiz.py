@@ -1,11 +1,53 @@
-import requests
 import csv
 import argparse
+import asyncio
 from datetime import datetime
 import sys
 import re
 import tempfile
 import os
+import json
+import threading
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Annotated, List, Literal
+from pydantic import BaseModel, StringConstraints, ValidationError
+from llm_backends import BACKENDS, LLMBackend, OllamaGenerateBackend, create_backend
+from metrics import registry as metrics, log_event
+
+# A model load slower than this (seconds) is counted as a cold start
+COLD_START_THRESHOLD = 0.5
+
+
+# ============================================================================
+# STRUCTURED OUTPUT SCHEMA
+# ============================================================================
+
+NonEmptyStr = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)]
+
+
+class GeneratedOptions(BaseModel):
+    """The four answer options of a generated question."""
+    A: NonEmptyStr
+    B: NonEmptyStr
+    C: NonEmptyStr
+    D: NonEmptyStr
+
+
+class GeneratedQuestion(BaseModel):
+    """A single multiple choice question returned in structured output mode."""
+    question: NonEmptyStr
+    options: GeneratedOptions
+    answer: Literal['A', 'B', 'C', 'D']
+
+
+class GeneratedQuiz(BaseModel):
+    """Top-level JSON document requested from the model."""
+    questions: List[GeneratedQuestion]
+
+
+QUIZ_JSON_SCHEMA = GeneratedQuiz.model_json_schema()
 
 
 class QuizGenerator:
@@ -16,16 +58,32 @@ class QuizGenerator:
     parsing responses and saving them in CSV format.
     """
     
-    def __init__(self, model: str = "phi3:mini", base_url: str = "http://localhost:11434/api/generate"):
+    def __init__(self, model: str = "phi3:mini", base_url: str = "http://localhost:11434/api/generate",
+                 backend: LLMBackend = None, structured: bool = False, keep_alive=None, scheduler=None):
         """
         Initialize the quiz generator.
         
         Args:
             model (str): Name of the Ollama model to use
-            base_url (str): Base URL for Ollama API
+            base_url (str or list): Base URL for Ollama API; several URLs (a list or
+                comma-separated) are load-balanced by an EndpointPool
+            backend (LLMBackend, optional): Generation backend. Defaults to Ollama /api/generate
+            structured (bool): Request schema-constrained JSON output instead of free text
+            keep_alive (str or int, optional): Ollama keep_alive sent with every request (e.g. "30m")
+            scheduler (GenerationScheduler, optional): Fair queue every backend call waits in
         """
-        self.model = model
-        self.base_url = base_url
+        if backend is None:
+            backend = create_backend(OllamaGenerateBackend.name, model=model, base_url=base_url)
+        self.backend = backend
+        self.model = backend.model
+        self.base_url = backend.base_url or backend.name
+        self.structured = structured
+        self.keep_alive = keep_alive
+        self.scheduler = scheduler
+        self.last_stats = {}
+        self.last_generation = None
+        self._generation = None
+        self._keep_alive_stop = None
 
     def check_ollama_connection(self) -> bool:
         """
@@ -34,11 +92,7 @@ class QuizGenerator:
         Returns:
             bool: True if connection is successful, False otherwise
         """
-        try:
-            response = requests.get(self.base_url.replace("/api/generate", "/api/tags"))
-            return response.status_code == 200
-        except Exception:
-            return False
+        return self.backend.check_connection()
 
     def build_prompt(self, category: str, level: str, num_questions: int) -> str:
         """
@@ -76,12 +130,86 @@ class QuizGenerator:
     """
         return template.strip()
 
-    def call_api(self, prompt: str) -> str:
+    def build_batch_prompt(self, categories_requests: list) -> str:
         """
-        Make API call to Ollama and return the complete text response.
+        Build a single prompt covering several categories at once.
+        
+        Each (category, level, num_questions) request becomes a numbered
+        section, and the model is asked to tag its output per section so
+        that `parse_batch_questions` can route questions back.
+        
+        Args:
+            categories_requests (list): List of tuples (category, level, num_questions)
+            
+        Returns:
+            str: Formatted prompt to send to AI
+        """
+        total_questions = sum(num_questions for _, _, num_questions in categories_requests)
+        sections = "\n".join(
+            f'    [SECTION {i}] {num_questions} questions about "{category}" appropriate for "{level}" level'
+            for i, (category, level, num_questions) in enumerate(categories_requests, start=1)
+        )
+        
+        template = f"""
+    Generate multiple choice questions for each of the following sections ({total_questions} questions in total):
+
+{sections}
+
+    Start every section with its tag on its own line, then its questions.
+    Format EXACTLY like this example:
+    ### SECTION 1
+    Question: [Insert your question here]
+    A) [First option]
+    B) [Second option]
+    C) [Third option]
+    D) [Fourth option]
+    Answer: [Correct letter A, B, C, or D]
+
+    Rules:
+    - Generate exactly the requested number of questions for each section
+    - Questions in a section must only cover that section's topic and level
+    - Each question must have exactly 4 options labeled A), B), C), D)
+    - Provide the correct answer as A, B, C, or D
+    - Each question should be separated by a blank line
+
+    Generate all sections now:
+    """
+        return template.strip()
+
+    def build_json_prompt(self, category: str, level: str, num_questions: int) -> str:
+        """
+        Build the prompt used in structured (JSON) output mode.
+        
+        Args:
+            category (str): Quiz category (e.g., "Mathematics")
+            level (str): Difficulty level (e.g., "Elementary", "High School")
+            num_questions (int): Exact number of questions to generate
+            
+        Returns:
+            str: Formatted prompt to send to AI
+        """
+        template = f"""
+    Generate exactly {num_questions} multiple choice questions about "{category}" appropriate for "{level}" level.
+
+    Respond ONLY with a JSON object in this exact structure:
+    {{"questions": [{{"question": "...", "options": {{"A": "...", "B": "...", "C": "...", "D": "..."}}, "answer": "A"}}]}}
+
+    Rules:
+    - The "questions" list must contain exactly {num_questions} items
+    - "answer" is the letter (A, B, C, or D) of the correct option
+    - Questions should be appropriate for {level} level
+    - Focus only on {category} topics
+    """
+        return template.strip()
+
+    def call_api(self, prompt: str, format=None, questions: int = 1) -> str:
+        """
+        Make API call to the configured backend and return the complete text response.
         
         Args:
             prompt (str): The prompt to send to the AI model
+            format (str or dict, optional): "json" or a JSON schema to constrain the output
+            questions (int): Questions the prompt asks for (the call's cost in the scheduler)
             
         Returns:
             str: Generated text response from AI
@@ -90,24 +218,189 @@ class QuizGenerator:
             ConnectionError: If unable to connect to Ollama
             ValueError: If response format is invalid
         """
-        payload = {
-            "model": self.model,
-            "prompt": prompt,
-            "stream": False
+        options = self._api_options(format)
+        with self.scheduler.slot(questions) if self.scheduler else nullcontext():
+            started = time.perf_counter()
+            try:
+                result = self.backend.generate(prompt, **options)
+            finally:
+                self._record_call(started)
+        return self._handle_result(result)
+
+    def _api_options(self, format=None) -> dict:
+        """Build the backend options for one call."""
+        options = {}
+        if format:
+            options['format'] = format
+        if self.keep_alive is not None and self.backend.supports_keep_alive:
+            options['keep_alive'] = self.keep_alive
+        return options
+
+    def _record_call(self, started: float) -> None:
+        """Record the HTTP time and the attempt of one backend call."""
+        http_seconds = time.perf_counter() - started
+        metrics.observe('ai_http_request_seconds', http_seconds, backend=self.backend.name)
+        self._count('attempts')
+        self._count('http_seconds', http_seconds)
+
+    def _handle_result(self, result: dict) -> str:
+        """Record the backend statistics and return the generated text."""
+        self.last_stats = result.get('stats', {})
+        self._record_latency(self.last_stats)
+        return result.get('response', '')
+
+    def _record_latency(self, stats: dict) -> None:
+        """
+        Record model load time separately from generation time.
+        
+        Args:
+            stats (dict): Backend statistics with durations in seconds
+        """
+        labels = {'backend': self.backend.name}
+        load_duration = stats.get('load_duration')
+        if load_duration is not None:
+            metrics.observe('ai_model_load_seconds', load_duration, **labels)
+            if load_duration >= COLD_START_THRESHOLD:
+                metrics.inc('ai_cold_starts_total', **labels)
+        
+        generation_duration = (stats.get('prompt_eval_duration') or 0) + (stats.get('eval_duration') or 0)
+        if generation_duration:
+            metrics.observe('ai_generation_seconds', generation_duration, **labels)
+        
+        # Decode throughput from the backend's own token counts
+        eval_count = stats.get('eval_count')
+        eval_duration = stats.get('eval_duration')
+        if eval_count:
+            metrics.inc('ai_eval_tokens_total', eval_count, **labels)
+            self._count('eval_count', eval_count)
+            if eval_duration:
+                metrics.observe('ai_tokens_per_second', eval_count / eval_duration, **labels)
+                self._count('eval_seconds', eval_duration)
+
+    def _count(self, key: str, value=1) -> None:
+        """Add to a field of the generation record in progress, if any."""
+        if self._generation is not None:
+            self._generation[key] += value
+
+    def _begin_generation(self, mode: str, requested: int) -> bool:
+        """
+        Start a per-generation record unless one is already in progress.
+        
+        Args:
+            mode (str): "text", "json" or "batch"
+            requested (int): Number of questions requested
+            
+        Returns:
+            bool: True if this call owns the record and must finish it
+        """
+        if self._generation is not None:
+            return False
+        self._generation = {
+            'mode': mode, 'requested': requested, 'started': time.perf_counter(),
+            'attempts': 0, 'http_seconds': 0.0, 'parse_seconds': 0.0,
+            'eval_count': 0, 'eval_seconds': 0.0,
+            'candidates': 0, 'valid': 0, 'duplicates': 0
         }
-        headers = {"Content-Type": "application/json"}
+        return True
+
+    def _finish_generation(self, produced: int, error: Exception = None) -> dict:
+        """
+        Close the generation record, update metrics and emit a JSON log line.
         
-        try:
-            response = requests.post(self.base_url, headers=headers, json=payload, timeout=60)
-            response.raise_for_status()
+        Args:
+            produced (int): Number of questions returned to the caller
+            error (Exception, optional): Error that aborted the generation
             
-            response_data = response.json()
-            return response_data.get("response", "")
+        Returns:
+            dict: The finished generation record
+        """
+        record, self._generation = self._generation, None
+        total_seconds = time.perf_counter() - record.pop('started')
+        eval_seconds = record.pop('eval_seconds')
+        
+        record.update({
+            'backend': self.backend.name,
+            'model': self.model,
+            'produced': produced,
+            'invalid': max(record['candidates'] - record['valid'], 0),
+            'retries': max(record['attempts'] - 1, 0),
+            'total_seconds': round(total_seconds, 4),
+            'http_seconds': round(record['http_seconds'], 4),
+            'parse_seconds': round(record['parse_seconds'], 4),
+            'tokens_per_second': round(record['eval_count'] / eval_seconds, 2) if eval_seconds else None,
+            'error': str(error) if error else None
+        })
+        
+        labels = {'backend': self.backend.name, 'mode': record['mode']}
+        metrics.inc('ai_generations_total', **labels)
+        if error:
+            metrics.inc('ai_generation_errors_total', **labels)
+        metrics.observe('ai_generation_total_seconds', total_seconds, **labels)
+        metrics.observe('ai_parse_seconds', record['parse_seconds'], **labels)
+        metrics.observe('ai_generation_attempts', record['attempts'], **labels)
+        metrics.inc('ai_retries_total', record['retries'], **labels)
+        metrics.inc('ai_questions_valid_total', record['valid'], **labels)
+        metrics.inc('ai_questions_invalid_total', record['invalid'], **labels)
+        metrics.inc('ai_questions_duplicate_total', record['duplicates'], **labels)
+        
+        log_event('ai_generation', **record)
+        self.last_generation = record
+        return record
+
+    def warm_up(self) -> dict:
+        """
+        Load the model ahead of the first teacher request.
+        
+        Returns:
+            dict: Backend statistics; 'load_duration' is the cold-load cost paid
+            
+        Raises:
+            ConnectionError: If unable to connect to the backend
+        """
+        stats = self.backend.warm_up(self.keep_alive)
+        metrics.inc('ai_warmups_total', backend=self.backend.name)
+        self._record_latency(stats)
+        return stats
+
+    def start_keep_alive(self, interval: float, warm_now: bool = True) -> threading.Thread:
+        """
+        Warm the model now and then every `interval` seconds in a daemon thread.
+        
+        Args:
+            interval (float): Seconds between warm-up calls; should be shorter than keep_alive
+            warm_now (bool): Run the first warm-up immediately
             
-        except requests.exceptions.RequestException as e:
-            raise ConnectionError(f"Error connecting to Ollama: {e}")
+        Returns:
+            threading.Thread: The background thread
+        """
+        self.stop_keep_alive()
+        stop_event = threading.Event()
+        self._keep_alive_stop = stop_event
+        
+        def run():
+            if warm_now:
+                self.try_warm_up()
+            while not stop_event.wait(interval):
+                self.try_warm_up()
+        
+        thread = threading.Thread(target=run, name='ai-keep-alive', daemon=True)
+        thread.start()
+        return thread
+
+    def stop_keep_alive(self) -> None:
+        """Stop the background keep-alive thread if one is running."""
+        if self._keep_alive_stop is not None:
+            self._keep_alive_stop.set()
+            self._keep_alive_stop = None
+
+    def try_warm_up(self) -> None:
+        """Warm up without letting backend errors escape the background thread."""
+        try:
+            stats = self.warm_up()
+            print(f"🔥 Model {self.model} warm (load {stats.get('load_duration', 0):.2f}s)")
         except Exception as e:
-            raise ValueError(f"Invalid response from Ollama: {e}")
+            metrics.inc('ai_warmup_failures_total', backend=self.backend.name)
+            print(f"⚠️  Model warm-up failed: {e}")
 
     def parse_questions(self, raw_text: str) -> list:
         """
@@ -123,6 +416,7 @@ class QuizGenerator:
         
         # Split text into sections by double newlines or question patterns
         sections = re.split(r'\n\s*\n|\n(?=Question:)', raw_text)
+        self._count('candidates', sum(1 for section in sections if 'Question:' in section))
         
         for section in sections:
             section = section.strip()
@@ -182,6 +476,81 @@ class QuizGenerator:
         
         return questions
 
+    def parse_questions_json(self, raw_text: str) -> list:
+        """
+        Parse questions from a structured (JSON) response.
+        
+        Items are validated one by one against GeneratedQuestion so a single
+        bad item does not discard the rest. If the response is not JSON at
+        all, the free-text parser is used as a fallback.
+        
+        Args:
+            raw_text (str): Raw JSON response from AI
+            
+        Returns:
+            list: List of dictionaries in the same shape as `parse_questions`
+        """
+        try:
+            document = json.loads(raw_text)
+        except (json.JSONDecodeError, TypeError):
+            return self.parse_questions(raw_text or '')
+        
+        # Accept both {"questions": [...]} and a bare list
+        items = document.get('questions', []) if isinstance(document, dict) else document
+        if not isinstance(items, list):
+            return []
+        self._count('candidates', len(items))
+        
+        questions = []
+        for item in items:
+            try:
+                parsed = GeneratedQuestion.model_validate(item)
+            except ValidationError:
+                continue
+            
+            options = parsed.options
+            questions.append({
+                'question': parsed.question,
+                'option_a': options.A,
+                'option_b': options.B,
+                'option_c': options.C,
+                'option_d': options.D,
+                'correct_answer': getattr(options, parsed.answer),
+                'answer_letter': parsed.answer
+            })
+        
+        return questions
+
+    def parse_batch_questions(self, raw_text: str, categories_requests: list) -> list:
+        """
+        Parse a batched response and route questions back to their sections.
+        
+        Args:
+            raw_text (str): Raw text response from AI produced by a batch prompt
+            categories_requests (list): The (category, level, num_questions) tuples
+                used to build the prompt, in the same order
+            
+        Returns:
+            list: One list of validated questions per request, or None if the
+                response carries no section tags at all
+        """
+        parts = re.split(r'^\s*#*\s*\[?SECTION\s+(\d+)\]?\s*$', raw_text, flags=re.MULTILINE | re.IGNORECASE)
+        if len(parts) < 3:
+            return None
+        
+        routed = [[] for _ in categories_requests]
+        
+        # re.split yields [preamble, number, body, number, body, ...]
+        for number, body in zip(parts[1::2], parts[2::2]):
+            index = int(number) - 1
+            if not 0 <= index < len(categories_requests):
+                continue
+            category, level, _ = categories_requests[index]
+            questions = self.validate_questions(self.parse_questions(body), category, level)
+            routed[index].extend(questions)
+        
+        return routed
+
     def validate_questions(self, questions: list, category: str, level: str) -> list:
         """
         Validate and clean the questions list, adding metadata.
@@ -211,9 +580,11 @@ class QuizGenerator:
             
             validated.append(question)
         
+        self._count('valid', len(validated))
         return validated
 
-    def generate_quiz(self, num_questions: int, category: str, level: str, max_attempts: int = 3) -> list:
+    def generate_quiz(self, num_questions: int, category: str, level: str, max_attempts: int = 3,
+                      structured: bool = None) -> list:
         """
         Generate the requested number of questions with retry logic.
         
@@ -222,6 +593,7 @@ class QuizGenerator:
             category (str): Subject category for questions
             level (str): Difficulty level
             max_attempts (int): Maximum number of attempts if generation fails
+            structured (bool, optional): Override the generator's structured output mode
             
         Returns:
             list: List of generated and validated questions
@@ -233,38 +605,217 @@ class QuizGenerator:
         if not self.check_ollama_connection():
             raise ConnectionError("❌ Could not connect to Ollama at: " + self.base_url)
 
+        return self._collect_generation(num_questions, category, level, max_attempts, structured,
+                                        self._generate_with_retries)
+
+    def _collect_generation(self, num_questions: int, category: str, level: str, max_attempts: int,
+                            structured: bool, run) -> list:
+        """
+        Run a generation loop inside a generation record.
+        
+        Args:
+            run (callable): Loop filling the accumulated list, e.g. `_generate_with_retries`
+            
+        Returns:
+            list: Up to `num_questions` questions
+        """
+        if structured is None:
+            structured = self.structured
+
+        owns_record = self._begin_generation('json' if structured else 'text', num_questions)
         accumulated_questions = []
+        try:
+            run(accumulated_questions, num_questions, category, level, max_attempts, structured)
+        except Exception as e:
+            if owns_record:
+                self._finish_generation(len(accumulated_questions), error=e)
+            raise
+        return self._close_generation(accumulated_questions, num_questions, owns_record)
+
+    def _close_generation(self, accumulated_questions: list, num_questions: int, owns_record: bool) -> list:
+        """Warn about short results, finish the record and trim the list."""
+        # Warning if we couldn't generate enough questions
+        if len(accumulated_questions) < num_questions:
+            print(f"⚠️  Warning: only {len(accumulated_questions)} questions generated out of {num_questions} requested.")
+        
+        if owns_record:
+            self._finish_generation(len(accumulated_questions))
+        return accumulated_questions[:num_questions]
+
+    def _generate_with_retries(self, accumulated_questions: list, num_questions: int, category: str,
+                               level: str, max_attempts: int, structured: bool) -> None:
+        """
+        Call the model until enough unique questions are collected or attempts run out.
+        
+        Args:
+            accumulated_questions (list): Questions collected so far (modified in place)
+            num_questions (int): Number of questions to generate
+            category (str): Subject category for questions
+            level (str): Difficulty level
+            max_attempts (int): Maximum number of attempts
+            structured (bool): Use structured JSON output
+        """
         attempts = 0
         
         # Retry logic to ensure we get the requested number of questions
         while len(accumulated_questions) < num_questions and attempts < max_attempts:
             attempts += 1
-            missing_questions = num_questions - len(accumulated_questions)
+            prompt, output_format = self._next_attempt(accumulated_questions, num_questions, category,
+                                                       level, attempts, structured)
+            raw_response = self.call_api(prompt, format=output_format,
+                                         questions=num_questions - len(accumulated_questions))
+            self._absorb_response(raw_response, accumulated_questions, num_questions, category, level, structured)
+
+    def _next_attempt(self, accumulated_questions: list, num_questions: int, category: str, level: str,
+                      attempts: int, structured: bool) -> tuple:
+        """
+        Print progress and build the prompt for the missing questions.
+        
+        Returns:
+            tuple: (prompt, output format or None)
+        """
+        missing_questions = num_questions - len(accumulated_questions)
+        
+        # Progress messaging
+        if attempts == 1:
+            print(f"🔍 Generating {num_questions} questions about '{category}' at '{level}' level...")
+        else:
+            print(f"⚠️  Only {len(accumulated_questions)} questions generated. Requesting {missing_questions} more (attempt {attempts})...")
+        
+        if structured:
+            return self.build_json_prompt(category, level, missing_questions), QUIZ_JSON_SCHEMA
+        return self.build_prompt(category, level, missing_questions), None
+
+    def _absorb_response(self, raw_response: str, accumulated_questions: list, num_questions: int,
+                         category: str, level: str, structured: bool) -> None:
+        """Parse and validate one response and add its unique questions."""
+        parse_started = time.perf_counter()
+        if structured:
+            new_questions = self.parse_questions_json(raw_response)
+        else:
+            new_questions = self.parse_questions(raw_response)
+        validated_questions = self.validate_questions(new_questions, category, level)
+        self._count('parse_seconds', time.perf_counter() - parse_started)
+        
+        # Add only unique questions to avoid duplicates
+        self._add_unique(accumulated_questions, validated_questions, num_questions)
+
+    def generate_batch(self, categories_requests: list, max_attempts: int = 3) -> list:
+        """
+        Generate questions for several categories in a single inference pass.
+        
+        Sections that come back short are topped up with per-category calls,
+        and if the response cannot be routed at all every category falls back
+        to `generate_quiz`.
+        
+        Args:
+            categories_requests (list): List of tuples (category, level, num_questions)
+            max_attempts (int): Maximum attempts for per-category fallback calls
             
-            # Progress messaging
-            if attempts == 1:
-                print(f"🔍 Generating {num_questions} questions about '{category}' at '{level}' level...")
-            else:
-                print(f"⚠️  Only {len(accumulated_questions)} questions generated. Requesting {missing_questions} more (attempt {attempts})...")
+        Returns:
+            list: Generated questions for all categories, in request order
             
-            # Generate new questions
-            prompt = self.build_prompt(category, level, missing_questions)
-            raw_response = self.call_api(prompt)
-            new_questions = self.parse_questions(raw_response)
-            validated_questions = self.validate_questions(new_questions, category, level)
+        Raises:
+            ConnectionError: If unable to connect to Ollama
+        """
+        if not self.check_ollama_connection():
+            raise ConnectionError("❌ Could not connect to Ollama at: " + self.base_url)
+        
+        total_questions = sum(num_questions for _, _, num_questions in categories_requests)
+        print(f"🔍 Generating {total_questions} questions for {len(categories_requests)} categories in one batch...")
+        
+        self._begin_generation('batch', total_questions)
+        all_questions = []
+        try:
+            self._generate_batch_sections(all_questions, categories_requests, max_attempts)
+        except Exception as e:
+            self._finish_generation(len(all_questions), error=e)
+            raise
+        
+        self._finish_generation(len(all_questions))
+        return all_questions
+
+    def _generate_batch_sections(self, all_questions: list, categories_requests: list, max_attempts: int) -> None:
+        """
+        Run the batch prompt and top up each section, appending to `all_questions`.
+        
+        Args:
+            all_questions (list): Output list (modified in place)
+            categories_requests (list): List of tuples (category, level, num_questions)
+            max_attempts (int): Maximum attempts for per-category fallback calls
+        """
+        try:
+            raw_response = self.call_api(self.build_batch_prompt(categories_requests),
+                                         questions=sum(n for _, _, n in categories_requests))
+            routed = self._route_batch_response(raw_response, categories_requests)
+        except ValueError as e:
+            print(f"⚠️  Batch generation failed: {e}")
+            routed = None
+        
+        for (category, level, num_questions), section_questions in self._batch_sections(categories_requests, routed):
+            # Top up short sections with per-category calls
+            missing_questions = num_questions - len(section_questions)
+            if missing_questions > 0:
+                extra_questions = self.generate_quiz(missing_questions, category, level, max_attempts)
+                self._add_unique(section_questions, extra_questions, num_questions)
             
-            # Add only unique questions to avoid duplicates
-            for question in validated_questions:
-                if len(accumulated_questions) >= num_questions:
-                    break
-                if not any(question['question'].lower() == existing['question'].lower() for existing in accumulated_questions):
-                    accumulated_questions.append(question)
+            all_questions.extend(section_questions)
+
+    def _route_batch_response(self, raw_response: str, categories_requests: list) -> list:
+        """Parse a batch response, timing the parse (see `parse_batch_questions`)."""
+        parse_started = time.perf_counter()
+        routed = self.parse_batch_questions(raw_response, categories_requests)
+        self._count('parse_seconds', time.perf_counter() - parse_started)
+        return routed
+
+    def _batch_sections(self, categories_requests: list, routed: list) -> list:
+        """
+        Pair each request with its unique batch questions.
         
-        # Warning if we couldn't generate enough questions
-        if len(accumulated_questions) < num_questions:
-            print(f"⚠️  Warning: only {len(accumulated_questions)} questions generated out of {num_questions} requested.")
+        Args:
+            categories_requests (list): List of tuples (category, level, num_questions)
+            routed (list): Result of `parse_batch_questions`, or None if unusable
+            
+        Returns:
+            list: [((category, level, num_questions), questions)] in request order
+        """
+        if routed is None:
+            print("⚠️  Batch response could not be parsed. Falling back to per-category generation...")
+            routed = [[] for _ in categories_requests]
         
-        return accumulated_questions[:num_questions]
+        sections = []
+        for request_tuple, batch_questions in zip(categories_requests, routed):
+            section_questions = []
+            self._add_unique(section_questions, batch_questions, request_tuple[2])
+            sections.append((request_tuple, section_questions))
+        return sections
+
+    def _add_unique(self, accumulated: list, new_questions: list, limit: int) -> int:
+        """
+        Append questions whose text is not already present, up to a limit.
+        
+        Args:
+            accumulated (list): Questions collected so far (modified in place)
+            new_questions (list): Candidate questions to add
+            limit (int): Maximum size of the accumulated list
+            
+        Returns:
+            int: Number of duplicates skipped
+        """
+        seen = {existing['question'].lower() for existing in accumulated}
+        duplicates = 0
+        for question in new_questions:
+            if len(accumulated) >= limit:
+                break
+            key = question['question'].lower()
+            if key in seen:
+                duplicates += 1
+                continue
+            seen.add(key)
+            accumulated.append(question)
+        
+        self._count('duplicates', duplicates)
+        return duplicates
 
     def save_quiz_csv(self, questions: list, filename: str = None) -> str:
         """
@@ -298,12 +849,13 @@ class QuizGenerator:
         print(f"✅ Quiz saved to: {filename}")
         return filename
 
-    def generate_and_save_temp_csv(self, categories_requests: list) -> str:
+    def generate_and_save_temp_csv(self, categories_requests: list, batched: bool = False) -> str:
         """
         Generate questions for multiple categories and save to a temporary CSV file.
         
         Args:
             categories_requests (list): List of tuples (category, level, num_questions)
+            batched (bool): Generate all categories with a single batch prompt
             
         Returns:
             str: Path to the temporary CSV file
@@ -313,12 +865,20 @@ class QuizGenerator:
         """
         all_questions = []
         
-        # Generate questions for each requested category
-        for category, level, num_questions in categories_requests:
-            print(f"🔍 Generating {num_questions} questions for {category} at {level} level...")
-            questions = self.generate_quiz(num_questions, category, level)
-            all_questions.extend(questions)
+        if batched and len(categories_requests) > 1:
+            # One inference pass for every category
+            all_questions = self.generate_batch(categories_requests)
+        else:
+            # Generate questions for each requested category
+            for category, level, num_questions in categories_requests:
+                print(f"🔍 Generating {num_questions} questions for {category} at {level} level...")
+                questions = self.generate_quiz(num_questions, category, level)
+                all_questions.extend(questions)
         
+        return self._write_temp_csv(all_questions)
+
+    def _write_temp_csv(self, all_questions: list) -> str:
+        """Write generated questions to a temporary CSV file and return its path."""
         # Create temporary file for CSV output
         temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.csv', encoding='utf-8')
         temp_path = temp_file.name
@@ -339,6 +899,244 @@ class QuizGenerator:
         return temp_path
 
 
+class AsyncQuizGenerator(QuizGenerator):
+    """
+    asyncio variant of QuizGenerator for async views or an ASGI sidecar.
+    
+    Backend calls go through `LLMBackend.agenerate` (non-blocking httpx
+    requests for the HTTP backends), so one event loop can keep many
+    generations in flight instead of blocking a WSGI thread per teacher.
+    Prompt building, parsing and validation are shared with QuizGenerator.
+    
+    The per-generation record lives in a context variable, so concurrent
+    tasks sharing one generator keep separate statistics.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        self._generation_var = ContextVar(f'ai_generation_{id(self)}', default=None)
+        super().__init__(*args, **kwargs)
+
+    @property
+    def _generation(self):
+        return self._generation_var.get()
+
+    @_generation.setter
+    def _generation(self, record):
+        self._generation_var.set(record)
+
+    async def check_ollama_connection(self) -> bool:
+        """
+        Check if the backend is reachable without blocking the event loop.
+        
+        Returns:
+            bool: True if connection is successful, False otherwise
+        """
+        return await self.backend.acheck_connection()
+
+    async def call_api(self, prompt: str, format=None, questions: int = 1) -> str:
+        """
+        Async variant of `QuizGenerator.call_api`.
+        
+        The thread-based GenerationScheduler is not used here; the event
+        loop caps concurrency itself.
+        
+        Args:
+            prompt (str): The prompt to send to the AI model
+            format (str or dict, optional): "json" or a JSON schema to constrain the output
+            questions (int): Questions the prompt asks for (kept for signature parity)
+            
+        Returns:
+            str: Generated text response from AI
+            
+        Raises:
+            ConnectionError: If unable to connect to the backend
+            ValueError: If response format is invalid
+        """
+        options = self._api_options(format)
+        started = time.perf_counter()
+        try:
+            result = await self.backend.agenerate(prompt, **options)
+        finally:
+            self._record_call(started)
+        return self._handle_result(result)
+
+    async def generate_quiz(self, num_questions: int, category: str, level: str, max_attempts: int = 3,
+                            structured: bool = None) -> list:
+        """
+        Async variant of `QuizGenerator.generate_quiz`.
+        
+        Args:
+            num_questions (int): Number of questions to generate
+            category (str): Subject category for questions
+            level (str): Difficulty level
+            max_attempts (int): Maximum number of attempts if generation fails
+            structured (bool, optional): Override the generator's structured output mode
+            
+        Returns:
+            list: List of generated and validated questions
+            
+        Raises:
+            ConnectionError: If unable to connect to the backend
+        """
+        if not await self.check_ollama_connection():
+            raise ConnectionError("❌ Could not connect to Ollama at: " + self.base_url)
+
+        if structured is None:
+            structured = self.structured
+
+        owns_record = self._begin_generation('json' if structured else 'text', num_questions)
+        accumulated_questions = []
+        try:
+            attempts = 0
+            while len(accumulated_questions) < num_questions and attempts < max_attempts:
+                attempts += 1
+                prompt, output_format = self._next_attempt(accumulated_questions, num_questions, category,
+                                                           level, attempts, structured)
+                raw_response = await self.call_api(prompt, format=output_format)
+                self._absorb_response(raw_response, accumulated_questions, num_questions, category, level,
+                                      structured)
+        except Exception as e:
+            if owns_record:
+                self._finish_generation(len(accumulated_questions), error=e)
+            raise
+        return self._close_generation(accumulated_questions, num_questions, owns_record)
+
+    async def generate_batch(self, categories_requests: list, max_attempts: int = 3) -> list:
+        """
+        Async variant of `QuizGenerator.generate_batch`; short sections are
+        topped up concurrently.
+        
+        Args:
+            categories_requests (list): List of tuples (category, level, num_questions)
+            max_attempts (int): Maximum attempts for per-category fallback calls
+            
+        Returns:
+            list: Generated questions for all categories, in request order
+            
+        Raises:
+            ConnectionError: If unable to connect to the backend
+        """
+        if not await self.check_ollama_connection():
+            raise ConnectionError("❌ Could not connect to Ollama at: " + self.base_url)
+        
+        total_questions = sum(num_questions for _, _, num_questions in categories_requests)
+        print(f"🔍 Generating {total_questions} questions for {len(categories_requests)} categories in one batch...")
+        
+        self._begin_generation('batch', total_questions)
+        all_questions = []
+        try:
+            try:
+                raw_response = await self.call_api(self.build_batch_prompt(categories_requests))
+                routed = self._route_batch_response(raw_response, categories_requests)
+            except ValueError as e:
+                print(f"⚠️  Batch generation failed: {e}")
+                routed = None
+            
+            sections = self._batch_sections(categories_requests, routed)
+            top_ups = await asyncio.gather(*(
+                self._top_up(section_questions, category, level, num_questions, max_attempts)
+                for (category, level, num_questions), section_questions in sections
+            ))
+            for section_questions in top_ups:
+                all_questions.extend(section_questions)
+        except Exception as e:
+            self._finish_generation(len(all_questions), error=e)
+            raise
+        
+        self._finish_generation(len(all_questions))
+        return all_questions
+
+    async def _top_up(self, section_questions: list, category: str, level: str, num_questions: int,
+                      max_attempts: int) -> list:
+        """Fill a short batch section with a per-category generation."""
+        missing_questions = num_questions - len(section_questions)
+        if missing_questions > 0:
+            extra_questions = await self.generate_quiz(missing_questions, category, level, max_attempts)
+            self._add_unique(section_questions, extra_questions, num_questions)
+        return section_questions
+
+    async def generate_many(self, categories_requests: list, max_attempts: int = 3) -> list:
+        """
+        Generate every category concurrently, one request per category.
+        
+        Args:
+            categories_requests (list): List of tuples (category, level, num_questions)
+            max_attempts (int): Maximum attempts per category
+            
+        Returns:
+            list: Generated questions for all categories, in request order
+        """
+        results = await asyncio.gather(*(
+            self.generate_quiz(num_questions, category, level, max_attempts)
+            for category, level, num_questions in categories_requests
+        ))
+        return [question for questions in results for question in questions]
+
+    async def generate_and_save_temp_csv(self, categories_requests: list, batched: bool = False) -> str:
+        """
+        Async variant of `QuizGenerator.generate_and_save_temp_csv`.
+        
+        Args:
+            categories_requests (list): List of tuples (category, level, num_questions)
+            batched (bool): Generate all categories with a single batch prompt
+            
+        Returns:
+            str: Path to the temporary CSV file
+        """
+        if batched and len(categories_requests) > 1:
+            all_questions = await self.generate_batch(categories_requests)
+        else:
+            all_questions = await self.generate_many(categories_requests)
+        return self._write_temp_csv(all_questions)
+
+    async def aclose(self) -> None:
+        """Close the backend's async HTTP connections."""
+        await self.backend.aclose()
+
+
+def backend_from_config(config) -> LLMBackend:
+    """
+    Build the backend selected in an application configuration.
+    
+    Args:
+        config (Mapping): Configuration with the AI_* settings (see config.Config)
+        
+    Returns:
+        LLMBackend: Configured backend; an EndpointPool for several AI_BASE_URL entries
+    """
+    options = {
+        'model': config.get('AI_MODEL'),
+        'base_url': config.get('AI_BASE_URL')
+    }
+    if config.get('AI_BACKEND') == 'openai':
+        options['api_key'] = config.get('AI_API_KEY')
+    options['max_failures'] = config.get('AI_POOL_MAX_FAILURES')
+    options['eject_seconds'] = config.get('AI_POOL_EJECT_SECONDS')
+    return create_backend(config.get('AI_BACKEND', 'ollama'), **options)
+
+
+def generator_from_config(config, generator_class=QuizGenerator, backend=None) -> QuizGenerator:
+    """
+    Build a generator for the backend selected in an application configuration.
+    
+    Args:
+        config (Mapping): Configuration with the AI_* settings (see config.Config)
+        generator_class (type): QuizGenerator or AsyncQuizGenerator
+        backend (LLMBackend, optional): Backend to share, e.g. between requests so an
+            EndpointPool keeps its load and health state. Defaults to a new one
+        
+    Returns:
+        QuizGenerator: Generator bound to the configured AI backend
+    """
+    if backend is None:
+        backend = backend_from_config(config)
+    return generator_class(
+        backend=backend,
+        structured=config.get('AI_STRUCTURED_OUTPUT', False),
+        keep_alive=config.get('AI_KEEP_ALIVE')
+    )
+
+
 def main():
     """
     Command-line interface for the quiz generator.
@@ -355,6 +1153,16 @@ def main():
                         choices=["Elementary", "Middle School", "High School"],
                         default="Elementary",
                         help="Difficulty level: Elementary, Middle School or High School (default: Elementary)")
+    parser.add_argument("-b", "--backend",
+                        choices=sorted(BACKENDS),
+                        default="ollama",
+                        help="Generation backend (default: ollama)")
+    parser.add_argument("-m", "--model", default="phi3:mini",
+                        help="Model name (default: phi3:mini)")
+    parser.add_argument("-u", "--url",
+                        help="Backend server URL, or comma-separated URLs to load-balance (default depends on backend)")
+    parser.add_argument("--json", action="store_true",
+                        help="Use structured JSON output instead of free text")
     parser.add_argument("-o", "--output",
                         help="Output filename (e.g.: my_quiz.csv). If not specified, timestamp will be used.")
 
@@ -362,7 +1170,8 @@ def main():
 
     try:
         # Initialize generator and create quiz
-        generator = QuizGenerator()
+        generator = QuizGenerator(backend=create_backend(args.backend, model=args.model, base_url=args.url),
+                                  structured=args.json)
         questions = generator.generate_quiz(args.questions, args.category, args.level)
 
         if questions:
@@ -0,0 +1,416 @@
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from metrics import registry as metrics, log_event
+
+# Generation request admitted for the current thread (set by GenerationScheduler.admit)
+_current_request = ContextVar('ai_current_request', default=None)
+
+# ============================================================================
+# FAIR ADMISSION CONTROL FOR AI GENERATION
+# ============================================================================
+
+class GenerationRejected(Exception):
+    """Raised when a generation request cannot be served within the wait limit."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Request:
+    """One teacher's generation request (a whole quiz)."""
+
+    __slots__ = ('teacher_id', 'questions', 'weight', 'tokens', 'done', 'budget_entry')
+
+    def __init__(self, teacher_id, questions, weight, tokens):
+        self.teacher_id = teacher_id
+        self.questions = questions
+        self.weight = weight
+        self.tokens = tokens
+        self.done = 0
+        self.budget_entry = None
+
+    def remaining(self):
+        """Questions still to be generated (estimate)."""
+        return max(self.questions - self.done, 0)
+
+
+class _Call:
+    """One backend call waiting for or holding a model slot."""
+
+    __slots__ = ('request', 'teacher_id', 'cost', 'start_tag', 'finish_tag', 'granted', 'started')
+
+    def __init__(self, request, teacher_id, cost, start_tag, finish_tag):
+        self.request = request
+        self.teacher_id = teacher_id
+        self.cost = cost
+        self.start_tag = start_tag
+        self.finish_tag = finish_tag
+        self.granted = False
+        self.started = None
+
+
+class Admission:
+    """Handle of an admitted request, yielded by GenerationScheduler.admit()."""
+
+    def __init__(self, scheduler, request, waited):
+        self._scheduler = scheduler
+        self._request = request
+        self.waited = waited
+
+    def report_tokens(self, tokens):
+        """
+        Replace the request's estimated token cost with the tokens actually generated.
+
+        Args:
+            tokens (int): Tokens produced by the backend (None keeps the estimate)
+        """
+        if tokens is not None:
+            self._scheduler._settle_tokens(self._request, tokens)
+
+
+class GenerationScheduler:
+    """
+    Fair sharing of the AI model between teachers.
+
+    A local Ollama instance serves one generation at a time, so requests are
+    queued here rather than inside the model server, on two levels:
+
+    - Requests (`admit`): a teacher runs at most `teacher_concurrency` quiz
+      generations at once and may queue `teacher_queue_limit` more; at most
+      `queue_limit` requests are admitted or waiting overall, and an
+      optional global budget caps the estimated tokens per `budget_window`.
+      A request that other requests would delay by more than `max_wait`
+      seconds is rejected at once with an ETA instead of queueing without
+      feedback.
+    - Model calls (`slot`): every backend call waits for one of
+      `max_concurrent` slots. Waiting calls are served by weighted fair
+      queuing (start-time fair queuing on the questions each call asks
+      for), so a teacher generating 5x50 questions gets the model in turns
+      with a colleague asking for 10 instead of ahead of them.
+
+    Thread-safe; one scheduler is shared by all request threads of a worker.
+    """
+
+    def __init__(self, max_concurrent=1, teacher_concurrency=1, queue_limit=20, teacher_queue_limit=2,
+                 max_wait=300.0, token_budget=0, budget_window=60.0, tokens_per_question=150,
+                 seconds_per_question=3.0):
+        """
+        Args:
+            max_concurrent (int): Backend calls running at once
+            teacher_concurrency (int): Requests running at once per teacher
+            queue_limit (int): Requests admitted or waiting across all teachers
+            teacher_queue_limit (int): Requests waiting per teacher behind their running ones
+            max_wait (float): Longest estimated delay (seconds) caused by other requests
+            token_budget (int): Estimated tokens allowed per window, 0 for no budget
+            budget_window (float): Budget window in seconds
+            tokens_per_question (int): Token estimate per requested question
+            seconds_per_question (float): Initial model time estimate, refined as calls finish
+        """
+        self.max_concurrent = max(1, max_concurrent)
+        self.teacher_concurrency = max(1, teacher_concurrency)
+        self.queue_limit = queue_limit
+        self.teacher_queue_limit = teacher_queue_limit
+        self.max_wait = max_wait
+        self.token_budget = token_budget
+        self.budget_window = budget_window
+        self.tokens_per_question = tokens_per_question
+        self.seconds_per_question = seconds_per_question
+
+        self._cond = threading.Condition()
+        self._pending = []        # requests waiting for admission
+        self._active = []         # admitted requests
+        self._waiting_calls = []  # calls waiting for a model slot
+        self._running_calls = []
+        self._virtual_time = 0.0
+        self._last_finish = {}    # teacher_id -> finish tag of their latest call
+        self._spent = deque()     # [admission time, tokens] within the budget window
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build a scheduler from the AI_* settings of an application configuration.
+
+        Args:
+            config (Mapping): Application configuration
+
+        Returns:
+            GenerationScheduler: Configured scheduler
+        """
+        return cls(
+            max_concurrent=config.get('AI_MAX_CONCURRENT') or _count_endpoints(config.get('AI_BASE_URL')),
+            teacher_concurrency=config.get('AI_TEACHER_CONCURRENCY', 1),
+            queue_limit=config.get('AI_QUEUE_LIMIT', 20),
+            teacher_queue_limit=config.get('AI_TEACHER_QUEUE_LIMIT', 2),
+            max_wait=config.get('AI_MAX_WAIT', 300.0),
+            token_budget=config.get('AI_TOKEN_BUDGET', 0),
+            budget_window=config.get('AI_BUDGET_WINDOW', 60.0),
+            tokens_per_question=config.get('AI_TOKENS_PER_QUESTION', 150)
+        )
+
+    @contextmanager
+    def admit(self, teacher_id, questions, weight=1.0):
+        """
+        Admit a teacher's generation request, or reject it with an ETA.
+
+        Blocks while the teacher's earlier requests run or the budget is
+        spent. Backend calls made inside the block are attributed to the
+        teacher by `slot`.
+
+            with scheduler.admit(teacher.id, questions=50):
+                generator.generate_and_save_temp_csv(...)
+
+        Args:
+            teacher_id (int): Teacher requesting the generation
+            questions (int): Number of questions requested
+            weight (float): Share of the model relative to other teachers
+
+        Yields:
+            Admission: Handle to report the tokens actually generated
+
+        Raises:
+            GenerationRejected: If the queue is saturated or the estimated delay is too long
+        """
+        started = time.monotonic()
+        request = _Request(teacher_id, max(1, questions), max(weight, 0.01),
+                           max(1, questions) * self.tokens_per_question)
+        self._enqueue(request, started)
+        waited = time.monotonic() - started
+        metrics.observe('ai_admission_wait_seconds', waited)
+
+        token = _current_request.set(request)
+        try:
+            yield Admission(self, request, waited)
+        finally:
+            _current_request.reset(token)
+            self._finish(request)
+
+    def _enqueue(self, request, started):
+        """Block until a request may start, or reject it."""
+        with self._cond:
+            now = started
+            self._check_admission(request, now)
+            self._pending.append(request)
+            self._publish()
+
+            deadline = started + self.max_wait
+            while not self._can_start(request, now):
+                if now >= deadline:
+                    self._pending.remove(request)
+                    self._publish()
+                    self._reject(request, 'timeout', self._delay_estimate(request, now))
+                retry_in = self._budget_retry_in(now)
+                self._cond.wait(min(deadline - now, retry_in) if retry_in else deadline - now)
+                now = time.monotonic()
+
+            self._pending.remove(request)
+            self._active.append(request)
+            if self.token_budget:
+                request.budget_entry = [now, request.tokens]
+                self._spent.append(request.budget_entry)
+            self._publish()
+
+    def _check_admission(self, request, now):
+        """Reject a new request when the queue is saturated."""
+        queued = self._pending + self._active
+        if len(queued) >= self.queue_limit:
+            soonest = min((self._completion_estimate(r, now) for r in self._active), default=self.max_wait)
+            self._reject(request, 'queue_full', soonest)
+
+        own_pending = sum(1 for r in self._pending if r.teacher_id == request.teacher_id)
+        if own_pending >= self.teacher_queue_limit:
+            own = [r for r in self._active if r.teacher_id == request.teacher_id]
+            soonest = min((self._completion_estimate(r, now) for r in own), default=self.max_wait)
+            self._reject(request, 'teacher_queue_full', soonest)
+
+        delay = self._delay_estimate(request, now)
+        if delay > self.max_wait:
+            # Under fair sharing the backlog shrinks by one model-second per second
+            self._reject(request, 'wait_too_long', delay - self.max_wait)
+
+    def _can_start(self, request, now):
+        """Check the teacher's concurrency cap, their queue order and the budget."""
+        running = sum(1 for r in self._active if r.teacher_id == request.teacher_id)
+        if running >= self.teacher_concurrency:
+            return False
+        first_own = next(r for r in self._pending if r.teacher_id == request.teacher_id)
+        if first_own is not request:
+            return False
+        if not self.token_budget:
+            return True
+        spent = self._spent_tokens(now)
+        # An oversized request may still run alone
+        return spent == 0 or spent + request.tokens <= self.token_budget
+
+    def _reject(self, request, reason, retry_after):
+        """Count and raise a rejection with a rounded-up ETA."""
+        retry_after = max(1, math.ceil(retry_after))
+        metrics.inc('ai_admission_rejected_total', reason=reason)
+        log_event('ai_admission_rejected', teacher_id=request.teacher_id, questions=request.questions,
+                  reason=reason, retry_after=retry_after, pending=len(self._pending), active=len(self._active))
+        messages = {
+            'teacher_queue_full': 'You already have AI quizzes being generated.',
+            'timeout': 'The AI generator did not become free in time.'
+        }
+        message = messages.get(reason, 'The AI generator is busy with other quizzes.')
+        raise GenerationRejected(f"{message} Please try again in about {_format_eta(retry_after)}.",
+                                 retry_after)
+
+    def _finish(self, request):
+        """Remove a finished request and wake waiting ones."""
+        with self._cond:
+            self._active.remove(request)
+            self._publish()
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, cost=1):
+        """
+        Hold a model slot for one backend call, waiting for a fair turn.
+
+        Args:
+            cost (int): Questions the call asks for
+        """
+        request = _current_request.get()
+        teacher_id = request.teacher_id if request else None
+        weight = request.weight if request else 1.0
+        cost = max(1, cost)
+        waiting_since = time.monotonic()
+
+        with self._cond:
+            start_tag = max(self._virtual_time, self._last_finish.get(teacher_id, 0.0))
+            call = _Call(request, teacher_id, cost, start_tag, start_tag + cost / weight)
+            self._last_finish[teacher_id] = call.finish_tag
+            self._waiting_calls.append(call)
+            self._dispatch()
+            while not call.granted:
+                self._cond.wait()
+        metrics.observe('ai_slot_wait_seconds', call.started - waiting_since)
+
+        try:
+            yield
+        finally:
+            self._release(call)
+
+    def _dispatch(self):
+        """Grant free slots to the waiting calls with the smallest finish tags."""
+        while len(self._running_calls) < self.max_concurrent and self._waiting_calls:
+            call = min(self._waiting_calls, key=lambda c: c.finish_tag)
+            self._waiting_calls.remove(call)
+            self._running_calls.append(call)
+            # Virtual time advances to the start tag of the call being served
+            self._virtual_time = max(self._virtual_time, call.start_tag)
+            call.granted = True
+            call.started = time.monotonic()
+            self._cond.notify_all()
+        metrics.set('ai_calls_waiting', len(self._waiting_calls))
+
+    def _release(self, call):
+        """Free a call's slot, record progress and learn from its duration."""
+        with self._cond:
+            self._running_calls.remove(call)
+            elapsed = time.monotonic() - call.started
+            # Exponentially weighted estimate of model seconds per question for ETAs
+            self.seconds_per_question = 0.8 * self.seconds_per_question + 0.2 * (elapsed / call.cost)
+            if call.request is not None:
+                call.request.done += call.cost
+            if not self._running_calls and not self._waiting_calls:
+                # Idle: forget finish tags so past calls do not count against anyone
+                self._virtual_time = 0.0
+                self._last_finish.clear()
+            self._dispatch()
+
+    def _spent_tokens(self, now):
+        """Return the tokens spent within the budget window."""
+        while self._spent and self._spent[0][0] <= now - self.budget_window:
+            self._spent.popleft()
+        return sum(entry[1] for entry in self._spent)
+
+    def _budget_retry_in(self, now):
+        """Return seconds until the oldest budget entry expires, or None."""
+        if not self.token_budget or not self._spent:
+            return None
+        return max(0.01, self._spent[0][0] + self.budget_window - now)
+
+    def _settle_tokens(self, request, tokens):
+        """Correct a request's budget entry with the tokens it actually used."""
+        with self._cond:
+            request.tokens = tokens
+            if request.budget_entry is not None:
+                request.budget_entry[1] = tokens
+            self._cond.notify_all()
+
+    def _completion_estimate(self, request, now):
+        """Estimate when an admitted request finishes, in seconds from now."""
+        own = request.remaining() * self.seconds_per_question / self.max_concurrent
+        return self._delay_estimate(request, now) + own
+
+    def _delay_estimate(self, request, now):
+        """
+        Estimate how much other requests delay a request, in seconds.
+
+        Models the fair queue as processor sharing: every other teacher's
+        request delays this one by at most as many questions as this one
+        still needs, the teacher's own earlier requests by all of theirs.
+        Adds the time the global budget needs to free the request's tokens.
+        The request's own generation time is not included, so a large quiz
+        is not rejected while the model is idle.
+        """
+        needed = request.remaining()
+        work = 0
+        for other in self._pending + self._active:
+            if other is request:
+                continue
+            if other.teacher_id == request.teacher_id:
+                work += other.remaining()
+            else:
+                work += min(other.remaining(), needed)
+        eta = work * self.seconds_per_question / self.max_concurrent
+
+        if self.token_budget and request.budget_entry is None:
+            queued_tokens = sum(r.tokens for r in self._pending if r is not request)
+            overflow = self._spent_tokens(now) + queued_tokens + request.tokens - self.token_budget
+            if overflow > 0:
+                eta += self.budget_window * min(overflow / self.token_budget, 1.0)
+        return eta
+
+    def _publish(self):
+        """Update the queue gauges."""
+        metrics.set('ai_requests_pending', len(self._pending))
+        metrics.set('ai_requests_active', len(self._active))
+
+    def status(self):
+        """
+        Return a snapshot of the queue.
+
+        Returns:
+            dict: Active and pending requests, calls waiting for the model and the time estimate
+        """
+        with self._cond:
+            now = time.monotonic()
+            return {
+                'active': [{'teacher_id': r.teacher_id, 'questions': r.questions, 'remaining': r.remaining()}
+                           for r in self._active],
+                'pending': [{'teacher_id': r.teacher_id, 'questions': r.questions} for r in self._pending],
+                'calls_running': len(self._running_calls),
+                'calls_waiting': len(self._waiting_calls),
+                'seconds_per_question': round(self.seconds_per_question, 2),
+                'tokens_in_window': self._spent_tokens(now) if self.token_budget else None
+            }
+
+
+def _count_endpoints(base_url):
+    """Return the number of comma-separated AI endpoints (at least 1)."""
+    return max(1, len([url for url in (base_url or '').split(',') if url.strip()]))
+
+
+def _format_eta(seconds):
+    """Format a wait in seconds for a user message."""
+    if seconds < 60:
+        return f"{seconds} seconds"
+    minutes = math.ceil(seconds / 60)
+    return f"{minutes} minute{'s' if minutes != 1 else ''}"
@@ -0,0 +1,119 @@
+"""
+AI generation sidecar (ASGI)
+Serves quiz generation from AsyncQuizGenerator on one event loop, so a single
+process keeps many slow model calls in flight while the Flask workers stay
+free for ordinary requests. It depends on nothing beyond the AI modules and
+runs under any ASGI server:
+
+    uvicorn ai_sidecar:app --port 5002
+
+Endpoints:
+    GET  /health    -> {"ok": true|false}
+    POST /generate  {"categories": [["Physics", "High School", 5], ...], "batched": false}
+                    -> {"success": true, "questions": [...]}
+"""
+
+import json
+from ai_quiz import AsyncQuizGenerator, generator_from_config
+from config import Config
+
+_generator = None
+
+
+def get_generator() -> AsyncQuizGenerator:
+    """Return the sidecar's generator, creating it on first use."""
+    global _generator
+    if _generator is None:
+        settings = {key: getattr(Config, key) for key in dir(Config) if key.startswith('AI_')}
+        _generator = generator_from_config(settings, AsyncQuizGenerator)
+    return _generator
+
+
+async def _read_json(receive) -> dict:
+    """Read the full request body and decode it as JSON."""
+    body = b''
+    more = True
+    while more:
+        message = await receive()
+        body += message.get('body', b'')
+        more = message.get('more_body', False)
+    return json.loads(body or b'{}')
+
+
+async def _send_json(send, data: dict, status: int = 200):
+    """Send a JSON response."""
+    body = json.dumps(data).encode()
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', b'application/json'),
+                            (b'content-length', str(len(body)).encode())]})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def _parse_categories(data: dict) -> list:
+    """
+    Validate the requested categories.
+
+    Args:
+        data (dict): Request body
+
+    Returns:
+        list: List of tuples (category, level, num_questions)
+
+    Raises:
+        ValueError: If the categories are missing or malformed
+    """
+    categories = data.get('categories') if isinstance(data, dict) else None
+    if not categories or not isinstance(categories, list):
+        raise ValueError("categories must be a non-empty list of [category, level, num_questions]")
+    requests = []
+    for entry in categories:
+        if not isinstance(entry, (list, tuple)) or len(entry) != 3:
+            raise ValueError(f"Invalid category request: {entry!r}")
+        category, level, num_questions = entry
+        if not isinstance(num_questions, int) or num_questions < 1:
+            raise ValueError(f"Invalid number of questions for {category}: {num_questions!r}")
+        requests.append((str(category), str(level), num_questions))
+    return requests
+
+
+async def _generate(receive, send):
+    """POST /generate: generate questions for the requested categories."""
+    try:
+        data = await _read_json(receive)
+        categories_requests = _parse_categories(data)
+    except ValueError as e:  # Includes JSONDecodeError
+        await _send_json(send, {'success': False, 'error': str(e)}, 400)
+        return
+
+    generator = get_generator()
+    try:
+        if data.get('batched') and len(categories_requests) > 1:
+            questions = await generator.generate_batch(categories_requests)
+        else:
+            questions = await generator.generate_many(categories_requests)
+    except ConnectionError as e:
+        await _send_json(send, {'success': False, 'error': str(e)}, 503)
+        return
+    await _send_json(send, {'success': True, 'questions': questions})
+
+
+async def app(scope, receive, send):
+    """ASGI entry point."""
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if _generator is not None:
+                    await _generator.aclose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    path, method = scope['path'], scope['method']
+    if path == '/health' and method == 'GET':
+        await _send_json(send, {'ok': await get_generator().check_ollama_connection()})
+    elif path == '/generate' and method == 'POST':
+        await _generate(receive, send)
+    else:
+        await _send_json(send, {'success': False, 'error': 'Not found'}, 404)
@@ -0,0 +1,54 @@
+"""
+Item Analysis Script
+Runs the question bank item analysis once and lists the items flagged as
+poor. Schedule it with cron to keep the analysis current, e.g. hourly:
+    0 * * * * cd /path/to/ai-quizlab && python analyze_items.py
+
+Usage:
+    python analyze_items.py                     # analyze and report
+    python analyze_items.py --retire            # also retire flagged items
+    python analyze_items.py --min-responses 50 --min-discrimination 0.2
+"""
+
+import argparse
+import json
+from config import Config
+from database import create_db_app
+from item_analysis import run_item_analysis
+from models import db, QuestionBank
+
+app = create_db_app()
+
+def main():
+    """Analyze all responses and report flagged items."""
+    parser = argparse.ArgumentParser(description="Item analysis of question bank items")
+    parser.add_argument("--min-responses", type=int, default=Config.ITEM_MIN_RESPONSES,
+                        help="Responses an item needs before it can be flagged")
+    parser.add_argument("--min-discrimination", type=float, default=Config.ITEM_MIN_DISCRIMINATION,
+                        help="Items discriminating less than this are flagged")
+    parser.add_argument("--retire", action="store_true", help="Retire flagged items")
+    args = parser.parse_args()
+
+    print("🚀 AI QuizLab - Item Analysis")
+    print("=" * 50)
+
+    with app.app_context():
+        db.create_all()
+        summary = run_item_analysis(args.min_responses, args.min_discrimination, args.retire)
+        print(f"✅ Analyzed {summary['items']} items from {summary['responses']} responses "
+              f"in {summary['seconds']:.2f}s")
+
+        if not summary['flagged']:
+            print("🎯 No poor items found.")
+            return
+        print(f"\n⚠️  {len(summary['flagged'])} items discriminate below {args.min_discrimination}:")
+        for item in QuestionBank.query.filter(QuestionBank.id.in_(summary['flagged'])).order_by(QuestionBank.id):
+            print(f"  #{item.id} [{item.category} - {item.level}] {item.question[:60]}")
+            print(f"    responses {item.response_count}, difficulty {item.difficulty:.2f}, "
+                  f"discrimination {item.discrimination:.2f}, options a/b/c/d/blank {json.loads(item.option_counts)}"
+                  f"{', retired' if item.is_retired else ''}")
+        if summary['retired']:
+            print(f"\n🗑️  Retired {summary['retired']} items; they are no longer used in new quizzes.")
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,132 @@
+import atexit
 import csv
+import os
 import time
-from flask import Flask, render_template, request, redirect, url_for, session, send_file, jsonify, flash
-from flask_migrate import Migrate
+import threading
+from flask import (
+    Flask, current_app, render_template, request, redirect, url_for, session, send_file, jsonify, flash
+)
 from werkzeug.security import generate_password_hash
 from datetime import timedelta
+from sqlalchemy import select
 from config import Config
-from models import db, Teacher, Student, Result, Quiz, QuizQuestion
+from database import init_engines, read_only_route
+from models import db, Teacher, Student, Result, Quiz, QuizQuestion, QuestionBank
+from autosave import clean_answer_delta, save_answer_delta, load_saved_answers, clear_attempt
 from functools import wraps
+from contextlib import nullcontext
 
 # Import utility functions
 from utils import (
     get_json_path, read_json, write_json, generate_random_password,
-    create_csv_response, validate_form_data
+    create_csv_response, stream_csv_response, validate_form_data
 )
 from quiz_utils import (
     load_questions_from_bank, create_generation_report, calculate_quiz_scores,
-    create_result_data, format_result_summary, parse_ai_csv_to_quiz_questions
+    create_result_data, format_result_summary, parse_ai_csv_to_quiz_questions,
+    create_quiz_version, find_active_quiz, shuffle_quiz_for_student
 )
-from ai_quiz import QuizGenerator
+from metrics import registry as metrics, log_event, configure_logging
+from submission_queue import SubmissionJournal, SubmissionWriter, remove_results
+from quiz_cache import quiz_payloads
+from compression import init_compression
+from sql_profiler import init_sql_profiler
+from ai_scheduler import GenerationRejected, GenerationScheduler
+from session_store import init_session_store
+from class_stats import CATEGORY_FIELDS, class_statistics, discard_quiz_statistics, record_results
+from question_responses import response_rows, save_responses
+from bank_search import MAX_PER_PAGE, question_summary, search_questions
 
 # ============================================================================
-# APPLICATION INITIALIZATION
+# APPLICATION FACTORY
 # ============================================================================
 
-app = Flask(__name__)
-app.config.from_object(Config)
-app.permanent_session_lifetime = timedelta(minutes=30)
+# (rule, view function, options) collected by @route and registered by create_app()
+_routes = []
+
+def route(rule, **options):
+    """
+    Decorator collecting a view like app.route; every app built by
+    create_app() registers it under the function's name as endpoint.
+    
+    Args:
+        rule (str): URL rule
+        **options: Passed to app.add_url_rule (methods, ...)
+    """
+    def decorator(f):
+        _routes.append((rule, f, options))
+        return f
+    return decorator
 
-# Initialize database and migrations
-db.init_app(app)
-migrate = Migrate(app, db)
+def create_app(config_object=Config, migrations=None):
+    """
+    Build and configure the Flask application.
+    
+    AI components (ai_quiz, llm_backends and their HTTP/pydantic
+    dependencies) are imported on first use, and Flask-Migrate only when
+    needed, so web workers start quickly.
+    
+    Args:
+        config_object (object): Configuration class or object
+        migrations (bool, optional): Register Flask-Migrate for `flask db`;
+            defaults to True when running under the flask command
+        
+    Returns:
+        Flask: Configured application with background services started
+    """
+    app = Flask(__name__)
+    app.config.from_object(config_object)
+    app.permanent_session_lifetime = timedelta(minutes=30)
+
+    # Initialize database and migrations
+    db.init_app(app)
+    init_engines(app, db)
+    if migrations is None:
+        migrations = os.environ.get('FLASK_RUN_FROM_CLI') == 'true'
+    if migrations:
+        from flask_migrate import Migrate
+        Migrate(app, db)
+
+    # Structured metric log lines (one JSON object per line on stderr)
+    configure_logging()
+
+    # Session data and one-shot blobs kept server-side; the cookie holds a session ID
+    init_session_store(app)
+
+    # gzip/brotli responses and content-hashed static URLs with far-future caching
+    init_compression(app)
+
+    # Query counts per request and /debug/sql (SQL_PROFILING=true)
+    if app.config.get('SQL_PROFILING'):
+        init_sql_profiler(app, db)
+
+    for rule, view_func, options in _routes:
+        app.add_url_rule(rule, view_func=view_func, **options)
+
+    # Fair queuing and quotas in front of the AI generator
+    app.extensions['ai_scheduler'] = GenerationScheduler.from_config(app.config)
+    # AI backend shared by every generator of this worker, created on first use
+    app.extensions['ai_backend'] = None
+    app.extensions['ai_backend_lock'] = threading.Lock()
+    app.extensions['model_warmup'] = start_model_warmup(app)
+    app.extensions['submission_writer'] = start_submission_writer(app)
+    app.extensions['item_analysis'] = start_item_analysis(app)
+    # Memory-mapped question embeddings (index_questions.py writes them), opened on first use
+    app.extensions['question_index'] = None
+    return app
+
+def __getattr__(name):
+    """
+    Build the default application on first access of `app.app`.
+    
+    Keeps `gunicorn app:app`, `flask db ...` and `from app import app`
+    working without building an app when only create_app() is needed.
+    """
+    if name == 'app':
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # ============================================================================
 # AUTHENTICATION DECORATORS
@@ -95,16 +192,292 @@ def get_student():
         return db.session.get(Student, student_id)
     return None
 
+def get_quiz_generator():
+    """
+    Build a QuizGenerator for the backend selected in the app configuration.
+    
+    Returns:
+        QuizGenerator: Generator bound to the configured AI backend, whose
+            backend calls wait for a fair turn in the app's AI scheduler
+    """
+    generator = build_quiz_generator(current_app)
+    generator.scheduler = get_ai_scheduler()
+    return generator
+
+def get_ai_backend(app):
+    """
+    Return the AI backend of an app, creating it on first use.
+    
+    One backend per worker, so an EndpointPool keeps its outstanding request
+    counts and endpoint health across requests.
+    
+    Args:
+        app (Flask): Application whose configuration selects the backend
+        
+    Returns:
+        LLMBackend: Backend shared by this worker's generators
+    """
+    with app.extensions['ai_backend_lock']:
+        if app.extensions['ai_backend'] is None:
+            from ai_quiz import backend_from_config
+            app.extensions['ai_backend'] = backend_from_config(app.config)
+    return app.extensions['ai_backend']
+
+def get_ai_scheduler():
+    """
+    Return the AI admission scheduler of the current app.
+    
+    Returns:
+        GenerationScheduler: Scheduler shared by this worker's request threads
+    """
+    return current_app.extensions['ai_scheduler']
+
+def get_question_index():
+    """
+    Return the semantic question index of the current app.
+    
+    Created on first use: it loads NumPy, which most requests never need.
+    
+    Returns:
+        QuestionIndex: Index shared by this worker's request threads (empty until built)
+    """
+    index = current_app.extensions.get('question_index')
+    if index is None:
+        from question_index import QuestionIndex
+        index = QuestionIndex(current_app.config['QUESTION_INDEX_PATH'],
+                              current_app.config.get('SIMILARITY_THRESHOLD', 0.85))
+        current_app.extensions['question_index'] = index
+    return index
+
+def sampling_index():
+    """Return the question index bank quizzes draw diverse questions with, or None (DIVERSE_SAMPLING)."""
+    return get_question_index() if current_app.config.get('DIVERSE_SAMPLING', True) else None
+
+def ai_admission(teacher, categories_requests):
+    """
+    Wait for a fair share of the AI generator before generating questions.
+    
+    Args:
+        teacher (Teacher): Teacher creating the quiz
+        categories_requests (list): List of tuples (category, level, num_questions)
+        
+    Returns:
+        ContextManager: Yields an Admission, or None when nothing is generated
+        
+    Raises:
+        GenerationRejected: On entering, if the generator is saturated
+    """
+    if not categories_requests:
+        return nullcontext()
+    return get_ai_scheduler().admit(teacher.id, sum(n for _, _, n in categories_requests))
+
+def ai_busy_response(error):
+    """
+    Tell a teacher the AI generator is saturated and when to retry.
+    
+    Args:
+        error (GenerationRejected): Rejection with its ETA
+        
+    Returns:
+        Response: 429 JSON for AJAX requests, otherwise a redirect with a flash message
+    """
+    msg = f'⏳ {error}'
+    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        response = jsonify(success=False, message=msg, retry_after=error.retry_after)
+        response.status_code = 429
+        response.headers['Retry-After'] = str(error.retry_after)
+        return response
+    flash(msg, 'warning')
+    return redirect(url_for('teacher'))
+
+def build_quiz_generator(app):
+    """
+    Build a QuizGenerator around the app's shared AI backend.
+    
+    The AI modules are imported here rather than at startup: they pull in
+    pydantic and the HTTP client stack, which most requests never need.
+    
+    Args:
+        app (Flask): Application whose configuration selects the backend
+        
+    Returns:
+        QuizGenerator: Generator bound to the configured AI backend
+    """
+    from ai_quiz import generator_from_config
+    return generator_from_config(app.config, backend=get_ai_backend(app))
+
+def get_student_quiz_questions(quiz, student):
+    """
+    Return a quiz's questions in the order shown to a student.
+    
+    With SHUFFLE_QUESTIONS enabled the order is a permutation seeded by
+    (quiz, student), so rendering and scoring agree without storing it.
+    
+    Args:
+        quiz (Quiz): Quiz being taken
+        student (Student): Student taking it
+        
+    Returns:
+        list: Question dictionaries in display order
+    """
+    quiz_questions = quiz_payloads.get_questions(quiz)
+    if current_app.config.get('SHUFFLE_QUESTIONS', True):
+        quiz_questions = shuffle_quiz_for_student(quiz_questions, quiz.id, student.id)
+    return quiz_questions
+
+def record_quiz_creation(route, started, db_seconds, question_count, **fields):
+    """
+    Record timing metrics for a quiz creation request and emit a JSON log line.
+    
+    Args:
+        route (str): Route name, used as metric label
+        started (float): time.perf_counter() value at the start of the request
+        db_seconds (float): Time spent inserting questions and committing
+        question_count (int): Number of questions stored
+        **fields: Extra fields for the log line
+    """
+    total_seconds = time.perf_counter() - started
+    metrics.observe('quiz_creation_seconds', total_seconds, route=route)
+    metrics.observe('quiz_db_insert_seconds', db_seconds, route=route)
+    metrics.inc('quizzes_created_total', route=route)
+    log_event(
+        'quiz_created',
+        route=route,
+        teacher_id=session.get('teacher_id'),
+        questions=question_count,
+        db_insert_seconds=round(db_seconds, 4),
+        total_seconds=round(total_seconds, 4),
+        **fields
+    )
+
+def start_model_warmup(app):
+    """
+    Warm the AI model in the background at startup and, optionally, on a schedule.
+    
+    Args:
+        app (Flask): Application whose configuration selects the backend
+        
+    Returns:
+        QuizGenerator: Generator owning the keep-alive thread, or None if disabled
+    """
+    if not app.config.get('AI_WARMUP_ON_STARTUP'):
+        return None
+    
+    generator = build_quiz_generator(app)
+    interval = app.config.get('AI_WARMUP_INTERVAL', 0)
+    if interval > 0:
+        generator.start_keep_alive(interval)
+    else:
+        threading.Thread(target=generator.try_warm_up, name='ai-warmup', daemon=True).start()
+    return generator
+
+def start_submission_writer(app):
+    """
+    Open the submission journal and start its background writer, if enabled.
+    
+    Args:
+        app (Flask): Application the writer flushes results for
+        
+    Returns:
+        SubmissionWriter: Running writer, or None when write-behind is disabled
+    """
+    if not app.config.get('SUBMISSION_WRITE_BEHIND'):
+        return None
+    
+    journal = SubmissionJournal(app.config['SUBMISSION_JOURNAL_PATH'])
+    writer = SubmissionWriter(
+        app, journal,
+        batch_size=app.config.get('SUBMISSION_BATCH_SIZE', 200),
+        interval=app.config.get('SUBMISSION_FLUSH_INTERVAL', 1.0),
+        max_attempts=app.config.get('SUBMISSION_MAX_ATTEMPTS', 5),
+        retry_delay=app.config.get('SUBMISSION_RETRY_DELAY', 5.0)
+    )
+    writer.start()
+    # Drain the journal on a clean shutdown; leftovers are flushed on the next start
+    atexit.register(writer.stop)
+    return writer
+
+def start_item_analysis(app):
+    """
+    Start the periodic item analysis of question bank items, if enabled.
+    
+    Args:
+        app (Flask): Application whose responses are analyzed
+        
+    Returns:
+        ItemAnalysisJob: Running job, or None when ITEM_ANALYSIS_INTERVAL is 0
+    """
+    interval = app.config.get('ITEM_ANALYSIS_INTERVAL', 0)
+    if interval <= 0:
+        return None
+    
+    from item_analysis import ItemAnalysisJob  # Loads NumPy, so only when the job is enabled
+    
+    job = ItemAnalysisJob(
+        app, interval,
+        min_responses=app.config.get('ITEM_MIN_RESPONSES', 30),
+        min_discrimination=app.config.get('ITEM_MIN_DISCRIMINATION', 0.1),
+        retire=app.config.get('ITEM_AUTO_RETIRE', False)
+    )
+    job.start()
+    return job
+
+def get_session_store():
+    """
+    Return the server-side store of the current app.
+    
+    Returns:
+        SessionStore: Store for sessions and one-shot blobs
+    """
+    return current_app.extensions['session_store']
+
+def get_submission_journal():
+    """
+    Return the submission journal when write-behind is enabled.
+    
+    Returns:
+        SubmissionJournal: Active journal, or None
+    """
+    writer = get_submission_writer()
+    return writer.journal if writer else None
+
+def get_pending_submission(student_id, quiz_id):
+    """
+    Return a write-behind submission that has not reached the database yet.
+    
+    Entries the writer gave up on ('failed') and flushed entries whose result
+    was removed since do not count, so the student can submit again.
+    
+    Args:
+        student_id (int): Student ID
+        quiz_id (int): Quiz ID
+        
+    Returns:
+        dict: Journal entry (see SubmissionJournal.get), or None
+    """
+    journal = get_submission_journal()
+    entry = journal.get(student_id, quiz_id) if journal and quiz_id else None
+    return entry if entry and entry['status'] in ('pending', 'flushing') else None
+
+def get_submission_writer():
+    """
+    Return the running submission writer of the current app.
+    
+    Returns:
+        SubmissionWriter: Background writer, or None when write-behind is disabled
+    """
+    return current_app.extensions.get('submission_writer')
+
 # ============================================================================
 # AUTHENTICATION ROUTES
 # ============================================================================
 
-@app.route('/')
+@route('/')
 def index():
     """Main entry point - redirects to login page."""
     return redirect(url_for('login'))
 
-@app.route('/login', methods=['GET', 'POST'])
+@route('/login', methods=['GET', 'POST'])
 def login():
     """
     Handle user authentication for both teachers and students.
@@ -142,14 +515,14 @@ def login():
 
     return render_template('login.html')
 
-@app.route('/logout', methods=['POST'])
+@route('/logout', methods=['POST'])
 def logout():
     """Clear user session and redirect to login page."""
     session.clear()
     flash('Logged out successfully!', 'success')
     return redirect(url_for('login'))
 
-@app.route('/register', methods=['GET', 'POST'])
+@route('/register', methods=['GET', 'POST'])
 def register():
     """
     Handle teacher registration with validation.
@@ -213,27 +586,42 @@ def register():
 # TEACHER DASHBOARD ROUTES
 # ============================================================================
 
-@app.route('/teacher')
+@route('/teacher')
 @teacher_required
+@read_only_route
 def teacher():
     """
     Teacher dashboard displaying students and exam results.
     
-    Shows list of registered students and their quiz results.
+    Shows list of registered students and their quiz results, optionally
+    filtered to one quiz version (?quiz_id=), with score statistics per
+    group and category read from the class_statistics summary.
     """
     teacher = get_teacher()
     students_list = Student.query.filter_by(teacher_id=teacher.id).all()
-    results_list = Result.query.join(Student, Result.student_id == Student.id)\
-        .filter(Student.teacher_id == teacher.id).all()
+    quizzes = Quiz.query.filter_by(teacher_id=teacher.id).order_by(Quiz.created_at.desc()).all()
+    selected_quiz_id = request.args.get('quiz_id', type=int)
+    
+    results_query = Result.query.join(Student, Result.student_id == Student.id)\
+        .filter(Student.teacher_id == teacher.id)\
+        .options(db.joinedload(Result.quiz))
+    if selected_quiz_id:
+        results_query = results_query.filter(Result.quiz_id == selected_quiz_id)
+    results_list = results_query.order_by(Result.student_id, Result.id).all()
     
     return render_template(
         'teacher.html',
         teacher_name=teacher.name,
         students_list=students_list,
-        results_list=results_list
+        results_list=results_list,
+        class_stats=class_statistics(teacher.id, selected_quiz_id),
+        stat_categories=[category for category, _ in CATEGORY_FIELDS],
+        quizzes=quizzes,
+        selected_quiz_id=selected_quiz_id,
+        groups=sorted({student.group for student in students_list})
     )
 
-@app.route('/profile', methods=['GET', 'POST'])
+@route('/profile', methods=['GET', 'POST'])
 @teacher_required
 def profile():
     """
@@ -284,7 +672,7 @@ def profile():
 # STUDENT MANAGEMENT ROUTES
 # ============================================================================
 
-@app.route('/upload', methods=['POST'])
+@route('/upload', methods=['POST'])
 @teacher_required
 def upload_students():
     """
@@ -362,7 +750,12 @@ def upload_students():
 
         # Commit all changes
         db.session.commit()
-        session['passwords_to_deliver'] = passwords_to_deliver
+        # Keep the sheet server-side as a one-shot blob; the session only holds its token
+        get_session_store().take_blob(session.pop('password_sheet', None))
+        session['password_sheet'] = get_session_store().put_blob(
+            {'teacher_id': session['teacher_id'], 'rows': passwords_to_deliver},
+            current_app.config.get('PASSWORD_SHEET_TTL', 900)
+        )
 
         # Return response based on request type
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
@@ -394,7 +787,7 @@ def upload_students():
         flash(error_msg, 'danger')
         return redirect(url_for('teacher'))
 
-@app.route('/edit_student', methods=['POST'])
+@route('/edit_student', methods=['POST'])
 @teacher_required
 def edit_student():
     """
@@ -431,7 +824,7 @@ def edit_student():
         print(f"Edit student error: {e}")
         return jsonify(success=False, message="Error updating student.")
 
-@app.route('/delete_student', methods=['POST'])
+@route('/delete_student', methods=['POST'])
 @teacher_required
 def delete_student():
     """
@@ -456,7 +849,8 @@ def delete_student():
 
         # Check if student has exam results
         has_result = Result.query.filter_by(student_id=student_id).first()
-        if has_result:
+        quiz = find_active_quiz(student_db.teacher_id, student_db.group) if get_submission_journal() else None
+        if has_result or (quiz and get_pending_submission(student_db.id, quiz.id)):
             return jsonify(success=False, message="Cannot delete student who has already taken the exam.")
 
         # Delete student
@@ -468,7 +862,7 @@ def delete_student():
         print(f"Delete student error: {e}")
         return jsonify(success=False, message="Error deleting student.")
 
-@app.route('/reset_student_password', methods=['POST'])
+@route('/reset_student_password', methods=['POST'])
 @teacher_required
 def reset_student_password():
     """
@@ -506,15 +900,17 @@ def reset_student_password():
 # FILE DOWNLOAD ROUTES
 # ============================================================================
 
-@app.route('/download_passwords_csv')
+@route('/download_passwords_csv')
 @teacher_required
 def download_passwords_csv():
     """
     Download CSV file containing student passwords after bulk upload.
     
-    Uses session data to provide immediate password download.
+    The sheet is a one-shot blob in the session store: it can be downloaded
+    once, within PASSWORD_SHEET_TTL seconds of the upload.
     """
-    passwords_to_deliver = session.pop('passwords_to_deliver', None)
+    sheet = get_session_store().take_blob(session.pop('password_sheet', None))
+    passwords_to_deliver = sheet['rows'] if sheet and sheet['teacher_id'] == session['teacher_id'] else None
     if not passwords_to_deliver:
         flash('No passwords to deliver. Please upload students first.', 'warning')
         return redirect(url_for('teacher'))
@@ -526,41 +922,66 @@ def download_passwords_csv():
     
     return create_csv_response(data, headers, "students_passwords.csv")
 
-@app.route('/download_students_csv')
+def stream_query_rows(statement):
+    """
+    Execute a Core select and stream its rows through a server-side cursor.
+    
+    Args:
+        statement (Select): Column select to execute
+        
+    Returns:
+        Result: Row iterator fetching CSV_EXPORT_BATCH_SIZE rows at a time
+    """
+    batch_size = current_app.config.get('CSV_EXPORT_BATCH_SIZE', 1000)
+    return db.session.execute(statement.execution_options(yield_per=batch_size))
+
+def wants_gzip():
+    """Return True if the export should be gzip-encoded for this client."""
+    return current_app.config.get('CSV_EXPORT_GZIP', True) and 'gzip' in request.accept_encodings
+
+@route('/download_students_csv')
 @teacher_required
+@read_only_route
 def download_students_csv():
     """Download CSV file with current student list for the teacher."""
     teacher = get_teacher()
-    students_list = Student.query.filter_by(teacher_id=teacher.id).all()
+    statement = select(Student.id, Student.name, Student.group, Student.username)\
+        .where(Student.teacher_id == teacher.id)\
+        .order_by(Student.id)
 
-    data = [[s.id, s.name, s.group, s.username] for s in students_list]
     headers = ['ID', 'Name', 'Group', 'Username']
     filename = f"students_list_{teacher.username}.csv"
     
-    return create_csv_response(data, headers, filename)
+    return stream_csv_response(stream_query_rows(statement), headers, filename, compress=wants_gzip())
 
-@app.route('/download_results_csv')
+@route('/download_results_csv')
 @teacher_required
+@read_only_route
 def download_results_csv():
-    """Download CSV file with exam results for the teacher's students."""
+    """Download CSV file with exam results for the teacher's students (optionally one quiz)."""
     teacher = get_teacher()
-    results_list = Result.query.join(Student, Result.student_id == Student.id)\
-        .filter(Student.teacher_id == teacher.id).all()
+    statement = select(Result.student_id, Result.name, Result.group, Result.mathematics,
+                       Result.physics, Result.chemistry, Result.biology,
+                       Result.computer_science, Result.total, Result.quiz_id)\
+        .join(Student, Result.student_id == Student.id)\
+        .where(Student.teacher_id == teacher.id)\
+        .order_by(Result.student_id, Result.id)
+    
+    quiz_id = request.args.get('quiz_id', type=int)
+    if quiz_id:
+        statement = statement.where(Result.quiz_id == quiz_id)
 
-    data = [[r.student_id, r.name, r.group, r.mathematics, r.physics, 
-             r.chemistry, r.biology, r.computer_science, r.total] 
-            for r in results_list]
     headers = ['ID', 'Name', 'Group', 'Mathematics', 'Physics', 
-               'Chemistry', 'Biology', 'Computer Science', 'Total']
+               'Chemistry', 'Biology', 'Computer Science', 'Total', 'Quiz ID']
     filename = f"results_{teacher.username}.csv"
     
-    return create_csv_response(data, headers, filename)
+    return stream_csv_response(stream_query_rows(statement), headers, filename, compress=wants_gzip())
 
 # ============================================================================
 # QUIZ GENERATION ROUTES
 # ============================================================================
 
-@app.route('/create_quiz', methods=['POST'])
+@route('/create_quiz', methods=['POST'])
 @teacher_required
 def create_quiz():
     """
@@ -568,6 +989,7 @@ def create_quiz():
     
     Loads questions from database based on category and difficulty level.
     """
+    started = time.perf_counter()
     teacher = get_teacher()
     
     # Define available categories
@@ -595,20 +1017,13 @@ def create_quiz():
         return redirect(url_for('teacher'))
     
     try:
-        # Clean up existing quizzes for this teacher
-        existing_quizzes = Quiz.query.filter_by(teacher_id=teacher.id).all()
-        for quiz in existing_quizzes:
-            db.session.delete(quiz)
-        db.session.commit()
-        
-        # Create new quiz
-        new_quiz = Quiz(
-            teacher_id=teacher.id,
+        # Create new quiz version (archives the group's previous quiz)
+        new_quiz = create_quiz_version(
+            teacher,
+            request.form.get('quiz_group', '').strip(),
             name=f"Quiz - {teacher.name}",
             description="Generated quiz from question bank"
         )
-        db.session.add(new_quiz)
-        db.session.flush()  # Get quiz ID without committing
         
         # Initialize statistics tracking
         generation_stats = {
@@ -623,7 +1038,7 @@ def create_quiz():
             print(f"Processing {label}: {num_q} questions from bank at level {level}")
             
             # Load questions from database
-            bank_questions = load_questions_from_bank(label, level, num_q)
+            bank_questions = load_questions_from_bank(label, level, num_q, sampling_index())
             
             if not bank_questions:
                 generation_stats['failed_categories'].append(f"{label} ({level})")
@@ -644,6 +1059,7 @@ def create_quiz():
             return redirect(url_for('teacher'))
 
         # Save questions to database as QuizQuestion objects
+        db_started = time.perf_counter()
         for j, q_data in enumerate(all_quiz_questions):
             quiz_question = QuizQuestion(
                 quiz_id=new_quiz.id,
@@ -656,12 +1072,15 @@ def create_quiz():
                 category=q_data['category'],
                 level=q_data['level'],
                 source='BANK',
+                bank_question_id=q_data.get('bank_id'),
                 order_index=j
             )
             db.session.add(quiz_question)
 
         # Commit all changes
         db.session.commit()
+        record_quiz_creation('create_quiz', started, time.perf_counter() - db_started,
+                             generation_stats['from_bank'])
         
         # Generate success report
         success_msg = create_generation_report(generation_stats, generation_stats['from_bank'])
@@ -682,7 +1101,7 @@ def create_quiz():
 
     return redirect(url_for('teacher'))
 
-@app.route('/create_ai_quiz', methods=['POST'])
+@route('/create_ai_quiz', methods=['POST'])
 @teacher_required
 def create_ai_quiz():
     """
@@ -690,6 +1109,7 @@ def create_ai_quiz():
     
     Uses Ollama AI to generate custom questions based on category and level.
     """
+    started = time.perf_counter()
     teacher = get_teacher()
     
     # Define available categories
@@ -718,56 +1138,59 @@ def create_ai_quiz():
         return redirect(url_for('teacher'))
     
     try:
-        # Initialize AI Quiz Generator
-        ai_generator = QuizGenerator()
-        
-        # Check Ollama connection before proceeding
-        if not ai_generator.check_ollama_connection():
-            msg = '❌ Cannot connect to Ollama. Please make sure Ollama is running and try again.'
+        with ai_admission(teacher, categories_to_process) as admission:
+            # Initialize AI Quiz Generator
+            ai_generator = get_quiz_generator()
+            
+            # Check Ollama connection before proceeding
+            if not ai_generator.check_ollama_connection():
+                msg = '❌ Cannot connect to Ollama. Please make sure Ollama is running and try again.'
+                if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+                    return jsonify(success=False, message=msg)
+                flash(msg, 'danger')
+                return redirect(url_for('teacher'))
+            
+            # Create new quiz version (archives the group's previous quiz)
+            new_quiz = create_quiz_version(
+                teacher,
+                request.form.get('quiz_group', '').strip(),
+                name=f"AI Quiz - {teacher.name}",
+                description="Generated quiz using AI"
+            )
+            
+            # Generate questions using AI
+            temp_csv_path = ai_generator.generate_and_save_temp_csv(
+                categories_to_process, batched=current_app.config.get('AI_BATCHED_GENERATION', False)
+            )
+            admission.report_tokens((ai_generator.last_generation or {}).get('eval_count'))
+            
+            # Parse CSV and convert to QuizQuestion objects
+            db_started = time.perf_counter()
+            ai_quiz_questions = parse_ai_csv_to_quiz_questions(temp_csv_path, new_quiz.id)
+            
+            # Add AI questions to database
+            for quiz_question in ai_quiz_questions:
+                db.session.add(quiz_question)
+            
+            db.session.commit()
+            record_quiz_creation('create_ai_quiz', started, time.perf_counter() - db_started,
+                                 len(ai_quiz_questions), generation=ai_generator.last_generation)
+            
+            # Create success message
+            success_msg = f"""✅ <strong>AI Quiz Created Successfully!</strong><br><br>
+                            🤖 <strong>AI Generation Report:</strong><br>
+                            📝 Generated Questions: <strong>{len(ai_quiz_questions)}</strong><br>
+                            🎯 Quiz is ready for students to take<br>
+                            💡 Questions were generated directly for your quiz."""
+            
+            print(f"✅ AI Quiz completed: {len(ai_quiz_questions)} questions generated")
+            
             if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-                return jsonify(success=False, message=msg)
-            flash(msg, 'danger')
-            return redirect(url_for('teacher'))
-        
-        # Clean up existing quizzes
-        existing_quizzes = Quiz.query.filter_by(teacher_id=teacher.id).all()
-        for quiz in existing_quizzes:
-            db.session.delete(quiz)
-        db.session.commit()
-        
-        # Create new quiz
-        new_quiz = Quiz(
-            teacher_id=teacher.id,
-            name=f"AI Quiz - {teacher.name}",
-            description="Generated quiz using AI"
-        )
-        db.session.add(new_quiz)
-        db.session.flush()  # Get the quiz ID
-        
-        # Generate questions using AI
-        temp_csv_path = ai_generator.generate_and_save_temp_csv(categories_to_process)
-        
-        # Parse CSV and convert to QuizQuestion objects
-        ai_quiz_questions = parse_ai_csv_to_quiz_questions(temp_csv_path, new_quiz.id)
-        
-        # Add AI questions to database
-        for quiz_question in ai_quiz_questions:
-            db.session.add(quiz_question)
+                return jsonify(success=True, message=success_msg)
+            flash(success_msg, 'success')
         
-        db.session.commit()
-        
-        # Create success message
-        success_msg = f"""✅ <strong>AI Quiz Created Successfully!</strong><br><br>
-                        🤖 <strong>AI Generation Report:</strong><br>
-                        📝 Generated Questions: <strong>{len(ai_quiz_questions)}</strong><br>
-                        🎯 Quiz is ready for students to take<br>
-                        💡 Questions were generated directly for your quiz."""
-        
-        print(f"✅ AI Quiz completed: {len(ai_quiz_questions)} questions generated")
-        
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-            return jsonify(success=True, message=success_msg)
-        flash(success_msg, 'success')
+    except GenerationRejected as e:
+        return ai_busy_response(e)
         
     except Exception as e:
         db.session.rollback()
@@ -779,7 +1202,7 @@ def create_ai_quiz():
 
     return redirect(url_for('teacher'))
 
-@app.route('/create_unified_quiz', methods=['POST'])
+@route('/create_unified_quiz', methods=['POST'])
 @teacher_required
 def create_unified_quiz():
     """
@@ -788,6 +1211,7 @@ def create_unified_quiz():
     Allows mixing of questions from database and AI generation
     based on user's checkbox selections for each category.
     """
+    started = time.perf_counter()
     teacher = get_teacher()
     
     # Define available categories
@@ -827,103 +1251,114 @@ def create_unified_quiz():
         return redirect(url_for('teacher'))
     
     try:
-        # Step 1: Clean up existing quizzes
-        existing_quizzes = Quiz.query.filter_by(teacher_id=teacher.id).all()
-        for quiz in existing_quizzes:
-            db.session.delete(quiz)
-        db.session.commit()
-        
-        # Create new quiz
-        new_quiz = Quiz(
-            teacher_id=teacher.id,
-            name=f"Quiz - {teacher.name}",
-            description="Generated quiz with mixed sources"
-        )
-        db.session.add(new_quiz)
-        db.session.flush()  # Get the quiz ID
-        
-        # Initialize statistics tracking
-        generation_stats = {
-            'from_ai': 0,
-            'from_bank': 0,
-            'failed_categories': []
-        }
-        
-        # Step 2: Handle AI generation if requested
-        if ai_categories:
-            print("Processing AI categories...")
+        with ai_admission(teacher, ai_categories) as admission:
+            # Step 1: Create new quiz version (archives the group's previous quiz)
+            new_quiz = create_quiz_version(
+                teacher,
+                request.form.get('quiz_group', '').strip(),
+                name=f"Quiz - {teacher.name}",
+                description="Generated quiz with mixed sources"
+            )
             
-            # Initialize AI Quiz Generator
-            ai_generator = QuizGenerator()
+            # Initialize statistics tracking
+            generation_stats = {
+                'from_ai': 0,
+                'from_bank': 0,
+                'failed_categories': []
+            }
             
-            # Check Ollama connection
-            if not ai_generator.check_ollama_connection():
-                raise Exception('Cannot connect to Ollama. Make sure it is running on localhost:11434')
+            # Step 2: Handle AI generation if requested
+            ai_generator = None
+            db_seconds = 0.0
+            if ai_categories:
+                print("Processing AI categories...")
+                
+                # Initialize AI Quiz Generator
+                ai_generator = get_quiz_generator()
+                
+                # Check Ollama connection
+                if not ai_generator.check_ollama_connection():
+                    raise Exception(f'Cannot connect to Ollama. Make sure it is running on {ai_generator.base_url}')
+                
+                # Generate AI questions and save to temporary CSV
+                temp_csv_path = ai_generator.generate_and_save_temp_csv(
+                    ai_categories, batched=current_app.config.get('AI_BATCHED_GENERATION', False)
+                )
+                admission.report_tokens((ai_generator.last_generation or {}).get('eval_count'))
+                
+                # Parse CSV and convert to QuizQuestion objects
+                db_started = time.perf_counter()
+                ai_quiz_questions = parse_ai_csv_to_quiz_questions(temp_csv_path, new_quiz.id)
+                
+                # Add AI questions to database
+                for quiz_question in ai_quiz_questions:
+                    db.session.add(quiz_question)
+                db_seconds += time.perf_counter() - db_started
+                
+                generation_stats['from_ai'] = len(ai_quiz_questions)
+                print(f"Added {len(ai_quiz_questions)} AI questions to quiz")
             
-            # Generate AI questions and save to temporary CSV
-            temp_csv_path = ai_generator.generate_and_save_temp_csv(ai_categories)
+            # Step 3: Handle Bank questions if requested
+            if bank_categories:
+                print("Processing Bank categories...")
+                for i, (key, label, num_q, level) in enumerate(bank_categories):
+                    print(f"Loading {num_q} questions for {label} at {level} level from bank")
+                    bank_questions = load_questions_from_bank(label, level, num_q, sampling_index())
+                    
+                    if not bank_questions:
+                        generation_stats['failed_categories'].append(f"{label} ({level})")
+                        print(f"No questions found for {label} at {level} level")
+                    else:
+                        # Convert bank questions to QuizQuestion objects
+                        db_started = time.perf_counter()
+                        for j, q_data in enumerate(bank_questions):
+                            quiz_question = QuizQuestion(
+                                quiz_id=new_quiz.id,
+                                question=q_data['question'],
+                                option_a=q_data['options'][0],
+                                option_b=q_data['options'][1],
+                                option_c=q_data['options'][2],
+                                option_d=q_data['options'][3],
+                                correct_answer=q_data['answer'],
+                                category=q_data['category'],
+                                level=q_data['level'],
+                                source='BANK',
+                                bank_question_id=q_data.get('bank_id'),
+                                order_index=generation_stats['from_ai'] + generation_stats['from_bank'] + j
+                            )
+                            db.session.add(quiz_question)
+                        db_seconds += time.perf_counter() - db_started
+                        
+                        generation_stats['from_bank'] += len(bank_questions)
+                        print(f"Added {len(bank_questions)} bank questions for {label}")
             
-            # Parse CSV and convert to QuizQuestion objects
-            ai_quiz_questions = parse_ai_csv_to_quiz_questions(temp_csv_path, new_quiz.id)
+            # Step 4: Finalize quiz creation
+            total_questions = generation_stats['from_ai'] + generation_stats['from_bank']
+            print(f"Total questions in quiz: {total_questions}")
             
-            # Add AI questions to database
-            for quiz_question in ai_quiz_questions:
-                db.session.add(quiz_question)
+            # Validate that we have questions to create quiz
+            if total_questions == 0:
+                db.session.rollback()
+                raise Exception('Failed to load any questions. No questions found for the selected criteria.')
             
-            generation_stats['from_ai'] = len(ai_quiz_questions)
-            print(f"Added {len(ai_quiz_questions)} AI questions to quiz")
-        
-        # Step 3: Handle Bank questions if requested
-        if bank_categories:
-            print("Processing Bank categories...")
-            for i, (key, label, num_q, level) in enumerate(bank_categories):
-                print(f"Loading {num_q} questions for {label} at {level} level from bank")
-                bank_questions = load_questions_from_bank(label, level, num_q)
-                
-                if not bank_questions:
-                    generation_stats['failed_categories'].append(f"{label} ({level})")
-                    print(f"No questions found for {label} at {level} level")
-                else:
-                    # Convert bank questions to QuizQuestion objects
-                    for j, q_data in enumerate(bank_questions):
-                        quiz_question = QuizQuestion(
-                            quiz_id=new_quiz.id,
-                            question=q_data['question'],
-                            option_a=q_data['options'][0],
-                            option_b=q_data['options'][1],
-                            option_c=q_data['options'][2],
-                            option_d=q_data['options'][3],
-                            correct_answer=q_data['answer'],
-                            category=q_data['category'],
-                            level=q_data['level'],
-                            source='BANK',
-                            order_index=generation_stats['from_ai'] + generation_stats['from_bank'] + j
-                        )
-                        db.session.add(quiz_question)
-                    
-                    generation_stats['from_bank'] += len(bank_questions)
-                    print(f"Added {len(bank_questions)} bank questions for {label}")
-        
-        # Step 4: Finalize quiz creation
-        total_questions = generation_stats['from_ai'] + generation_stats['from_bank']
-        print(f"Total questions in quiz: {total_questions}")
-        
-        # Validate that we have questions to create quiz
-        if total_questions == 0:
-            db.session.rollback()
-            raise Exception('Failed to load any questions. No questions found for the selected criteria.')
-
-        # Commit all changes to database
-        db.session.commit()
-        
-        # Generate detailed success message
-        success_msg = create_generation_report(generation_stats, total_questions)
-        
-        print(f"✅ Unified quiz completed: {total_questions} total questions")
+            # Commit all changes to database
+            db_started = time.perf_counter()
+            db.session.commit()
+            db_seconds += time.perf_counter() - db_started
+            record_quiz_creation('create_unified_quiz', started, db_seconds, total_questions,
+                                 generation=ai_generator.last_generation if ai_generator else None)
+            
+            # Generate detailed success message
+            success_msg = create_generation_report(generation_stats, total_questions)
+            
+            print(f"✅ Unified quiz completed: {total_questions} total questions")
+            
+            if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+                return jsonify(success=True, message=success_msg)
+            flash(success_msg, 'success')
         
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-            return jsonify(success=True, message=success_msg)
-        flash(success_msg, 'success')
+    except GenerationRejected as e:
+        return ai_busy_response(e)
         
     except Exception as e:
         db.session.rollback()
@@ -935,22 +1370,164 @@ def create_unified_quiz():
 
     return redirect(url_for('teacher'))
 
+# ============================================================================
+# QUESTION BANK ROUTES
+# ============================================================================
+
+@route('/question_bank')
+@teacher_required
+@read_only_route
+def question_bank():
+    """Display the question bank browser for hand-picking quiz questions."""
+    teacher = get_teacher()
+    groups = db.session.execute(
+        select(Student.group).where(Student.teacher_id == teacher.id).distinct()
+    ).scalars().all()
+    return render_template(
+        'question_bank.html',
+        teacher_name=teacher.name,
+        groups=sorted(groups)
+    )
+
+@route('/question_bank/search')
+@teacher_required
+@read_only_route
+def question_bank_search():
+    """
+    Search the question bank (JSON).
+    
+    Query parameters: q (search text), category, level, page, per_page and
+    include_retired. Results are ranked by relevance when q is given.
+    """
+    started = time.perf_counter()
+    result = search_questions(
+        request.args.get('q', ''),
+        category=request.args.get('category') or None,
+        level=request.args.get('level') or None,
+        page=request.args.get('page', 1, type=int),
+        per_page=request.args.get('per_page', 20, type=int),
+        include_retired=request.args.get('include_retired', '').lower() in ('1', 'true', 'yes')
+    )
+    metrics.observe('bank_search_seconds', time.perf_counter() - started)
+    return jsonify(success=True, **result)
+
+@route('/question_bank/<int:question_id>/similar')
+@teacher_required
+@read_only_route
+def question_bank_similar(question_id):
+    """
+    Find the bank questions most similar to one question (JSON, "more like this").
+    
+    Query parameters: k (number of questions, default 10) and include_retired.
+    Uses the semantic question index; questions not indexed yet have no neighbors.
+    """
+    k = max(1, min(request.args.get('k', 10, type=int), MAX_PER_PAGE))
+    include_retired = request.args.get('include_retired', '').lower() in ('1', 'true', 'yes')
+    
+    # Extra neighbors make up for deleted and retired questions
+    neighbors = get_question_index().similar(question_id, k * 2)
+    questions = {question.id: question
+                 for question in QuestionBank.query.filter(QuestionBank.id.in_([i for i, _ in neighbors]))}
+    results = []
+    for neighbor_id, similarity in neighbors:
+        question = questions.get(neighbor_id)
+        if question is None or (question.is_retired and not include_retired):
+            continue
+        results.append(dict(question_summary(question), similarity=round(similarity, 4)))
+        if len(results) == k:
+            break
+    return jsonify(success=True, total=len(results), page=1, pages=1, questions=results)
+
+@route('/create_quiz_from_selection', methods=['POST'])
+@teacher_required
+def create_quiz_from_selection():
+    """
+    Create quiz from questions hand-picked in the question bank browser.
+    
+    Expects JSON {"question_ids": [...], "quiz_group": "..."}; questions keep
+    the order in which they were picked.
+    """
+    started = time.perf_counter()
+    teacher = get_teacher()
+    data = request.get_json(silent=True) or {}
+    
+    question_ids = []
+    for question_id in data.get('question_ids') or []:
+        if isinstance(question_id, int) and question_id not in question_ids:
+            question_ids.append(question_id)
+    if not question_ids:
+        return jsonify(success=False, message='Please select at least one question.')
+    if len(question_ids) > MAX_PER_PAGE:
+        return jsonify(success=False, message=f'A quiz can have at most {MAX_PER_PAGE} hand-picked questions.')
+    
+    try:
+        bank_questions = {question.id: question
+                          for question in QuestionBank.query.filter(QuestionBank.id.in_(question_ids))}
+        missing = [question_id for question_id in question_ids if question_id not in bank_questions]
+        if missing:
+            return jsonify(success=False, message=f'Questions not found in the bank: {missing}')
+        
+        # Create new quiz version (archives the group's previous quiz)
+        new_quiz = create_quiz_version(
+            teacher,
+            str(data.get('quiz_group') or '').strip(),
+            name=f"Quiz - {teacher.name}",
+            description="Hand-picked quiz from question bank"
+        )
+        
+        db_started = time.perf_counter()
+        for j, question_id in enumerate(question_ids):
+            bank_question = bank_questions[question_id]
+            db.session.add(QuizQuestion(
+                quiz_id=new_quiz.id,
+                question=bank_question.question,
+                option_a=bank_question.option_a,
+                option_b=bank_question.option_b,
+                option_c=bank_question.option_c,
+                option_d=bank_question.option_d,
+                correct_answer=bank_question.correct_answer,
+                category=bank_question.category,
+                level=bank_question.level,
+                source='BANK',
+                bank_question_id=bank_question.id,
+                order_index=j
+            ))
+        db.session.commit()
+        record_quiz_creation('create_quiz_from_selection', started, time.perf_counter() - db_started,
+                             len(question_ids))
+        
+        print(f"✅ Quiz completed: {len(question_ids)} hand-picked questions from bank")
+        return jsonify(success=True, message=f'✅ Quiz created with {len(question_ids)} questions from the bank.')
+    
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error creating quiz: {e}")
+        return jsonify(success=False, message='❌ Error creating quiz. Please try again.')
+
 # ============================================================================
 # QUIZ MANAGEMENT ROUTES
 # ============================================================================
 
-@app.route('/exam_teacher')
+@route('/exam_teacher')
 @teacher_required
+@read_only_route
 def exam_teacher():
     """
     Display quiz preview for teacher.
     
-    Shows the current active quiz with all questions for teacher review.
+    Shows one of the teacher's quizzes (?quiz_id=, default: the newest active
+    quiz) with all questions for teacher review.
     """
     teacher = get_teacher()
     
-    # Get active quiz from database
-    quiz = Quiz.query.filter_by(teacher_id=teacher.id, is_active=True).first()
+    # Get active quizzes from database
+    quizzes = Quiz.query.filter_by(teacher_id=teacher.id, is_active=True)\
+        .order_by(Quiz.created_at.desc()).all()
+    quiz_id = request.args.get('quiz_id', type=int)
+    if quiz_id:
+        quiz = Quiz.query.filter_by(id=quiz_id, teacher_id=teacher.id).first()
+    else:
+        quiz = quizzes[0] if quizzes else None
     quiz_questions = []
     
     if quiz:
@@ -958,29 +1535,44 @@ def exam_teacher():
     
     return render_template('exam_teacher.html', 
                          teacher_name=teacher.name, 
+                         quiz=quiz,
+                         quizzes=quizzes,
                          quiz_questions=quiz_questions)
 
-@app.route('/delete_quiz', methods=['POST'])
+@route('/delete_quiz', methods=['POST'])
 @teacher_required
 def delete_quiz():
     """
-    Delete all quizzes for the current teacher.
+    Remove one quiz (quiz_id in the JSON body) or all active quizzes of the current teacher.
     
-    Removes all quiz data including questions and resets quiz state.
+    Quizzes without results are deleted with their questions; quizzes that
+    already have results are archived so the history is kept.
     """
     teacher = get_teacher()
+    data = request.get_json(silent=True) or {}
     
     try:
-        quizzes = Quiz.query.filter_by(teacher_id=teacher.id).all()
+        query = Quiz.query.filter_by(teacher_id=teacher.id, is_active=True)
+        if data.get('quiz_id'):
+            query = query.filter_by(id=int(data['quiz_id']))
+        quizzes = query.all()
         
         if quizzes:
             deleted_count = len(quizzes)
+            archived_count = 0
             for quiz in quizzes:
-                db.session.delete(quiz)
+                if quiz.results.first() is not None:
+                    quiz.is_active = False
+                    archived_count += 1
+                else:
+                    discard_quiz_statistics(quiz.id)
+                    db.session.delete(quiz)
             
             db.session.commit()
             
             message = f"Successfully deleted {deleted_count} quiz(es)! 🗑️"
+            if archived_count:
+                message += f" {archived_count} quiz(es) with results were archived to keep their history."
             
             if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
                 return jsonify(success=True, message=message)
@@ -1007,13 +1599,15 @@ def delete_quiz():
 
     return redirect(url_for('teacher'))
 
-@app.route('/reset_student_result', methods=['POST'])
+@route('/reset_student_result', methods=['POST'])
 @teacher_required
 def reset_student_result():
     """
     Reset student exam result to allow retaking.
     
-    Removes the student's quiz result, enabling them to take the quiz again.
+    Removes the student's result for one quiz (quiz_id in the JSON body,
+    default: the quiz currently assigned to the student), enabling them to
+    take it again.
     """
     data = request.get_json()
     student_id = data.get('id')
@@ -1022,10 +1616,27 @@ def reset_student_result():
         return jsonify(success=False, message="Student ID is required.")
 
     try:
-        result_db = Result.query.filter_by(student_id=int(student_id)).first()
+        student_id = int(student_id)
+        if 'quiz_id' in data:
+            quiz_id = int(data['quiz_id']) if data['quiz_id'] else None
+        else:
+            student_db = db.session.get(Student, student_id)
+            quiz = find_active_quiz(student_db.teacher_id, student_db.group) if student_db else None
+            quiz_id = quiz.id if quiz else None
+
+        # Drop a result still waiting in the write-behind journal as well. This comes first:
+        # a flush in progress then finds the entry gone and removes the Result it wrote
+        journal = get_submission_journal()
+        pending = journal.get(student_id, quiz_id) if journal and quiz_id else None
+        if pending:
+            journal.discard(student_id, quiz_id)
+
+        result_db = Result.query.filter_by(student_id=student_id, quiz_id=quiz_id).first()
         if result_db:
-            db.session.delete(result_db)
-            db.session.commit()
+            # Also removes responses and class statistics; safe against that concurrent flush
+            remove_results([result_db.id])
+            return jsonify(success=True)
+        if pending:
             return jsonify(success=True)
         return jsonify(success=False, message="Result not found.")
     except Exception as e:
@@ -1037,7 +1648,7 @@ def reset_student_result():
 # STUDENT ROUTES
 # ============================================================================
 
-@app.route('/student')
+@route('/student')
 @student_required
 def student():
     """
@@ -1054,8 +1665,9 @@ def student():
         teacher_name=teacher.name if teacher else "Unknown"
     )
 
-@app.route('/quiz')
+@route('/quiz')
 @student_required
+@read_only_route
 def quiz():
     """
     Display quiz for student to take.
@@ -1066,12 +1678,17 @@ def quiz():
     student = get_student()
     teacher = db.session.get(Teacher, student.teacher_id) if student else None
     quiz_questions = []
+    saved_answers = {}
+    paging = None
     already_done = False
     student_result = None
 
-    if teacher:
+    quiz = find_active_quiz(teacher.id, student.group) if teacher else None
+
+    if quiz:
         # Check if student has already completed the quiz
-        result_db = Result.query.filter_by(student_id=student.id).first()
+        result_db = Result.query.filter_by(student_id=student.id, quiz_id=quiz.id).first()
+        pending = get_pending_submission(student.id, quiz.id) if not result_db else None
         if result_db:
             already_done = True
             student_result = {
@@ -1082,22 +1699,95 @@ def quiz():
                 "computer_science": result_db.computer_science,
                 "total": result_db.total
             }
+        elif pending:
+            # Submitted but not yet flushed by the write-behind writer
+            already_done = True
+            student_result = {key: pending['result'][key] for key in (
+                "mathematics", "physics", "chemistry", "biology", "computer_science", "total"
+            )}
         else:
-            # Load quiz questions from database
-            quiz = Quiz.query.filter_by(teacher_id=teacher.id, is_active=True).first()
-            if quiz:
-                quiz_questions = [q.to_dict() for q in quiz.questions]
+            question_count = len(quiz_payloads.get_questions(quiz))
+            page_size = current_app.config.get('QUIZ_PAGE_SIZE', 0)
+            if page_size and question_count > page_size:
+                # Paged exam mode: render a light shell, questions come from /quiz/questions
+                paging = {
+                    'question_count': question_count,
+                    'page_size': page_size,
+                    'pages': (question_count + page_size - 1) // page_size
+                }
+            else:
+                # Load quiz questions from database, in this student's order
+                quiz_questions = get_student_quiz_questions(quiz, student)
+            # Restore answers autosaved before a reload or browser crash
+            saved_answers = load_saved_answers(student.id, quiz.id)
 
     return render_template(
         'quiz.html',
         student_name=student.name,
         teacher_name=teacher.name if teacher else "Unknown",
+        quiz_id=quiz.id if quiz else None,
         quiz_questions=quiz_questions,
+        saved_answers=saved_answers,
+        paging=paging,
         already_done=already_done,
         student_result=student_result
     )
 
-@app.route('/submit_quiz', methods=['POST'])
+@route('/quiz/questions')
+@student_required
+@read_only_route
+def quiz_questions_page():
+    """
+    Return one page of the student's quiz questions as JSON (paged exam mode).
+    
+    Questions come from the cached quiz payload in the student's own order;
+    correct answers are not included. Responses carry an ETag, so reloading a
+    page the browser already has costs a 304.
+    """
+    student = get_student()
+    quiz = find_active_quiz(student.teacher_id, student.group)
+    if not quiz:
+        return jsonify(success=False, message="Quiz not found."), 404
+    
+    page_size = current_app.config.get('QUIZ_PAGE_SIZE', 0) or 25
+    page = max(request.args.get('page', 1, type=int), 1)
+    shuffle = current_app.config.get('SHUFFLE_QUESTIONS', True)
+    etag = quiz_payloads.etag(quiz, student.id, page, page_size, shuffle)
+    
+    # Weak match: the compression layer marks ETags of compressed bodies as weak
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+        metrics.inc('quiz_page_requests_total', status='304')
+    else:
+        quiz_questions = get_student_quiz_questions(quiz, student)
+        start = (page - 1) * page_size
+        questions = [
+            {
+                'index': index,
+                'question': q['question'],
+                'options': q['options'],
+                'category': q['category'],
+                'level': q['level']
+            }
+            for index, q in enumerate(quiz_questions[start:start + page_size], start=start)
+        ]
+        response = jsonify(
+            success=True,
+            quiz_id=quiz.id,
+            page=page,
+            pages=(len(quiz_questions) + page_size - 1) // page_size,
+            total=len(quiz_questions),
+            questions=questions
+        )
+        metrics.inc('quiz_page_requests_total', status='200')
+    
+    response.set_etag(etag)
+    # Per-student content: browsers may keep it but must revalidate every time
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Cookie')
+    return response
+
+@route('/submit_quiz', methods=['POST'])
 @student_required
 def submit_quiz():
     """
@@ -1112,30 +1802,54 @@ def submit_quiz():
     if not teacher:
         return jsonify(success=False, message="Teacher not found.")
 
-    # Check if student has already completed the quiz
-    existing_result = Result.query.filter_by(student_id=student.id).first()
-    if existing_result:
-        return jsonify(success=False, message="You have already completed this quiz. You cannot retake it.")
-
-    # Load quiz questions from database
-    quiz = Quiz.query.filter_by(teacher_id=teacher.id, is_active=True).first()
+    # Load the quiz assigned to the student's group
+    quiz = find_active_quiz(teacher.id, student.group)
     if not quiz:
         return jsonify(success=False, message="Quiz not found.")
     
-    quiz_questions = [q.to_dict() for q in quiz.questions]
+    # Answers are scored against the quiz that was rendered; reject them if it was replaced since
+    submitted_quiz_id = request.form.get('quiz_id', type=int)
+    if submitted_quiz_id and submitted_quiz_id != quiz.id:
+        return jsonify(success=False, message="This quiz has been replaced by your teacher. Please reload the page.")
+
+    # Check if student has already completed the quiz
+    journal = get_submission_journal()
+    existing_result = Result.query.filter_by(student_id=student.id, quiz_id=quiz.id).first()
+    if existing_result or get_pending_submission(student.id, quiz.id):
+        return jsonify(success=False, message="You have already completed this quiz. You cannot retake it.")
+    
+    # Same per-student order as rendered, so q{i} maps to the right question
+    quiz_questions = get_student_quiz_questions(quiz, student)
 
     try:
         # Process answers and calculate scores by category
         scores = calculate_quiz_scores(quiz_questions, request.form)
         
-        # Save results to database
-        result_data = create_result_data(student, scores)
+        result_data = create_result_data(student, scores, quiz.id)
+        summary = format_result_summary(result_data)
+        responses = response_rows(student.id, quiz.id, scores['responses'], quiz_payloads.get_questions(quiz))
+
+        if journal:
+            # Write-behind: durably journal the result; the background writer
+            # inserts it (and its responses) into the database with the next batch
+            if not journal.enqueue(dict(result_data, responses=responses)):
+                return jsonify(success=False, message="You have already completed this quiz. You cannot retake it.")
+            get_submission_writer().notify()
+            clear_attempt(student.id, quiz.id)
+            db.session.commit()
+            return jsonify(success=True,
+                          message="Quiz submitted successfully! 🎉",
+                          summary=summary,
+                          queued=True)
+
+        # Save results, responses and class statistics, and drop the autosaved attempt, in the same transaction
         new_result = Result(**result_data)
         db.session.add(new_result)
+        save_responses(responses)
+        record_results([(teacher.id, result_data)])
+        clear_attempt(student.id, quiz.id)
         db.session.commit()
 
-        # Generate summary for display
-        summary = format_result_summary(result_data)
         return jsonify(success=True, 
                       message="Quiz submitted successfully! 🎉", 
                       summary=summary)
@@ -1145,11 +1859,103 @@ def submit_quiz():
         print(f"Quiz submission error: {e}")
         return jsonify(success=False, message="Error submitting quiz. Please try again.")
 
+@route('/autosave', methods=['POST'])
+@student_required
+def autosave():
+    """
+    Save the answers changed since the last autosave of the quiz in progress.
+    
+    Expects JSON {"quiz_id": 1, "answers": {"q0": "Option text", "q3": null}};
+    null clears an answer. Answers are merged into one row per (student, quiz).
+    """
+    started = time.perf_counter()
+    data = request.get_json(silent=True) or {}
+    student = get_student()
+    
+    quiz_id = data.get('quiz_id')
+    quiz = db.session.get(Quiz, quiz_id) if isinstance(quiz_id, int) else None
+    if not quiz or not quiz.is_active or quiz.teacher_id != student.teacher_id \
+            or quiz.group not in (None, student.group):
+        return jsonify(success=False, message="Quiz not found.")
+
+    # A save still in flight when the quiz is submitted must not re-create the attempt
+    existing_result = Result.query.filter_by(student_id=student.id, quiz_id=quiz.id).first()
+    if existing_result or get_pending_submission(student.id, quiz.id):
+        return jsonify(success=False, message="You have already completed this quiz.")
+
+    try:
+        question_count = QuizQuestion.query.filter_by(quiz_id=quiz.id).count()
+        delta = clean_answer_delta(data.get('answers'), question_count)
+    except ValueError as e:
+        return jsonify(success=False, message=str(e))
+    
+    try:
+        saved = save_answer_delta(student.id, quiz.id, delta)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Autosave error: {e}")
+        return jsonify(success=False, message="Error saving answers.")
+    
+    metrics.observe('autosave_seconds', time.perf_counter() - started)
+    return jsonify(success=True, saved=saved)
+
+@route('/submission_status')
+@student_required
+def submission_status():
+    """
+    Report whether the student's submission has reached the database.
+    
+    Status is 'saved' once the result is stored, 'pending' while it waits in
+    the write-behind journal (including failed writes being retried),
+    'failed' if the writer gave up on it (the student can submit again) and
+    'none' if nothing was submitted. Checks the quiz given as ?quiz_id=,
+    default: the quiz currently assigned to the student.
+    """
+    student = get_student()
+    quiz_id = request.args.get('quiz_id', type=int)
+    if not quiz_id:
+        quiz = find_active_quiz(student.teacher_id, student.group)
+        if not quiz:
+            return jsonify(success=True, status='none')
+        quiz_id = quiz.id
+
+    if Result.query.filter_by(student_id=student.id, quiz_id=quiz_id).first():
+        return jsonify(success=True, status='saved')
+
+    journal = get_submission_journal()
+    entry = journal.get(student.id, quiz_id) if journal else None
+    if entry is None:
+        return jsonify(success=True, status='none')
+    if entry['status'] == 'failed':
+        return jsonify(success=True, status='failed', message=entry['error'])
+    if entry['status'] == 'flushed':
+        # Flushed but the result was removed since (e.g. reset by the teacher)
+        return jsonify(success=True, status='none')
+    return jsonify(success=True, status='pending')
+
+# ============================================================================
+# MONITORING ROUTES
+# ============================================================================
+
+@route('/metrics')
+def metrics_endpoint():
+    """
+    Expose in-process metrics in the Prometheus text format.
+    
+    If METRICS_TOKEN is configured, requests must send it as a Bearer token.
+    """
+    token = current_app.config.get('METRICS_TOKEN')
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return 'Unauthorized', 401
+    return metrics.render_prometheus(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
 # ============================================================================
 # APPLICATION STARTUP
 # ============================================================================
 
 if __name__ == '__main__':
+    app = create_app()
     with app.app_context():
         db.create_all()
     app.run()
@@ -0,0 +1,138 @@
+import json
+import re
+from datetime import datetime
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from models import db, QuizAttempt
+
+# Answer fields posted by the quiz form: q0, q1, ...
+ANSWER_KEY_PATTERN = re.compile(r'^q(\d+)$')
+
+# Longest accepted answer; matches the option columns of QuizQuestion
+MAX_ANSWER_LENGTH = 255
+
+# ============================================================================
+# DELTA VALIDATION
+# ============================================================================
+
+def clean_answer_delta(delta, question_count):
+    """
+    Validate an autosave delta posted by the quiz page.
+
+    Args:
+        delta (dict): Changed answers, e.g. {"q3": "Option text"}; None clears an answer
+        question_count (int): Number of questions in the quiz
+
+    Returns:
+        dict: The validated delta
+
+    Raises:
+        ValueError: If a key or value is not a valid answer
+    """
+    if not isinstance(delta, dict) or not delta:
+        raise ValueError("Answers must be a non-empty object.")
+    if len(delta) > question_count:
+        raise ValueError("Too many answers.")
+
+    for key, value in delta.items():
+        match = ANSWER_KEY_PATTERN.match(key)
+        if not match or int(match.group(1)) >= question_count:
+            raise ValueError(f"Unknown question: {key}")
+        if value is not None and (not isinstance(value, str) or len(value) > MAX_ANSWER_LENGTH):
+            raise ValueError(f"Invalid answer for {key}")
+    return delta
+
+# ============================================================================
+# ATTEMPT STORAGE
+# ============================================================================
+
+def load_saved_answers(student_id, quiz_id):
+    """
+    Return the autosaved answers of a student's attempt.
+
+    Args:
+        student_id (int): Student ID
+        quiz_id (int): Quiz ID
+
+    Returns:
+        dict: Saved answers keyed by form field (empty if none)
+    """
+    answers = db.session.execute(
+        select(QuizAttempt.answers).where(QuizAttempt.student_id == student_id,
+                                          QuizAttempt.quiz_id == quiz_id)
+    ).scalar()
+    return json.loads(answers) if answers else {}
+
+def save_answer_delta(student_id, quiz_id, delta):
+    """
+    Merge an answer delta into the student's attempt and upsert it.
+
+    The attempt is read by its unique (student, quiz) key and written back
+    with a single INSERT ... ON CONFLICT statement. Concurrent saves from two
+    tabs of the same student are last-writer-wins. The caller commits.
+
+    Args:
+        student_id (int): Student ID
+        quiz_id (int): Quiz ID
+        delta (dict): Validated delta from clean_answer_delta()
+
+    Returns:
+        int: Number of answers saved for the attempt
+    """
+    answers = load_saved_answers(student_id, quiz_id)
+    for key, value in delta.items():
+        if value is None:
+            answers.pop(key, None)
+        else:
+            answers[key] = value
+
+    upsert_attempt(student_id, quiz_id, json.dumps(answers, separators=(',', ':')))
+    return len(answers)
+
+def upsert_attempt(student_id, quiz_id, answers_json):
+    """
+    Insert or update the attempt row for (student, quiz) in one statement.
+
+    Uses the dialect's native upsert (SQLite/PostgreSQL ON CONFLICT, MySQL ON
+    DUPLICATE KEY); other databases fall back to UPDATE then INSERT.
+
+    Args:
+        student_id (int): Student ID
+        quiz_id (int): Quiz ID
+        answers_json (str): Serialized answers
+    """
+    now = datetime.utcnow()
+    values = {'student_id': student_id, 'quiz_id': quiz_id, 'answers': answers_json, 'updated_at': now}
+    changes = {'answers': answers_json, 'updated_at': now}
+    dialect = db.session.get_bind(QuizAttempt.__mapper__).dialect.name
+
+    if dialect in ('sqlite', 'postgresql'):
+        insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        statement = insert(QuizAttempt.__table__).values(**values)\
+            .on_conflict_do_update(index_elements=['student_id', 'quiz_id'], set_=changes)
+        db.session.execute(statement)
+    elif dialect in ('mysql', 'mariadb'):
+        statement = mysql.insert(QuizAttempt.__table__).values(**values).on_duplicate_key_update(**changes)
+        db.session.execute(statement)
+    else:
+        updated = db.session.execute(
+            update(QuizAttempt.__table__)
+            .where(QuizAttempt.student_id == student_id, QuizAttempt.quiz_id == quiz_id)
+            .values(**changes)
+        )
+        if updated.rowcount == 0:
+            db.session.add(QuizAttempt(**values))
+
+def clear_attempt(student_id, quiz_id):
+    """
+    Delete a student's autosaved attempt, e.g. once the quiz is submitted.
+    The caller commits.
+
+    Args:
+        student_id (int): Student ID
+        quiz_id (int): Quiz ID
+    """
+    db.session.execute(
+        delete(QuizAttempt.__table__)
+        .where(QuizAttempt.student_id == student_id, QuizAttempt.quiz_id == quiz_id)
+    )
@@ -0,0 +1,189 @@
+import re
+from sqlalchemy import event, text
+from models import db, QuestionBank
+
+# Columns searched, with their bm25 weight on SQLite (a match in the question counts most)
+SEARCH_COLUMNS = [('question', 10.0), ('option_a', 2.0), ('option_b', 2.0), ('option_c', 2.0), ('option_d', 2.0)]
+
+# Longest accepted query, in words; later words are ignored
+MAX_QUERY_TERMS = 8
+
+MAX_PER_PAGE = 100
+
+# PostgreSQL: expression the GIN index is built on; queries must repeat it verbatim to use the index
+PG_DOCUMENT = "to_tsvector('english', " + " || ' ' || ".join(column for column, _ in SEARCH_COLUMNS) + ")"
+
+# SQLite: FTS5 index over question_bank (external content), kept in sync by triggers on every
+# write, including bank imports
+_columns = ', '.join(column for column, _ in SEARCH_COLUMNS)
+_new_values = ', '.join(f'new.{column}' for column, _ in SEARCH_COLUMNS)
+_old_values = ', '.join(f'old.{column}' for column, _ in SEARCH_COLUMNS)
+SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS question_bank_fts USING fts5(
+            {_columns}, content='question_bank', content_rowid='id', tokenize='porter unicode61')""",
+    f"""CREATE TRIGGER IF NOT EXISTS question_bank_fts_insert AFTER INSERT ON question_bank BEGIN
+            INSERT INTO question_bank_fts(rowid, {_columns}) VALUES (new.id, {_new_values});
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS question_bank_fts_delete AFTER DELETE ON question_bank BEGIN
+            INSERT INTO question_bank_fts(question_bank_fts, rowid, {_columns}) VALUES ('delete', old.id, {_old_values});
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS question_bank_fts_update AFTER UPDATE OF {_columns} ON question_bank BEGIN
+            INSERT INTO question_bank_fts(question_bank_fts, rowid, {_columns}) VALUES ('delete', old.id, {_old_values});
+            INSERT INTO question_bank_fts(rowid, {_columns}) VALUES (new.id, {_new_values});
+        END""",
+    # Re-index rows written before the index existed
+    "INSERT INTO question_bank_fts(question_bank_fts) VALUES ('rebuild')",
+]
+POSTGRESQL_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_question_bank_search ON question_bank USING GIN ({PG_DOCUMENT})",
+]
+
+# ============================================================================
+# INDEX MANAGEMENT
+# ============================================================================
+
+def create_search_index(connection):
+    """
+    Create (or re-index) the full-text index of the question bank.
+
+    SQLite gets an FTS5 table maintained by triggers; PostgreSQL a GIN index
+    on a tsvector expression, which needs no maintenance. Other databases
+    are searched without an index. Safe to run repeatedly.
+
+    Args:
+        connection (Connection): Connection to the primary database, in a transaction
+    """
+    for statement in {'sqlite': SQLITE_DDL, 'postgresql': POSTGRESQL_DDL}.get(connection.dialect.name, []):
+        connection.execute(text(statement))
+
+@event.listens_for(QuestionBank.__table__, 'after_create')
+def _create_search_index(target, connection, **kwargs):
+    """Build the search index whenever db.create_all() creates the question bank."""
+    create_search_index(connection)
+
+def index_available(dialect):
+    """
+    Return True if the current database can answer full-text queries.
+
+    Args:
+        dialect (str): Dialect name of the session's bind
+
+    Returns:
+        bool: True for PostgreSQL and for SQLite once the FTS5 table exists
+    """
+    if dialect == 'postgresql':
+        return True
+    if dialect == 'sqlite':
+        return db.session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'question_bank_fts'")
+        ).first() is not None
+    return False
+
+# ============================================================================
+# SEARCH
+# ============================================================================
+
+def query_terms(query):
+    """
+    Split a teacher's query into plain search terms.
+
+    Operators and punctuation are dropped so any input is a valid FTS query.
+
+    Args:
+        query (str): Raw query, e.g. "photosynthesis light"
+
+    Returns:
+        list: Lower-cased word terms, at most MAX_QUERY_TERMS
+    """
+    return re.findall(r'\w+', (query or '').lower())[:MAX_QUERY_TERMS]
+
+def search_questions(query, category=None, level=None, page=1, per_page=20, include_retired=False):
+    """
+    Search the question bank, ranked by relevance and paginated.
+
+    Every term must match; the last one may be the start of a word
+    ("cell photo" finds "photosynthesis in plant cells"), so results follow
+    typing. Without terms, questions are listed in bank order.
+
+    Args:
+        query (str): Search text
+        category (str, optional): Restrict to one category
+        level (str, optional): Restrict to one level
+        page (int): Page number, starting at 1
+        per_page (int): Questions per page, at most MAX_PER_PAGE
+        include_retired (bool): Also return items retired by item analysis
+
+    Returns:
+        dict: 'total', 'page', 'pages' and 'questions' (see question_summary)
+    """
+    per_page = max(1, min(per_page, MAX_PER_PAGE))
+    page = max(1, page)
+    terms = query_terms(query)
+    params = {'limit': per_page, 'offset': (page - 1) * per_page}
+
+    filters = []
+    if category:
+        filters.append('q.category = :category')
+        params['category'] = category
+    if level:
+        filters.append('q.level = :level')
+        params['level'] = level
+    if not include_retired:
+        filters.append('q.is_retired = :retired')
+        params['retired'] = False
+
+    dialect = db.session.get_bind().dialect.name
+    source, order = 'question_bank q', 'q.id'
+    if terms and index_available(dialect) and dialect == 'sqlite':
+        weights = ', '.join(str(weight) for _, weight in SEARCH_COLUMNS)
+        source = 'question_bank_fts JOIN question_bank q ON q.id = question_bank_fts.rowid'
+        filters.insert(0, 'question_bank_fts MATCH :match')
+        # Prefix expansion is costly for short common prefixes; only the word being typed needs it
+        params['match'] = ' '.join([f'"{term}"' for term in terms[:-1]] + [f'"{terms[-1]}"*'])
+        order = f'bm25(question_bank_fts, {weights}), q.id'
+    elif terms and index_available(dialect):
+        filters.insert(0, f"{PG_DOCUMENT} @@ to_tsquery('english', :match)")
+        params['match'] = ' & '.join(terms[:-1] + [f'{terms[-1]}:*'])
+        order = f"ts_rank_cd({PG_DOCUMENT}, to_tsquery('english', :match)) DESC, q.id"
+    elif terms:
+        # No full-text index: substring match on the question text
+        for i, term in enumerate(terms):
+            filters.append(f'lower(q.question) LIKE :term{i}')
+            params[f'term{i}'] = f'%{term}%'
+
+    where = f"WHERE {' AND '.join(filters)}" if filters else ''
+    total = db.session.execute(text(f'SELECT count(*) FROM {source} {where}'), params).scalar()
+    ids = db.session.execute(
+        text(f'SELECT q.id FROM {source} {where} ORDER BY {order} LIMIT :limit OFFSET :offset'), params
+    ).scalars().all()
+
+    by_id = {question.id: question for question in QuestionBank.query.filter(QuestionBank.id.in_(ids))} if ids else {}
+    return {
+        'total': total,
+        'page': page,
+        'pages': (total + per_page - 1) // per_page,
+        'questions': [question_summary(by_id[question_id]) for question_id in ids if question_id in by_id]
+    }
+
+def question_summary(question):
+    """
+    Convert a bank question for the bank browser.
+
+    Args:
+        question (QuestionBank): Bank question
+
+    Returns:
+        dict: Question fields plus its item analysis
+    """
+    return {
+        'id': question.id,
+        'question': question.question,
+        'options': [question.option_a, question.option_b, question.option_c, question.option_d],
+        'answer': question.correct_answer,
+        'category': question.category,
+        'level': question.level,
+        'responses': question.response_count,
+        'difficulty': question.difficulty,
+        'discrimination': question.discrimination,
+        'retired': question.is_retired
+    }
@@ -0,0 +1,162 @@
+"""
+Async Generation Benchmark
+Measures how many quiz generations one worker process keeps in flight
+against a stub Ollama server (benchmarks/stub_ollama.py) that takes a fixed
+time per generation and serves requests in parallel, like a server pool or
+an OpenAI-compatible server with continuous batching.
+
+Compares the blocking QuizGenerator on a thread pool sized like a WSGI
+worker (one thread per in-flight generation) with AsyncQuizGenerator on a
+single event loop thread.
+
+Usage:
+    python -m benchmarks.bench_async_generation --generations 200 --latency 2
+    python -m benchmarks.bench_async_generation --threads 8 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ai_quiz import AsyncQuizGenerator, QuizGenerator
+from benchmarks.load_autosave import percentile
+from llm_backends import OllamaGenerateBackend
+
+CATEGORIES = ['Mathematics', 'Physics', 'Chemistry', 'Biology', 'Computer Science']
+
+
+def free_port() -> int:
+    """Return a TCP port that is free right now."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def stub_server(latency: float):
+    """Run the stub Ollama server in a separate process; yields its base URL."""
+    port = free_port()
+    process = subprocess.Popen([sys.executable, '-m', 'benchmarks.stub_ollama', '--port', str(port),
+                                '--latency', str(latency)], stdout=subprocess.PIPE, text=True)
+    process.stdout.readline()  # Wait until it listens
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        process.terminate()
+        process.wait()
+
+
+class InFlight:
+    """Tracks the peak number of concurrent generations."""
+
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def track(self):
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.current -= 1
+
+
+def summarize(mode: str, latencies: list, elapsed: float, peak: int, errors: int) -> dict:
+    return {
+        'mode': mode,
+        'throughput': len(latencies) / elapsed,
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'peak': peak,
+        'errors': errors,
+        'elapsed': elapsed
+    }
+
+
+def run_sync(base_url: str, generations: int, questions: int, threads: int) -> dict:
+    """Blocking generator on a thread pool (one WSGI thread per generation)."""
+    generator = QuizGenerator(backend=OllamaGenerateBackend(base_url=base_url))
+    in_flight = InFlight()
+    errors = []
+
+    def generate(i):
+        started = time.perf_counter()
+        with in_flight.track():
+            try:
+                generator.generate_quiz(questions, CATEGORIES[i % len(CATEGORIES)], 'High School')
+            except Exception as e:
+                errors.append(e)
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = list(pool.map(generate, range(generations)))
+    return summarize(f'sync, {threads} threads', latencies, time.perf_counter() - started,
+                     in_flight.peak, len(errors))
+
+
+async def run_async(base_url: str, generations: int, questions: int, concurrency: int) -> dict:
+    """AsyncQuizGenerator on one event loop, at most `concurrency` generations in flight."""
+    generator = AsyncQuizGenerator(backend=OllamaGenerateBackend(base_url=base_url))
+    semaphore = asyncio.Semaphore(concurrency)
+    in_flight = InFlight()
+    errors = []
+
+    async def generate(i):
+        async with semaphore:
+            started = time.perf_counter()
+            with in_flight.track():
+                try:
+                    await generator.generate_quiz(questions, CATEGORIES[i % len(CATEGORIES)], 'High School')
+                except Exception as e:
+                    errors.append(e)
+            return time.perf_counter() - started
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(generate(i) for i in range(generations)))
+    elapsed = time.perf_counter() - started
+    await generator.aclose()
+    return summarize('async, 1 loop', latencies, elapsed, in_flight.peak, len(errors))
+
+
+def main():
+    """Run both modes against the stub and print a comparison."""
+    parser = argparse.ArgumentParser(description="Concurrent quiz generations per worker: sync vs async")
+    parser.add_argument("-n", "--generations", type=int, default=200, help="Quiz generations per mode")
+    parser.add_argument("-q", "--questions", type=int, default=10, help="Questions per generation")
+    parser.add_argument("-l", "--latency", type=float, default=2.0, help="Stub seconds per generation")
+    parser.add_argument("-t", "--threads", type=int, default=8, help="Sync worker threads (gthread)")
+    parser.add_argument("-c", "--concurrency", type=int, default=200, help="Async in-flight limit")
+    args = parser.parse_args()
+
+    with stub_server(args.latency) as base_url:
+        with contextlib.redirect_stdout(io.StringIO()):  # Silence per-generation progress lines
+            results = [
+                run_sync(base_url, args.generations, args.questions, args.threads),
+                asyncio.run(run_async(base_url, args.generations, args.questions, args.concurrency))
+            ]
+
+    print(f"\n📊 {args.generations} generations × {args.questions} questions, stub latency {args.latency:g}s")
+    print(f"{'mode':<18} {'gen/s':>7} {'p50 (s)':>8} {'p95 (s)':>8} {'peak in flight':>15} {'errors':>7} "
+          f"{'total (s)':>10}")
+    for r in results:
+        print(f"{r['mode']:<18} {r['throughput']:>7.1f} {r['p50']:>8.2f} {r['p95']:>8.2f} {r['peak']:>15} "
+              f"{r['errors']:>7} {r['elapsed']:>10.1f}")
+    print(f"Async sustains {results[1]['peak']} concurrent generations in one thread "
+          f"({results[1]['throughput'] / results[0]['throughput']:.1f}x the sync throughput).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Bandwidth Benchmark
+School network scenario: N students open the same quiz at the same time,
+then reload it once. Compares bytes on the wire before (no compression,
+unversioned static files revalidated on every load) and after (gzip/brotli
+responses, content-hashed static URLs cached by the browser, 304s for
+unchanged quiz pages).
+
+Each student is a simulated browser with its own HTTP cache. Questions are
+taken from migrations/question_bank.csv so payload sizes are realistic.
+
+Usage:
+    python -m benchmarks.bench_bandwidth --students 300 --questions 60
+    python -m benchmarks.bench_bandwidth --questions 200 --page-size 25 --link-mbps 50
+"""
+
+import argparse
+import csv
+import gzip
+import os
+import re
+
+from benchmarks.bench_submission_burst import seed
+import app as quizlab
+from compression import brotli
+from models import db, QuizQuestion
+
+BANK_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        'migrations', 'question_bank.csv')
+STATIC_URL_PATTERN = re.compile(rb'(?:href|src)="(/static/[^"]+)"')
+
+
+def load_bank_questions(questions: int):
+    """Overwrite the seeded quiz questions with real ones from the bank export."""
+    with open(BANK_CSV, newline='', encoding='utf-8') as f:
+        rows = list(csv.reader(f))
+    with quizlab.app.app_context():
+        for i, quiz_question in enumerate(QuizQuestion.query.order_by(QuizQuestion.id).limit(questions)):
+            _, question, a, b, c, d, answer, category, level = rows[i % len(rows)][:9]
+            quiz_question.question = question
+            quiz_question.option_a, quiz_question.option_b = a, b
+            quiz_question.option_c, quiz_question.option_d = c, d
+            quiz_question.correct_answer = answer
+            quiz_question.category, quiz_question.level = category, level
+        db.session.commit()
+
+
+def wire_size(response) -> int:
+    """Approximate bytes on the wire: status line, headers and body."""
+    headers = sum(len(name) + len(value) + 4 for name, value in response.headers.items())
+    return 17 + headers + len(response.data)
+
+
+class SimulatedBrowser:
+    """One student's browser: a logged-in client plus a simple HTTP cache."""
+
+    def __init__(self, student_id: int, optimized: bool):
+        self.optimized = optimized
+        self.client = quizlab.app.test_client()
+        with self.client.session_transaction() as sess:
+            sess['student_id'] = student_id
+        self.cache = {}  # url -> {'etag': ..., 'fresh': bool}
+
+    def get(self, url: str) -> tuple:
+        """
+        Fetch a URL the way a browser would.
+
+        Returns:
+            tuple: (bytes transferred, response or None if served from cache)
+        """
+        entry = self.cache.get(url)
+        if entry and entry['fresh']:
+            return 0, None
+
+        headers = {'Accept-Encoding': 'gzip, deflate, br' if self.optimized else 'identity'}
+        if entry and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        response = self.client.get(url, headers=headers)
+
+        if response.status_code == 200:
+            self.cache[url] = {
+                'etag': response.headers.get('ETag'),
+                'fresh': 'immutable' in response.headers.get('Cache-Control', '')
+            }
+        return wire_size(response), response
+
+    def load_quiz(self) -> int:
+        """Open /quiz with its static assets and every question page; returns bytes."""
+        total, page = self.get('/quiz')
+        html = page.data
+        if page.headers.get('Content-Encoding') == 'gzip':
+            html = gzip.decompress(html)
+        elif page.headers.get('Content-Encoding') == 'br':
+            html = brotli.decompress(html)
+
+        for url in STATIC_URL_PATTERN.findall(html):
+            url = url.decode()
+            if not self.optimized:
+                url = url.split('?')[0]  # Before: unversioned static URLs
+            total += self.get(url)[0]
+
+        match = re.search(rb'data-pages="(\d+)"', html)
+        for number in range(1, int(match.group(1)) + 1 if match else 1):
+            total += self.get(f'/quiz/questions?page={number}')[0]
+        return total
+
+
+def run(student_ids: list, optimized: bool) -> dict:
+    """Every student loads the quiz, then reloads it."""
+    quizlab.app.config['COMPRESSION_ENABLED'] = optimized
+    browsers = [SimulatedBrowser(sid, optimized) for sid in student_ids]
+    first = [browser.load_quiz() for browser in browsers]
+    reload = [browser.load_quiz() for browser in browsers]
+    return {'mode': 'after' if optimized else 'before', 'first': sum(first), 'reload': sum(reload),
+            'per_student': sum(first) / len(first)}
+
+
+def main():
+    """Run the scenario before and after and print transfer sizes and times."""
+    parser = argparse.ArgumentParser(description="Measure quiz page bandwidth for a whole class")
+    parser.add_argument("-s", "--students", type=int, default=300)
+    parser.add_argument("-q", "--questions", type=int, default=60)
+    parser.add_argument("--page-size", type=int, default=None, help="QUIZ_PAGE_SIZE (default: app config)")
+    parser.add_argument("--link-mbps", type=float, default=20.0, help="Shared school uplink in Mbit/s")
+    args = parser.parse_args()
+
+    if args.page_size is not None:
+        quizlab.app.config['QUIZ_PAGE_SIZE'] = args.page_size
+    student_ids = seed(args.students, args.questions)
+    load_bank_questions(args.questions)
+
+    results = [run(student_ids, False), run(student_ids, True)]
+
+    def seconds(size):
+        return size * 8 / (args.link_mbps * 1_000_000)
+
+    print(f"\n📊 {args.students} students, {args.questions}-question quiz, {args.link_mbps:g} Mbit/s link")
+    print(f"{'mode':<7} {'per student (KB)':>17} {'first load (MB)':>16} {'time (s)':>9} "
+          f"{'reload (MB)':>12} {'time (s)':>9}")
+    for r in results:
+        print(f"{r['mode']:<7} {r['per_student'] / 1024:>17.1f} {r['first'] / 1e6:>16.2f} "
+              f"{seconds(r['first']):>9.1f} {r['reload'] / 1e6:>12.2f} {seconds(r['reload']):>9.1f}")
+    saved = 1 - results[1]['first'] / results[0]['first']
+    print(f"First load transfers {saved:.0%} less data.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Question Bank Search Benchmark
+Fills a SQLite question bank with generated questions (words drawn from a
+Zipf-like vocabulary, so some terms are common and most are rare) and
+measures:
+
+1. Import time with the FTS5 index maintained by triggers vs without it.
+2. Latency of bank_search.search_questions() for one- and two-word queries,
+   first page of 20, with the FTS5 index and with the LIKE fallback used when
+   no index exists.
+
+Usage:
+    python -m benchmarks.bench_bank_search --questions 100000 --queries 50
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import text
+
+from bank_search import search_questions
+from database import create_db_app
+from models import db, QuestionBank
+
+CATEGORIES = ['Mathematics', 'Physics', 'Chemistry', 'Biology', 'Computer Science']
+LEVELS = ['Elementary', 'Middle School', 'High School']
+
+
+def make_vocabulary(rng, size):
+    """Random pronounceable words."""
+    syllables = ['ba', 'ce', 'di', 'fo', 'gu', 'ha', 'ki', 'lo', 'mu', 'ne', 'pi', 'ro', 'sa', 'te', 'vu', 'zo']
+    return sorted({''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) for _ in range(size)})
+
+
+def make_rows(rng, vocabulary, count):
+    """Question rows with Zipf-distributed words."""
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    rows = []
+    for _ in range(count):
+        words = rng.choices(vocabulary, weights, k=12 + 4 * 4)
+        rows.append({
+            'question': ' '.join(words[:12]).capitalize() + '?',
+            'option_a': ' '.join(words[12:16]), 'option_b': ' '.join(words[16:20]),
+            'option_c': ' '.join(words[20:24]), 'option_d': ' '.join(words[24:28]),
+            'correct_answer': ' '.join(words[12:16]),
+            'category': rng.choice(CATEGORIES), 'level': rng.choice(LEVELS)
+        })
+    return rows
+
+
+def import_rows(app, rows, indexed):
+    """Create the bank (with or without the search index) and insert rows; returns seconds."""
+    with app.app_context():
+        db.drop_all()
+        db.session.execute(text('DROP TABLE IF EXISTS question_bank_fts'))
+        db.session.commit()
+        db.create_all()
+        if not indexed:
+            drop_index()
+        started = time.perf_counter()
+        for start in range(0, len(rows), 5000):
+            db.session.execute(QuestionBank.__table__.insert(), rows[start:start + 5000])
+        db.session.commit()
+        return time.perf_counter() - started
+
+
+def drop_index():
+    """Remove the FTS5 table and its triggers, so searches use the LIKE fallback."""
+    for trigger in ('insert', 'delete', 'update'):
+        db.session.execute(text(f'DROP TRIGGER IF EXISTS question_bank_fts_{trigger}'))
+    db.session.execute(text('DROP TABLE IF EXISTS question_bank_fts'))
+    db.session.commit()
+
+
+def time_queries(queries):
+    """Run each query once; returns (latencies in ms, total matches)."""
+    latencies, matches = [], 0
+    for query in queries:
+        started = time.perf_counter()
+        result = search_questions(query, per_page=20)
+        latencies.append((time.perf_counter() - started) * 1000)
+        matches += result['total']
+    return latencies, matches
+
+
+def report(label, latencies, matches, queries):
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"  {label:<16} p50 {statistics.median(ordered):8.2f} ms   p95 {p95:8.2f} ms   "
+          f"max {ordered[-1]:8.2f} ms   avg matches {matches / len(queries):8.1f}")
+
+
+def main():
+    """Compare import cost and search latency with and without the FTS5 index."""
+    parser = argparse.ArgumentParser(description="Full-text search vs LIKE over a generated question bank")
+    parser.add_argument("-n", "--questions", type=int, default=100000)
+    parser.add_argument("--vocabulary", type=int, default=5000, help="Distinct words")
+    parser.add_argument("--queries", type=int, default=50, help="Queries per kind")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(rng, args.vocabulary)
+    rows = make_rows(rng, vocabulary, args.questions)
+    workdir = tempfile.mkdtemp(prefix='quizlab-search-')
+    app = create_db_app(type('BenchConfig', (object,), {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False
+    }))
+
+    # Query terms from the whole frequency range, rare words most often
+    single = [rng.choice(vocabulary) for _ in range(args.queries)]
+    common = vocabulary[:50]
+    double = [f"{rng.choice(common)} {rng.choice(vocabulary)}" for _ in range(args.queries)]
+
+    plain_import = import_rows(app, rows, indexed=False)
+    indexed_import = import_rows(app, rows, indexed=True)
+
+    print(f"\n📊 {args.questions} questions, {len(vocabulary)}-word vocabulary")
+    print(f"  import without index:  {plain_import:7.2f} s")
+    print(f"  import with FTS5:      {indexed_import:7.2f} s")
+
+    with app.app_context():
+        time_queries(single[:5])  # Warm the page cache
+        results = {kind: time_queries(queries) for kind, queries in (('one word', single), ('two words', double))}
+        drop_index()
+        time_queries(single[:5])
+        fallback = {kind: time_queries(queries) for kind, queries in (('one word', single), ('two words', double))}
+
+    for kind, queries in (('one word', single), ('two words', double)):
+        print(f"\n  {kind} queries:")
+        report('FTS5 + bm25', *results[kind], queries)
+        report('LIKE fallback', *fallback[kind], queries)
+
+
+if __name__ == "__main__":
+    main()
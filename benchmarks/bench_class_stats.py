@@ -0,0 +1,102 @@
+"""
+Class Statistics Benchmark
+Time to compute per-group, per-category statistics for one teacher as the
+number of results grows: reparsing every Result's "correct/total" strings
+vs reading the incrementally maintained class_statistics summary. Also
+reports what maintaining the summary adds to each submission transaction.
+
+Usage:
+    python -m benchmarks.bench_class_stats --sizes 100,1000,10000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from class_stats import class_statistics, rebuild_class_statistics, record_results, summarize_results
+from database import create_db_app
+from models import db, Teacher, Student, Result, Quiz
+
+FIELDS = ['mathematics', 'physics', 'chemistry', 'biology', 'computer_science']
+GROUPS = ['A', 'B', 'C', 'D']
+
+
+def result_data(rng, student_id, quiz_id, group):
+    """Random result with 10 questions per category."""
+    scores = [rng.randint(0, 10) for _ in FIELDS]
+    data = {field: f"{score}/10" for field, score in zip(FIELDS, scores)}
+    data.update(student_id=student_id, quiz_id=quiz_id, name=f'Student {student_id}', group=group,
+                total=f"{sum(scores)}/{10 * len(FIELDS)}")
+    return data
+
+
+def seed(app, results, rng):
+    """Create one teacher with a quiz and `results` students who took it."""
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        teacher = Teacher(name='Bench', email='bench@example.com', school='Bench', username='bench', password='-')
+        db.session.add(teacher)
+        db.session.flush()
+        quiz = Quiz(teacher_id=teacher.id)
+        db.session.add(quiz)
+        db.session.flush()
+        db.session.execute(Student.__table__.insert(), [
+            {'id': i + 1, 'name': f'Student {i}', 'group': GROUPS[i % len(GROUPS)], 'username': f'bench{i}',
+             'password': '-', 'teacher_id': teacher.id} for i in range(results)
+        ])
+        db.session.execute(Result.__table__.insert(), [
+            result_data(rng, i + 1, quiz.id, GROUPS[i % len(GROUPS)]) for i in range(results)
+        ])
+        rebuild_class_statistics()
+        db.session.commit()
+        return teacher.id, quiz.id
+
+
+def reparse(teacher_id):
+    """Statistics the way they would be computed without the summary table."""
+    rows = Result.query.join(Student, Result.student_id == Student.id)\
+        .filter(Student.teacher_id == teacher_id).all()
+    return summarize_results((teacher_id, row) for row in rows)
+
+
+def timed(function, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - started) * 1000 / repeat
+
+
+def main():
+    """Compare reparsing results with summary reads for growing classes."""
+    parser = argparse.ArgumentParser(description="Class statistics: reparse vs incremental summary")
+    parser.add_argument("--sizes", default="100,1000,10000", help="Comma-separated result counts")
+    parser.add_argument("-r", "--repeat", type=int, default=20, help="Reads timed per size")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    workdir = tempfile.mkdtemp(prefix='quizlab-stats-')
+    app = create_db_app(type('BenchConfig', (object,), {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False
+    }))
+
+    print(f"\n📊 Statistics for one teacher, {len(GROUPS)} groups x 6 categories, mean of {args.repeat} reads")
+    print(f"{'results':>8} {'reparse (ms)':>13} {'summary (ms)':>13} {'speedup':>8} {'submit upkeep (ms)':>19}")
+    for size in [int(size) for size in args.sizes.split(',')]:
+        teacher_id, quiz_id = seed(app, size, rng)
+        with app.app_context():
+            parsed = timed(lambda: reparse(teacher_id), args.repeat)
+            summary = timed(lambda: class_statistics(teacher_id), args.repeat)
+
+            def upkeep():
+                record_results([(teacher_id, result_data(rng, 1, quiz_id, 'A'))])
+                db.session.rollback()
+            submit = timed(upkeep, args.repeat)
+        print(f"{size:>8} {parsed:>13.2f} {summary:>13.2f} {parsed / summary:>7.0f}x {submit:>19.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Endpoint Pool Benchmark
+Starts several stub Ollama servers (benchmarks/stub_ollama.py) on different
+ports, each serving one generation at a time like Ollama on a CPU host and
+one of them slower, and runs concurrent quiz generations through an
+EndpointPool:
+
+1. Balancing: throughput with one endpoint vs the pool, and how
+   least-outstanding-requests routing spreads calls (the slow host gets fewer).
+2. Failover: one endpoint is killed mid-run and restarted a few seconds
+   later. Generations should not fail; the endpoint is ejected and returns
+   after its ejection period.
+
+Usage:
+    python -m benchmarks.bench_endpoint_pool --latencies 0.5,0.5,1.5 --generations 60
+"""
+
+import argparse
+import contextlib
+import io
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ai_quiz import QuizGenerator
+from benchmarks.bench_async_generation import free_port
+from llm_backends import EndpointPool, OllamaGenerateBackend
+
+CATEGORIES = ['Mathematics', 'Physics', 'Chemistry', 'Biology', 'Computer Science']
+
+
+class StubProcess:
+    """A stub Ollama server in a child process that can be stopped and restarted on its port."""
+
+    def __init__(self, latency: float, parallel: int = 1):
+        self.latency = latency
+        self.parallel = parallel
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.process = None
+
+    def start(self):
+        self.process = subprocess.Popen([sys.executable, '-m', 'benchmarks.stub_ollama', '--port', str(self.port),
+                                         '--latency', str(self.latency), '--parallel', str(self.parallel)],
+                                        stdout=subprocess.PIPE, text=True)
+        self.process.stdout.readline()  # Wait until it listens
+
+    def stop(self):
+        if self.process:
+            self.process.terminate()
+            self.process.wait()
+            self.process = None
+
+
+def run(backend, generations: int, threads: int, questions: int) -> dict:
+    """Run concurrent generations; returns throughput, errors and captured pool messages."""
+    generator = QuizGenerator(backend=backend)
+    errors = []
+
+    def generate(i):
+        try:
+            generator.generate_quiz(questions, CATEGORIES[i % len(CATEGORIES)], 'High School', max_attempts=1)
+        except Exception as e:
+            errors.append(e)
+
+    output = io.StringIO()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(output):  # Silence per-generation progress lines
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(generate, range(generations)))
+    elapsed = time.perf_counter() - started
+    events = [line for line in output.getvalue().splitlines() if 'AI endpoint' in line]
+    return {'throughput': generations / elapsed, 'elapsed': elapsed, 'errors': errors, 'events': events}
+
+
+def print_status(pool: EndpointPool, stubs: list):
+    print(f"  {'endpoint':<24} {'latency':>8} {'requests':>9} {'errors':>7} {'healthy':>8}")
+    for stub, status in zip(stubs, pool.status()):
+        print(f"  {status['url']:<24} {stub.latency:>7g}s {status['requests']:>9} {status['errors']:>7} "
+              f"{'yes' if status['healthy'] else 'no':>8}")
+
+
+def main():
+    """Run the balancing and failover scenarios."""
+    parser = argparse.ArgumentParser(description="Load balancing and failover across stub Ollama servers")
+    parser.add_argument("--latencies", default="0.5,0.5,1.5", help="Comma-separated stub latencies (seconds)")
+    parser.add_argument("--parallel", type=int, default=1, help="Generations each stub serves at once")
+    parser.add_argument("-n", "--generations", type=int, default=60, help="Generations per run")
+    parser.add_argument("-t", "--threads", type=int, default=12, help="Concurrent generations")
+    parser.add_argument("-q", "--questions", type=int, default=5, help="Questions per generation")
+    parser.add_argument("--kill-after", type=float, default=1.0, help="Seconds before killing an endpoint")
+    parser.add_argument("--down-for", type=float, default=3.0, help="Seconds the endpoint stays down")
+    parser.add_argument("--eject-seconds", type=float, default=2.0, help="Pool ejection period")
+    args = parser.parse_args()
+
+    stubs = [StubProcess(float(latency), args.parallel) for latency in args.latencies.split(',')]
+    for stub in stubs:
+        stub.start()
+
+    def make_pool():
+        return EndpointPool([OllamaGenerateBackend(base_url=stub.url) for stub in stubs],
+                            eject_seconds=args.eject_seconds)
+
+    try:
+        print(f"📊 {args.generations} generations, {args.threads} at a time, "
+              f"stubs with latencies {args.latencies} s")
+
+        single = run(OllamaGenerateBackend(base_url=stubs[0].url), args.generations, args.threads, args.questions)
+        pool = make_pool()
+        pooled = run(pool, args.generations, args.threads, args.questions)
+        print("\n1. Balancing")
+        print(f"  single endpoint: {single['throughput']:.1f} gen/s, {len(single['errors'])} errors")
+        print(f"  pool of {len(stubs)}:       {pooled['throughput']:.1f} gen/s, {len(pooled['errors'])} errors "
+              f"({pooled['throughput'] / single['throughput']:.1f}x)")
+        print_status(pool, stubs)
+
+        pool = make_pool()
+        victim = stubs[0]
+
+        def outage():
+            time.sleep(args.kill_after)
+            victim.stop()
+            time.sleep(args.down_for)
+            victim.start()
+
+        chaos = threading.Thread(target=outage)
+        chaos.start()
+        failover = run(pool, args.generations * 2, args.threads, args.questions)
+        chaos.join()
+        # The restarted endpoint rejoins with the first request after its ejection expires
+        time.sleep(max(status['ejected_for'] for status in pool.status()))
+        pool.check_connection()
+        run(pool, args.threads, args.threads, args.questions)
+
+        print(f"\n2. Failover: {victim.url} down from {args.kill_after:g}s for {args.down_for:g}s")
+        print(f"  {failover['throughput']:.1f} gen/s, {len(failover['errors'])} failed generations")
+        for event in failover['events']:
+            print(f"  {event}")
+        print_status(pool, stubs)
+    finally:
+        for stub in stubs:
+            stub.stop()
+
+
+if __name__ == "__main__":
+    main()
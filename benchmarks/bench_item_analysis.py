@@ -0,0 +1,157 @@
+"""
+Item Analysis Benchmark
+Simulates a school's responses to question bank items with a two-parameter
+logistic model (student ability, item difficulty and discrimination; a few
+items are deliberately broken: they discriminate negatively or not at all),
+stores them as QuestionResponse rows and runs the item analysis:
+
+1. Time to load the responses, compute the statistics with NumPy and write
+   them to QuestionBank.
+2. Agreement with a straightforward per-item reference (np.corrcoef per item).
+3. Whether the broken items are the ones flagged for retirement.
+
+Usage:
+    python -m benchmarks.bench_item_analysis --students 2000 --questions 50 --quizzes 4
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from database import create_db_app
+from item_analysis import analyze_items, load_responses, run_item_analysis
+from models import db, Teacher, Student, Quiz, QuizQuestion, QuestionBank, QuestionResponse
+
+
+def simulate(rng, students, questions, quizzes, bank_size, broken):
+    """
+    Draw responses: each student takes one quiz of `questions` bank items.
+
+    Returns:
+        tuple: (quiz_items, responses) with quiz_items[q] the bank indexes of quiz q
+            and responses a list of (student, quiz, position, choice, correct)
+    """
+    difficulty = rng.normal(0, 1, bank_size)
+    slope = rng.uniform(0.8, 2.0, bank_size)
+    slope[:broken] = np.where(np.arange(broken) % 2 == 0, -1.5, 0.0)  # Broken items
+    quiz_items = [rng.choice(bank_size, questions, replace=False) for _ in range(quizzes)]
+
+    ability = rng.normal(0, 1, students)
+    quiz_of = np.arange(students) % quizzes
+    items = np.stack([quiz_items[q] for q in quiz_of])
+    p = 1 / (1 + np.exp(-slope[items] * (ability[:, None] - difficulty[items])))
+    correct = rng.random(p.shape) < p
+    # Correct answer is option 0; wrong answers pick a distractor (or skip) with uneven popularity
+    wrong = rng.choice([1, 2, 3, -1], size=p.shape, p=[0.5, 0.3, 0.15, 0.05])
+    choice = np.where(correct, 0, wrong)
+    return quiz_items, quiz_of, choice, correct
+
+
+def seed(app, rng, args):
+    """Create the bank, quizzes, students and responses; returns the broken bank IDs."""
+    quiz_items, quiz_of, choice, correct = simulate(rng, args.students, args.questions, args.quizzes,
+                                                    args.bank, args.broken)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.execute(QuestionBank.__table__.insert(), [
+            {'id': i + 1, 'question': f'Q{i}', 'option_a': 'right', 'option_b': 'b', 'option_c': 'c',
+             'option_d': 'd', 'correct_answer': 'right', 'category': 'Mathematics', 'level': 'High School'}
+            for i in range(args.bank)
+        ])
+        teacher = Teacher(name='Bench', email='bench@example.com', school='Bench', username='bench', password='-')
+        db.session.add(teacher)
+        db.session.flush()
+        question_ids = []
+        for q, items in enumerate(quiz_items):
+            quiz = Quiz(teacher_id=teacher.id, version=q + 1)
+            db.session.add(quiz)
+            db.session.flush()
+            rows = [QuizQuestion(quiz_id=quiz.id, question=f'Q{item}', option_a='right', option_b='b',
+                                 option_c='c', option_d='d', correct_answer='right', category='Mathematics',
+                                 level='High School', source='BANK', bank_question_id=int(item) + 1,
+                                 order_index=j) for j, item in enumerate(items)]
+            db.session.add_all(rows)
+            db.session.flush()
+            question_ids.append((quiz.id, [row.id for row in rows]))
+        db.session.execute(Student.__table__.insert(), [
+            {'id': s + 1, 'name': f'S{s}', 'group': 'A', 'username': f's{s}', 'password': '-',
+             'teacher_id': teacher.id} for s in range(args.students)
+        ])
+        db.session.execute(QuestionResponse.__table__.insert(), [
+            {'student_id': s + 1, 'quiz_id': question_ids[quiz_of[s]][0],
+             'quiz_question_id': question_ids[quiz_of[s]][1][j], 'choice': int(choice[s, j]),
+             'correct': bool(correct[s, j])}
+            for s in range(args.students) for j in range(args.questions)
+        ])
+        db.session.commit()
+    return set(range(1, args.broken + 1))
+
+
+def reference(item_ids, attempt_ids, correct):
+    """Corrected point-biserial per item, one item at a time."""
+    attempts = {}
+    for attempt, x in zip(attempt_ids.tolist(), correct.tolist()):
+        total, size = attempts.get(attempt, (0, 0))
+        attempts[attempt] = (total + x, size + 1)
+    values = {}
+    for item in np.unique(item_ids):
+        mask = item_ids == item
+        x = correct[mask].astype(float)
+        rest = np.array([(attempts[a][0] - xi) / (attempts[a][1] - 1)
+                         for a, xi in zip(attempt_ids[mask].tolist(), x.tolist())])
+        values[int(item)] = np.corrcoef(x, rest)[0, 1] if x.std() and rest.std() else np.nan
+    return values
+
+
+def main():
+    """Time the analysis and check it against the reference and the simulated broken items."""
+    parser = argparse.ArgumentParser(description="Vectorized item analysis over simulated responses")
+    parser.add_argument("-s", "--students", type=int, default=2000)
+    parser.add_argument("-q", "--questions", type=int, default=50, help="Questions per quiz")
+    parser.add_argument("--quizzes", type=int, default=4, help="Quiz versions drawn from the bank")
+    parser.add_argument("--bank", type=int, default=150, help="Question bank size")
+    parser.add_argument("--broken", type=int, default=6, help="Items with negative or no discrimination")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    workdir = tempfile.mkdtemp(prefix='quizlab-items-')
+    app = create_db_app(type('BenchConfig', (object,), {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False
+    }))
+    broken = seed(app, rng, args)
+
+    with app.app_context():
+        started = time.perf_counter()
+        arrays = load_responses()
+        loaded = time.perf_counter() - started
+        started = time.perf_counter()
+        analysis = analyze_items(*arrays)
+        computed = time.perf_counter() - started
+        summary = run_item_analysis(min_responses=30, min_discrimination=0.1, retire=True)
+
+        item_ids, attempt_ids, _, correct = arrays
+        started = time.perf_counter()
+        expected = reference(item_ids, attempt_ids, correct)
+        slow = time.perf_counter() - started
+        got = dict(zip(analysis['items'].tolist(), analysis['discrimination'].tolist()))
+        error = max(abs(got[item] - value) for item, value in expected.items() if not np.isnan(value))
+
+    flagged = set(summary['flagged'])
+    print(f"\n📊 {summary['responses']} responses to {summary['items']} bank items "
+          f"({args.students} students, {args.quizzes} quizzes of {args.questions})")
+    print(f"  load responses:          {loaded * 1000:8.1f} ms")
+    print(f"  NumPy analysis:          {computed * 1000:8.1f} ms")
+    print(f"  full run incl. writes:   {summary['seconds'] * 1000:8.1f} ms")
+    print(f"  per-item reference:      {slow * 1000:8.1f} ms (max difference {error:.2e})")
+    print(f"  flagged {len(flagged)} items, {len(flagged & broken)} of {len(broken & set(got))} broken items "
+          f"in use; {summary['retired']} retired")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Question Index Benchmark
+Builds a question bank in which questions come in families of near-identical
+variants (the same question with a few words changed, as happens when banks
+are merged or questions are regenerated) and measures the semantic index:
+
+1. Embedding throughput, and an incremental update after importing 1% new
+   questions vs re-embedding the whole bank.
+2. "More like this" latency on the memory-mapped vectors.
+3. Near-identical pairs (same family) in 20-question quizzes drawn at random
+   vs with diverse_sample(), and the time diverse_sample() adds.
+
+The default `hashing` encoder needs no model; pass `--backend transformers`
+to measure the sentence-embedding model (CPU inference).
+
+Usage:
+    python -m benchmarks.bench_question_index --questions 20000 --backend hashing
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from database import create_db_app
+from models import db, QuestionBank
+from question_index import QuestionIndex, create_encoder, update_question_index
+
+WORDS = ('cell energy plant light water atom force motion heat charge number fraction angle area graph '
+         'memory program data loop variable orbit planet gravity acid base metal gas liquid solid wave '
+         'sound speed mass volume density circuit current voltage gene protein sugar oxygen carbon').split()
+
+
+def make_bank(rng, count, family_size):
+    """Question rows and the family of each; families have 1 to family_size variants."""
+    rows, families = [], []
+    family = 0
+    while len(rows) < count:
+        base = rng.sample(WORDS, 9)
+        answer = rng.choice(WORDS)
+        for _ in range(min(rng.randint(1, family_size), count - len(rows))):
+            words = list(base)
+            words[rng.randrange(len(words))] = rng.choice(WORDS)  # Variant: one word changed
+            rows.append({
+                'question': f"Which {' '.join(words)} is correct?",
+                'option_a': answer, 'option_b': rng.choice(WORDS), 'option_c': rng.choice(WORDS),
+                'option_d': rng.choice(WORDS), 'correct_answer': answer,
+                'category': 'Physics', 'level': 'High School'
+            })
+            families.append(family)
+        family += 1
+    return rows, families
+
+
+def duplicate_pairs(drawn, family_of):
+    """Number of question pairs in a quiz that belong to the same family."""
+    counts = {}
+    for question_id in drawn:
+        counts[family_of[question_id]] = counts.get(family_of[question_id], 0) + 1
+    return sum(n * (n - 1) // 2 for n in counts.values())
+
+
+def main():
+    """Time the index and compare random and diverse quiz sampling."""
+    parser = argparse.ArgumentParser(description="Semantic question index: build, lookups and diverse sampling")
+    parser.add_argument("-n", "--questions", type=int, default=20000)
+    parser.add_argument("--backend", choices=['hashing', 'transformers'], default='hashing')
+    parser.add_argument("--model", help="Model for the transformers backend")
+    parser.add_argument("--family-size", type=int, default=6, help="Most variants of one question")
+    parser.add_argument("--pool", type=int, default=300, help="Questions of one category and level")
+    parser.add_argument("--quiz", type=int, default=20, help="Questions per quiz")
+    parser.add_argument("--quizzes", type=int, default=200, help="Quizzes drawn per method")
+    parser.add_argument("--threshold", type=float, help="Defaults to 0.7 for hashing, 0.85 for transformers")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.threshold is None:
+        args.threshold = 0.7 if args.backend == 'hashing' else 0.85
+    rng = random.Random(args.seed)
+    rows, families = make_bank(rng, args.questions, args.family_size)
+    workdir = tempfile.mkdtemp(prefix='quizlab-index-')
+    app = create_db_app(type('BenchConfig', (object,), {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False
+    }))
+    encoder = create_encoder(args.backend, args.model)
+    index = QuestionIndex(os.path.join(workdir, 'question_index'), args.threshold)
+    new_rows = max(1, len(rows) // 100)
+
+    with app.app_context():
+        db.create_all()
+        db.session.execute(QuestionBank.__table__.insert(), rows[:-new_rows])
+        db.session.commit()
+        initial = update_question_index(index, encoder)
+        db.session.execute(QuestionBank.__table__.insert(), rows[-new_rows:])
+        db.session.commit()
+        incremental = update_question_index(index, encoder)
+        rebuild = update_question_index(index, encoder, rebuild=True)
+        family_of = dict(zip(db.session.execute(db.select(QuestionBank.id).order_by(QuestionBank.id))
+                             .scalars(), families))
+
+    print(f"\n📊 {len(rows)} questions in {len(set(families))} families, encoder {encoder.model_id} "
+          f"({encoder.dim} dimensions)")
+    print(f"  initial build:            {initial['seconds']:8.2f} s ({initial['added'] / initial['seconds']:.0f} questions/s)")
+    print(f"  +{new_rows} new, incremental:  {incremental['seconds']:8.2f} s ({incremental['added']} embedded)")
+    print(f"  +{new_rows} new, full rebuild: {rebuild['seconds']:8.2f} s ({rebuild['added']} embedded)")
+
+    ids = list(family_of)
+    latencies = []
+    for question_id in rng.sample(ids, 200):
+        started = time.perf_counter()
+        index.similar(question_id, 10)
+        latencies.append((time.perf_counter() - started) * 1000)
+    print(f"  more like this (k=10):    p50 {statistics.median(latencies):.2f} ms, max {max(latencies):.2f} ms")
+
+    # A category/level pool is a run of consecutive IDs, so families stay together
+    start = rng.randrange(len(ids) - args.pool)
+    pool = ids[start:start + args.pool]
+    random_pairs, diverse_pairs, sample_ms = [], [], []
+    for _ in range(args.quizzes):
+        random_pairs.append(duplicate_pairs(rng.sample(pool, args.quiz), family_of))
+        started = time.perf_counter()
+        drawn = index.diverse_sample(pool, args.quiz, rng=rng)
+        sample_ms.append((time.perf_counter() - started) * 1000)
+        diverse_pairs.append(duplicate_pairs(drawn, family_of))
+    print(f"\n  {args.quizzes} quizzes of {args.quiz} from a pool of {args.pool} (threshold {args.threshold}):")
+    print(f"  random:          {statistics.mean(random_pairs):5.2f} near-identical pairs per quiz, "
+          f"{sum(1 for n in random_pairs if n) / args.quizzes:.0%} of quizzes affected")
+    print(f"  diverse_sample:  {statistics.mean(diverse_pairs):5.2f} near-identical pairs per quiz, "
+          f"{sum(1 for n in diverse_pairs if n) / args.quizzes:.0%} of quizzes affected, "
+          f"{statistics.median(sample_ms):.2f} ms per quiz")
+
+
+if __name__ == "__main__":
+    main()
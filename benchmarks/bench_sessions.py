@@ -0,0 +1,95 @@
+"""
+Session Store Benchmark
+A teacher uploads a roster, then keeps browsing. Compares the session
+cookie and per-request cost with the password sheet kept in the signed
+cookie (the old behavior: SERVER_SIDE_SESSIONS=false plus the sheet in the
+session) against server-side sessions in the SQLite and filesystem stores.
+
+Browsers drop cookies larger than about 4 KB, so with cookie sessions a
+roster of more than a few dozen students silently loses the sheet.
+
+Usage:
+    python -m benchmarks.bench_sessions --students 300 --requests 500
+"""
+
+import argparse
+import contextlib
+import io
+import logging
+import os
+import tempfile
+import time
+import warnings
+
+import app as quizlab
+from config import Config
+from models import db, Teacher
+from werkzeug.security import generate_password_hash
+
+COOKIE_LIMIT = 4093  # bytes browsers keep per cookie
+
+
+def roster_csv(students: int, offset: int) -> bytes:
+    rows = ['exp,name,group'] + [f'bench{offset + i},Student {i},A' for i in range(students)]
+    return '\n'.join(rows).encode()
+
+
+def run(mode: str, students: int, requests: int) -> dict:
+    """Upload a roster and time follow-up requests with one session configuration."""
+    workdir = tempfile.mkdtemp(prefix='quizlab-sessions-')
+    overrides = {
+        'SECRET_KEY': 'bench-sessions',
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        'SERVER_SIDE_SESSIONS': mode != 'cookie',
+        'SESSION_STORE': 'filesystem' if mode == 'filesystem' else 'sqlite',
+        'SESSION_STORE_LOCATION': os.path.join(workdir, 'sessions' if mode == 'filesystem' else 'sessions.db'),
+        'AI_WARMUP_ON_STARTUP': False,
+        'SUBMISSION_WRITE_BEHIND': False
+    }
+    app = quizlab.create_app(type('BenchConfig', (Config,), overrides))
+    with app.app_context():
+        db.create_all()
+        db.session.add(Teacher(name='Bench', email='bench@example.com', school='Bench', username='bench',
+                               password=generate_password_hash('bench')))
+        db.session.commit()
+
+    client = app.test_client()
+    client.post('/login', data={'username': 'bench', 'password': 'bench'})
+    client.post('/upload', data={'file': (io.BytesIO(roster_csv(students, 0)), 'roster.csv')},
+                headers={'X-Requested-With': 'XMLHttpRequest'}, content_type='multipart/form-data')
+    if mode == 'cookie':
+        # The old /upload stored the whole sheet in the session
+        with client.session_transaction() as session:
+            token = session.pop('password_sheet')
+            sheet = app.extensions['session_store'].take_blob(token)
+            session['passwords_to_deliver'] = sheet['rows']
+    cookie = client.get_cookie('session').value
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        client.get('/teacher')
+    elapsed = time.perf_counter() - started
+    return {'mode': mode, 'cookie': len(cookie), 'ms': elapsed * 1000 / requests}
+
+
+def main():
+    """Compare cookie and server-side sessions."""
+    parser = argparse.ArgumentParser(description="Session cookie size and per-request cost")
+    parser.add_argument("-s", "--students", type=int, default=300, help="Students in the uploaded roster")
+    parser.add_argument("-r", "--requests", type=int, default=500, help="Requests timed after the upload")
+    args = parser.parse_args()
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    warnings.filterwarnings('ignore', message="The 'session' cookie is too large")  # Reported below
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = [run(mode, args.students, args.requests) for mode in ('cookie', 'sqlite', 'filesystem')]
+
+    print(f"\n📊 Roster of {args.students} students, {args.requests} requests afterwards")
+    print(f"{'sessions':<12} {'cookie (bytes)':>15} {'kept by browsers':>17} {'ms/request':>11}")
+    for r in results:
+        print(f"{r['mode']:<12} {r['cookie']:>15} {'yes' if r['cookie'] <= COOKIE_LIMIT else 'NO':>17} "
+              f"{r['ms']:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Startup Benchmark
+Measures cold start in fresh interpreters, as when workers are scaled up:
+importing the web module, building the app with create_app(), opening the
+DB-only context used by CLI scripts, and the one-off cost of the first AI
+request (when the lazily imported AI modules are loaded).
+
+Each scenario runs in a new Python process several times; the median is
+reported together with the number of modules loaded.
+
+Usage:
+    python -m benchmarks.bench_startup --runs 7
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    'import app': "import app",
+    'worker: create_app()': "import app; app.create_app()",
+    'cli: create_db_app()': "from database import create_db_app; create_db_app().app_context().push()",
+    'first AI request': "import app; a = app.create_app()\n"
+                        "with a.app_context():\n"
+                        "    mark('ai')\n"
+                        "    app.get_quiz_generator()",
+}
+
+# Wraps a scenario: times it from interpreter start-up to completion
+HARNESS = """
+import json, sys, time
+started = time.perf_counter()
+marks = {{}}
+def mark(name):
+    marks[name] = time.perf_counter()
+{code}
+finished = time.perf_counter()
+result = {{'seconds': finished - started, 'modules': len(sys.modules)}}
+if 'ai' in marks:
+    result['seconds'] = finished - marks['ai']
+print(json.dumps(result))
+"""
+
+
+def run_once(code: str, env: dict) -> dict:
+    """Run one scenario in a fresh interpreter and return its measurements."""
+    output = subprocess.run(
+        [sys.executable, '-c', HARNESS.format(code=code)],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    """Run every scenario and print median timings."""
+    parser = argparse.ArgumentParser(description="Measure import and app startup time")
+    parser.add_argument("-r", "--runs", type=int, default=7, help="Fresh interpreters per scenario")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='quizlab-startup-')
+    env = {
+        **os.environ,
+        'DATABASE_URL': os.environ.get('DATABASE_URL', f"sqlite:///{os.path.join(workdir, 'startup.db')}"),
+        'SECRET_KEY': 'benchmark',
+        'AI_BACKEND': os.environ.get('AI_BACKEND', 'fake'),
+        'AI_WARMUP_ON_STARTUP': 'false',
+        'SUBMISSION_WRITE_BEHIND': 'false'
+    }
+
+    # Warm the filesystem cache and bytecode so every run measures the same thing
+    run_once(SCENARIOS['worker: create_app()'], env)
+
+    print(f"\n📊 Median of {args.runs} fresh interpreters")
+    print(f"{'scenario':<22} {'median (ms)':>12} {'min (ms)':>9} {'modules':>8}")
+    for name, code in SCENARIOS.items():
+        runs = [run_once(code, env) for _ in range(args.runs)]
+        seconds = [r['seconds'] for r in runs]
+        print(f"{name:<22} {statistics.median(seconds) * 1000:>12.0f} {min(seconds) * 1000:>9.0f} "
+              f"{runs[0]['modules']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Structured Output Benchmark
+Compares free-text and JSON (schema-constrained) generation side by side:
+API calls needed, usable questions per call, latency and parse time.
+
+Usage:
+    python -m benchmarks.bench_structured_output --runs 20 --questions 10
+    python -m benchmarks.bench_structured_output --backend ollama --runs 3
+"""
+
+import argparse
+import statistics
+import time
+
+from ai_quiz import QuizGenerator
+from llm_backends import BACKENDS, FakeBackend, create_backend
+
+
+class TimedQuizGenerator(QuizGenerator):
+    """QuizGenerator that records API calls and time spent waiting on the backend."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.api_calls = 0
+        self.api_time = 0.0
+
+    def call_api(self, prompt: str, format=None) -> str:
+        started = time.perf_counter()
+        try:
+            return super().call_api(prompt, format=format)
+        finally:
+            self.api_calls += 1
+            self.api_time += time.perf_counter() - started
+
+
+def run_mode(backend, structured: bool, runs: int, num_questions: int, category: str, level: str) -> dict:
+    """
+    Generate `runs` quizzes in one mode and aggregate the measurements.
+
+    Returns:
+        dict: Summary statistics for the mode
+    """
+    latencies, parse_times, calls, yields = [], [], [], []
+
+    for _ in range(runs):
+        generator = TimedQuizGenerator(backend=backend, structured=structured)
+        started = time.perf_counter()
+        questions = generator.generate_quiz(num_questions, category, level)
+        elapsed = time.perf_counter() - started
+
+        latencies.append(elapsed)
+        parse_times.append(elapsed - generator.api_time)
+        calls.append(generator.api_calls)
+        yields.append(len(questions) / generator.api_calls if generator.api_calls else 0)
+
+    return {
+        'mode': 'json' if structured else 'text',
+        'mean_latency_s': statistics.mean(latencies),
+        'mean_parse_ms': statistics.mean(parse_times) * 1000,
+        'mean_api_calls': statistics.mean(calls),
+        'questions_per_call': statistics.mean(yields)
+    }
+
+
+def main():
+    """Run both modes and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Compare free-text and structured JSON generation")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="fake")
+    parser.add_argument("--model", default=None)
+    parser.add_argument("--url", default=None)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("-q", "--questions", type=int, default=10)
+    parser.add_argument("-c", "--category", default="Physics")
+    parser.add_argument("-l", "--level", default="High School")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake backend latency per call (s)")
+    parser.add_argument("--malformed-rate", type=float, default=0.2, help="Fake backend malformed question rate")
+    args = parser.parse_args()
+
+    if args.backend == "fake":
+        backend = FakeBackend(latency=args.latency, malformed_rate=args.malformed_rate, seed=1)
+    else:
+        backend = create_backend(args.backend, model=args.model, base_url=args.url)
+
+    results = [
+        run_mode(backend, False, args.runs, args.questions, args.category, args.level),
+        run_mode(backend, True, args.runs, args.questions, args.category, args.level)
+    ]
+
+    print(f"\n📊 {args.runs} runs x {args.questions} questions ({args.backend} backend)")
+    print(f"{'mode':<6} {'latency (s)':>12} {'parse (ms)':>11} {'API calls':>10} {'questions/call':>15}")
+    for r in results:
+        print(f"{r['mode']:<6} {r['mean_latency_s']:>12.3f} {r['mean_parse_ms']:>11.2f} "
+              f"{r['mean_api_calls']:>10.2f} {r['questions_per_call']:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
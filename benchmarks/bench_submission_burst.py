@@ -0,0 +1,164 @@
+"""
+Submission Burst Benchmark
+Simulates a class submitting at the bell: N students post /submit_quiz at
+once, first with direct per-request commits, then with the write-behind
+journal. Reports acknowledgement latency, database commits and the time
+until every result is stored.
+
+Usage:
+    python -m benchmarks.bench_submission_burst --students 200 --threads 50
+    DATABASE_URL=postgresql://... python -m benchmarks.bench_submission_burst
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Configure a throwaway database before the app module reads its config
+_workdir = tempfile.mkdtemp(prefix='quizlab-burst-')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(_workdir, 'bench.db')}")
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ['SUBMISSION_WRITE_BEHIND'] = 'false'
+
+from sqlalchemy import event
+
+import app as quizlab
+from models import db, Teacher, Student, Result, Quiz, QuizQuestion
+from submission_queue import SubmissionJournal, SubmissionWriter
+
+CATEGORIES = ['Mathematics', 'Physics', 'Chemistry', 'Biology', 'Computer Science']
+
+
+def seed(students: int, questions: int) -> list:
+    """
+    Create one teacher, an active quiz and `students` students.
+
+    Returns:
+        list: Student IDs
+    """
+    with quizlab.app.app_context():
+        db.drop_all()
+        db.create_all()
+        teacher = Teacher(name='Bench', email='bench@example.com', school='Bench',
+                          username='bench', password='x')
+        db.session.add(teacher)
+        db.session.flush()
+
+        quiz = Quiz(teacher_id=teacher.id, name='Burst Quiz')
+        db.session.add(quiz)
+        db.session.flush()
+        for i in range(questions):
+            db.session.add(QuizQuestion(
+                quiz_id=quiz.id, question=f'Question {i}?', option_a='A', option_b='B',
+                option_c='C', option_d='D', correct_answer='A',
+                category=CATEGORIES[i % len(CATEGORIES)], level='High School',
+                source='BANK', order_index=i
+            ))
+
+        rows = [Student(teacher_id=teacher.id, name=f'Student {i}', group='A',
+                        username=f'burst{i}', password='x') for i in range(students)]
+        db.session.add_all(rows)
+        db.session.commit()
+        return [student.id for student in rows]
+
+
+def reset_results():
+    """Remove all results between runs."""
+    with quizlab.app.app_context():
+        Result.query.delete()
+        db.session.commit()
+
+
+def count_results() -> int:
+    with quizlab.app.app_context():
+        return Result.query.count()
+
+
+def submit(student_id: int, answers: dict) -> float:
+    """Log in as one student (via the session cookie) and submit; returns latency."""
+    client = quizlab.app.test_client()
+    with client.session_transaction() as sess:
+        sess['student_id'] = student_id
+    started = time.perf_counter()
+    response = client.post('/submit_quiz', data=answers)
+    elapsed = time.perf_counter() - started
+    if not response.get_json().get('success'):
+        raise RuntimeError(response.get_json().get('message'))
+    return elapsed
+
+
+def run_burst(student_ids: list, questions: int, threads: int, writer=None) -> dict:
+    """
+    Submit once per student concurrently and wait until all results are stored.
+
+    Returns:
+        dict: Measurements for the run
+    """
+    reset_results()
+    quizlab.app.extensions['submission_writer'] = writer
+    if writer:
+        writer.start()
+
+    commits = {'count': 0}
+
+    def on_commit(conn):
+        commits['count'] += 1
+
+    with quizlab.app.app_context():
+        engine = db.engine
+    event.listen(engine, 'commit', on_commit)
+
+    answers = {f'q{i}': 'A' if i % 2 else 'B' for i in range(questions)}
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = sorted(pool.map(lambda sid: submit(sid, answers), student_ids))
+    acknowledged = time.perf_counter() - started
+
+    while count_results() < len(student_ids):
+        time.sleep(0.05)
+    stored = time.perf_counter() - started
+
+    if writer:
+        writer.stop()
+    event.remove(engine, 'commit', on_commit)
+
+    return {
+        'mode': 'write-behind' if writer else 'direct',
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p95_ms': latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        'acknowledged_s': acknowledged,
+        'stored_s': stored,
+        'commits': commits['count']
+    }
+
+
+def main():
+    """Run both submission paths and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Compare direct and write-behind quiz submissions")
+    parser.add_argument("-s", "--students", type=int, default=200)
+    parser.add_argument("-q", "--questions", type=int, default=20)
+    parser.add_argument("-t", "--threads", type=int, default=50, help="Concurrent submitting clients")
+    parser.add_argument("--batch-size", type=int, default=200, help="Write-behind batch size")
+    args = parser.parse_args()
+
+    student_ids = seed(args.students, args.questions)
+    journal = SubmissionJournal(os.path.join(_workdir, 'submissions.db'))
+    writer = SubmissionWriter(quizlab.app, journal, batch_size=args.batch_size, interval=0.1)
+
+    results = [
+        run_burst(student_ids, args.questions, args.threads),
+        run_burst(student_ids, args.questions, args.threads, writer=writer)
+    ]
+
+    print(f"\n📊 {args.students} submissions, {args.threads} concurrent clients")
+    print(f"{'mode':<13} {'p50 (ms)':>9} {'p95 (ms)':>9} {'acked (s)':>10} {'stored (s)':>11} {'commits':>8}")
+    for r in results:
+        print(f"{r['mode']:<13} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['acknowledged_s']:>10.2f} "
+              f"{r['stored_s']:>11.2f} {r['commits']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+AI Scheduler Load Test
+Replays a busy afternoon against one simulated local model: a "heavy"
+teacher opens several tabs each asking for 5x50 AI questions, colleagues
+ask for 10 questions at a time, and then a burst of teachers arrives at
+once. The model is a FakeBackend that serves one call at a time in arrival
+order, like a single Ollama instance, with decode time proportional to the
+output length.
+
+Runs the scenario twice: straight to the model (Ollama's own FIFO queue),
+and through GenerationScheduler (per-teacher caps, weighted fair queuing
+per call, fast rejection with an ETA). Reports completion time per kind of
+request and how rejections were answered.
+
+Usage:
+    python -m benchmarks.load_ai_scheduler
+    python -m benchmarks.load_ai_scheduler --tokens-per-second 500 --light 12 --burst 30
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ai_quiz import QuizGenerator
+from ai_scheduler import GenerationRejected, GenerationScheduler
+from benchmarks.load_autosave import percentile
+from llm_backends import FakeBackend
+
+CATEGORIES = ['Mathematics', 'Physics', 'Chemistry', 'Biology', 'Computer Science']
+
+
+class SingleModelBackend(FakeBackend):
+    """FakeBackend that serves one call at a time in arrival order, like one Ollama instance."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._model = ThreadPoolExecutor(max_workers=1)
+
+    def generate(self, prompt: str, **options) -> dict:
+        return self._model.submit(FakeBackend.generate, self, prompt, **options).result()
+
+
+def build_workload(args) -> list:
+    """
+    Build the arrival schedule.
+
+    Returns:
+        list: (arrival second, kind, teacher_id, categories_requests)
+    """
+    rng = random.Random(args.seed)
+    heavy = [(CATEGORIES[i], 'University', args.heavy_questions) for i in range(5)]
+    workload = [(i * 0.05, 'heavy', 1, heavy) for i in range(args.heavy_tabs)]
+    for i in range(args.light):
+        category = CATEGORIES[i % len(CATEGORIES)]
+        workload.append((0.5 + rng.random() * args.spread, 'light', 100 + i, [(category, 'High School', 10)]))
+    for i in range(args.burst):
+        category = CATEGORIES[i % len(CATEGORIES)]
+        workload.append((args.burst_at, 'burst', 1000 + i, [(category, 'High School', 20)]))
+    return sorted(workload, key=lambda item: item[0])
+
+
+def run(workload: list, backend: FakeBackend, scheduler: GenerationScheduler = None) -> list:
+    """
+    Replay the workload, one thread per request.
+
+    Returns:
+        list: Outcome dicts with kind, status ('ok', 'rejected' or 'error'), seconds and retry_after
+    """
+    outcomes = []
+    lock = threading.Lock()
+    origin = time.monotonic()
+
+    def request(arrival, kind, teacher_id, categories_requests):
+        time.sleep(max(0.0, origin + arrival - time.monotonic()))
+        started = time.monotonic()
+        outcome = {'kind': kind, 'status': 'ok', 'retry_after': None}
+        try:
+            admission = (scheduler.admit(teacher_id, sum(n for _, _, n in categories_requests))
+                         if scheduler else contextlib.nullcontext())
+            with admission:
+                generator = QuizGenerator(backend=backend, scheduler=scheduler)
+                os.remove(generator.generate_and_save_temp_csv(categories_requests))
+        except GenerationRejected as e:
+            outcome.update(status='rejected', retry_after=e.retry_after)
+        except Exception as e:
+            outcome.update(status='error', error=str(e))
+        outcome['seconds'] = time.monotonic() - started
+        with lock:
+            outcomes.append(outcome)
+
+    threads = [threading.Thread(target=request, args=item) for item in workload]
+    with contextlib.redirect_stdout(io.StringIO()):  # Silence per-generation progress lines
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    return outcomes
+
+
+def report(name: str, outcomes: list, elapsed: float):
+    """Print completion times per request kind."""
+    print(f"\n{name} ({elapsed:.1f}s)")
+    print(f"{'requests':<10} {'ok':>4} {'rejected':>9} {'p50 (s)':>8} {'p95 (s)':>8} {'max (s)':>8} "
+          f"{'reject (ms)':>12} {'retry after (s)':>16}")
+    for kind in ('heavy', 'light', 'burst'):
+        rows = [o for o in outcomes if o['kind'] == kind]
+        if not rows:
+            continue
+        done = [o['seconds'] for o in rows if o['status'] == 'ok']
+        rejected = [o for o in rows if o['status'] == 'rejected']
+        errors = len(rows) - len(done) - len(rejected)
+        reject_ms = f"{max(o['seconds'] for o in rejected) * 1000:.0f}" if rejected else '-'
+        retry = (f"{min(o['retry_after'] for o in rejected)}-{max(o['retry_after'] for o in rejected)}"
+                 if rejected else '-')
+        label = kind if not errors else f"{kind} ({errors} err)"
+        print(f"{label:<10} {len(done):>4} {len(rejected):>9} {percentile(done, 50):>8.1f} "
+              f"{percentile(done, 95):>8.1f} {max(done, default=0):>8.1f} {reject_ms:>12} {retry:>16}")
+
+
+def main():
+    """Run the scenario with and without the scheduler."""
+    parser = argparse.ArgumentParser(description="Fairness and admission control of AI generation")
+    parser.add_argument("--heavy-tabs", type=int, default=3, help="Concurrent 5-category requests of one teacher")
+    parser.add_argument("--heavy-questions", type=int, default=50, help="Questions per category (heavy)")
+    parser.add_argument("--light", type=int, default=8, help="Teachers asking for 10 questions")
+    parser.add_argument("--spread", type=float, default=6.0, help="Seconds over which light requests arrive")
+    parser.add_argument("--burst", type=int, default=25, help="Teachers arriving together later")
+    parser.add_argument("--burst-at", type=float, default=8.0, help="Arrival second of the burst")
+    parser.add_argument("--tokens-per-second", type=float, default=1500, help="Simulated decode speed")
+    parser.add_argument("--max-wait", type=float, default=30.0, help="Scheduler AI_MAX_WAIT")
+    parser.add_argument("--queue-limit", type=int, default=20, help="Scheduler AI_QUEUE_LIMIT")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    workload = build_workload(args)
+    print(f"📊 {len(workload)} requests: {args.heavy_tabs} heavy (5x{args.heavy_questions}), "
+          f"{args.light} light (10), {args.burst} burst (20) at {args.burst_at:g}s")
+
+    for name, scheduler in [
+        ('Ollama FIFO, no scheduler', None),
+        # About 30 output tokens per question seeds the scheduler's time estimate
+        ('GenerationScheduler', GenerationScheduler(max_wait=args.max_wait, queue_limit=args.queue_limit,
+                                                    seconds_per_question=30 / args.tokens_per_second))
+    ]:
+        backend = SingleModelBackend(tokens_per_second=args.tokens_per_second)
+        started = time.monotonic()
+        outcomes = run(workload, backend, scheduler)
+        report(name, outcomes, time.monotonic() - started)
+
+
+if __name__ == "__main__":
+    main()
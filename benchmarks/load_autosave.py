@@ -0,0 +1,177 @@
+"""
+Autosave Load Test
+Simulates a class of students autosaving answer deltas every few seconds
+and measures /autosave latency, the save rate actually achieved, and
+/submit_quiz latency with and without the autosave load.
+
+By default requests go through Flask's in-process test client, which is
+bound by a single Python process. Pass --url to drive a running server
+(e.g. several gunicorn workers) over HTTP instead; DATABASE_URL must then
+point at the server's database. In both modes the database is recreated
+and seeded, so only use a disposable database.
+
+Usage:
+    python -m benchmarks.load_autosave --students 1000 --interval 3 --duration 30
+    DATABASE_URL=postgresql://.../quizlab_bench python -m benchmarks.load_autosave \\
+        --url http://localhost:8000 --workers 64
+"""
+
+import argparse
+import random
+import statistics
+import threading
+import time
+
+import requests
+from werkzeug.security import generate_password_hash
+
+from benchmarks.bench_submission_burst import seed
+import app as quizlab
+from models import db, Quiz, Student
+
+# Password given to every seeded student (needed for HTTP logins)
+STUDENT_PASSWORD = 'autosave-load'
+
+
+def percentile(values: list, p: float) -> float:
+    """Return the p-th percentile (0-100) of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class StudentClient:
+    """Sends requests as one logged-in student, in-process or over HTTP."""
+
+    def __init__(self, student_id: int, username: str, base_url: str = None):
+        self.base_url = base_url
+        if base_url:
+            self.session = requests.Session()
+            self.session.post(f"{base_url}/login", data={'username': username, 'password': STUDENT_PASSWORD},
+                              timeout=30)
+        else:
+            self.client = quizlab.app.test_client()
+            with self.client.session_transaction() as sess:
+                sess['student_id'] = student_id
+
+    def post(self, path: str, **kwargs) -> dict:
+        """POST to the app and return the decoded JSON response."""
+        if self.base_url:
+            return self.session.post(f"{self.base_url}{path}", timeout=30, **kwargs).json()
+        return self.client.post(path, **kwargs).get_json()
+
+
+def autosave_worker(clients: list, quiz_id: int, questions: int, interval: float,
+                    stop_at: float, latencies: list, errors: list):
+    """
+    Autosave for a slice of students, each once per `interval` seconds.
+
+    Students are spread evenly over the interval so the load is steady.
+    """
+    offset = interval / max(len(clients), 1)
+    next_round = time.perf_counter()
+
+    while next_round < stop_at:
+        for i, client in enumerate(clients):
+            due = next_round + i * offset
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            if time.perf_counter() >= stop_at:
+                return
+
+            # A typical delta: one or two answers changed since the last save
+            delta = {f'q{random.randrange(questions)}': random.choice('ABCD')
+                     for _ in range(random.randint(1, 2))}
+            started = time.perf_counter()
+            try:
+                data = client.post('/autosave', json={'quiz_id': quiz_id, 'answers': delta})
+                if not data.get('success'):
+                    errors.append(data.get('message'))
+            except Exception as e:
+                errors.append(str(e))
+            latencies.append(time.perf_counter() - started)
+        next_round += interval
+
+
+def measure_submissions(clients: list, questions: int, spacing: float) -> list:
+    """Submit once per client, `spacing` seconds apart; returns latencies."""
+    answers = {f'q{i}': 'A' for i in range(questions)}
+    latencies = []
+    for client in clients:
+        started = time.perf_counter()
+        data = client.post('/submit_quiz', data=answers)
+        latencies.append(time.perf_counter() - started)
+        if not data.get('success'):
+            raise RuntimeError(data.get('message'))
+        time.sleep(spacing)
+    return latencies
+
+
+def main():
+    """Measure submit latency alone, then under sustained autosave load."""
+    parser = argparse.ArgumentParser(description="Load test the autosave endpoint")
+    parser.add_argument("-s", "--students", type=int, default=1000, help="Students autosaving")
+    parser.add_argument("-q", "--questions", type=int, default=40)
+    parser.add_argument("-i", "--interval", type=float, default=3.0, help="Seconds between saves per student")
+    parser.add_argument("-d", "--duration", type=float, default=30.0, help="Seconds of autosave load")
+    parser.add_argument("-w", "--workers", type=int, default=32, help="Client threads")
+    parser.add_argument("--submissions", type=int, default=50, help="Submissions measured per phase")
+    parser.add_argument("--url", default=None, help="Base URL of a running server (default: in-process)")
+    args = parser.parse_args()
+
+    student_ids = seed(args.students + 2 * args.submissions, args.questions)
+    with quizlab.app.app_context():
+        quiz_id = db.session.query(Quiz.id).scalar()
+        # One shared hash keeps seeding fast; only HTTP logins need it
+        Student.query.update({'password': generate_password_hash(STUDENT_PASSWORD)})
+        db.session.commit()
+        usernames = dict(db.session.query(Student.id, Student.username))
+
+    print(f"🔑 Logging in {len(student_ids)} students...")
+    clients = [StudentClient(sid, usernames[sid], args.url) for sid in student_ids]
+    savers = clients[:args.students]
+    baseline_submitters = clients[args.students:args.students + args.submissions]
+    loaded_submitters = clients[args.students + args.submissions:]
+
+    spacing = args.duration / (2 * args.submissions)
+    print(f"⏱️  Baseline: {args.submissions} submissions without autosave load...")
+    baseline = measure_submissions(baseline_submitters, args.questions, spacing)
+
+    print(f"🔥 Autosave load: {args.students} students every {args.interval}s for {args.duration}s "
+          f"({args.workers} client threads)...")
+    latencies, errors = [], []
+    stop_at = time.perf_counter() + args.duration
+    threads = [
+        threading.Thread(target=autosave_worker, args=(
+            savers[w::args.workers], quiz_id, args.questions, args.interval, stop_at, latencies, errors
+        ), daemon=True)
+        for w in range(args.workers)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(min(args.interval, args.duration / 4))  # Let the load ramp up
+    loaded = measure_submissions(loaded_submitters, args.questions, spacing)
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    target_rate = args.students / args.interval
+    achieved_rate = len(latencies) / elapsed
+    print(f"\n📊 Autosave: {len(latencies)} saves, {len(errors)} errors, "
+          f"{achieved_rate:.0f}/s achieved of {target_rate:.0f}/s target")
+    print(f"   latency p50 {percentile(latencies, 50) * 1000:.1f} ms, "
+          f"p95 {percentile(latencies, 95) * 1000:.1f} ms, p99 {percentile(latencies, 99) * 1000:.1f} ms")
+    print(f"{'submit':<16} {'p50 (ms)':>9} {'p95 (ms)':>9} {'mean (ms)':>10}")
+    for label, values in (('baseline', baseline), ('under autosave', loaded)):
+        print(f"{label:<16} {percentile(values, 50) * 1000:>9.1f} {percentile(values, 95) * 1000:>9.1f} "
+              f"{statistics.mean(values) * 1000:>10.1f}")
+    if achieved_rate < 0.9 * target_rate:
+        print("⚠️  Target save rate not reached; add client threads or use --url against a multi-process server.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+"""
+Exam Lifecycle Load Test
+Seeds a database with N teachers, M students per teacher and a large
+question bank, then drives the hot routes concurrently, one phase at a
+time, in the order of a real exam day:
+
+    login -> quiz -> submit_quiz -> create_quiz -> upload -> CSV exports
+
+Each phase reports p50/p95/p99 latency, throughput and errors. Results can
+be saved as a baseline JSON file and later runs compared against it; the
+script exits with status 1 when a route got slower (p95) or slower overall
+(throughput) by more than the tolerance.
+
+By default requests go through Flask's in-process test client. Pass --url
+to drive a running server over HTTP instead; DATABASE_URL must then point
+at the server's database. The database is recreated and seeded, so only
+use a disposable database.
+
+Usage:
+    python -m benchmarks.load_exam --teachers 5 --students 60 --save-baseline
+    python -m benchmarks.load_exam --teachers 5 --students 60 --compare
+    DATABASE_URL=postgresql://.../quizlab_bench python -m benchmarks.load_exam \\
+        --url http://localhost:8000 --threads 64 --compare
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+from werkzeug.security import generate_password_hash
+
+from benchmarks.bench_submission_burst import CATEGORIES
+from benchmarks.load_autosave import percentile
+import app as quizlab
+from models import db, Teacher, Student, QuestionBank, Quiz, QuizQuestion
+
+LEVELS = ['Elementary', 'Middle School', 'High School']
+GROUPS = ['A', 'B', 'C']
+FORM_KEYS = {'Mathematics': 'math', 'Physics': 'physics', 'Chemistry': 'chemistry',
+             'Biology': 'biology', 'Computer Science': 'cs'}
+
+# Shared by every seeded account so logins can be replayed
+PASSWORD = 'load-exam'
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'load_exam.json')
+
+# ============================================================================
+# SEEDING
+# ============================================================================
+
+def seed(teachers: int, students: int, bank_size: int, questions: int) -> dict:
+    """
+    Recreate the database with teachers, students, a question bank and one
+    active quiz per teacher.
+
+    Args:
+        teachers (int): Number of teachers
+        students (int): Students per teacher, spread over GROUPS
+        bank_size (int): Bank questions per category and level
+        questions (int): Questions in each teacher's active quiz
+
+    Returns:
+        dict: {'teachers': [(id, username)], 'students': [(id, username)]}
+    """
+    password_hash = generate_password_hash(PASSWORD)
+    with quizlab.app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        db.session.add_all(
+            QuestionBank(question=f'{category} {level} question {i}?', option_a=f'Answer {i}',
+                         option_b=f'Distractor {i}a', option_c=f'Distractor {i}b', option_d=f'Distractor {i}c',
+                         correct_answer=f'Answer {i}', category=category, level=level)
+            for category in CATEGORIES for level in LEVELS for i in range(bank_size)
+        )
+
+        teacher_rows, student_rows = [], []
+        for t in range(teachers):
+            teacher = Teacher(name=f'Teacher {t}', email=f'load{t}@example.com', school='Load School',
+                              username=f'load_t{t}', password=password_hash)
+            db.session.add(teacher)
+            db.session.flush()
+            teacher_rows.append(teacher)
+
+            quiz = Quiz(teacher_id=teacher.id, name=f'Load Quiz {t}')
+            db.session.add(quiz)
+            db.session.flush()
+            db.session.add_all(
+                QuizQuestion(quiz_id=quiz.id, question=f'Question {i}?', option_a='A', option_b='B',
+                             option_c='C', option_d='D', correct_answer='A',
+                             category=CATEGORIES[i % len(CATEGORIES)], level='High School',
+                             source='BANK', order_index=i)
+                for i in range(questions)
+            )
+
+            rows = [Student(teacher_id=teacher.id, name=f'Student {t}-{s}', group=GROUPS[s % len(GROUPS)],
+                            username=f'load_s{t}_{s}', password=password_hash) for s in range(students)]
+            db.session.add_all(rows)
+            student_rows.extend(rows)
+
+        db.session.commit()
+        return {
+            'teachers': [(row.id, row.username) for row in teacher_rows],
+            'students': [(row.id, row.username) for row in student_rows]
+        }
+
+# ============================================================================
+# CLIENT
+# ============================================================================
+
+class SessionClient:
+    """One teacher or student browser, in-process or over HTTP."""
+
+    def __init__(self, role: str, user_id: int, username: str, base_url: str = None):
+        self.username = username
+        self.base_url = base_url
+        if base_url:
+            self.session = requests.Session()
+            self.session.headers['Accept-Encoding'] = 'gzip'
+        else:
+            self.client = quizlab.app.test_client()
+            with self.client.session_transaction() as sess:
+                sess[f'{role}_id'] = user_id
+
+    def request(self, method: str, path: str, **kwargs) -> tuple:
+        """Send one request and read the whole body; returns (status code, body)."""
+        if self.base_url:
+            response = self.session.request(method, f"{self.base_url}{path}", timeout=60,
+                                            allow_redirects=False, **kwargs)
+            return response.status_code, response.content
+        if 'files' in kwargs:
+            kwargs['data'] = {**kwargs.get('data', {}), **kwargs.pop('files')}
+        response = self.client.open(path, method=method, **kwargs)
+        return response.status_code, response.get_data()
+
+# ============================================================================
+# PHASES
+# ============================================================================
+
+def timed(call) -> tuple:
+    """Run one request; returns (seconds, error message or None)."""
+    started = time.perf_counter()
+    try:
+        error = call()
+    except Exception as e:
+        error = str(e)
+    return time.perf_counter() - started, error
+
+def run_phase(name: str, calls: list, threads: int) -> dict:
+    """
+    Run every call concurrently and summarize the latencies.
+
+    Args:
+        name (str): Phase name used in the report and baseline
+        calls (list): Zero-argument callables returning an error message or None
+        threads (int): Concurrent clients
+
+    Returns:
+        dict: Requests, errors, throughput and latency percentiles in ms
+    """
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        outcomes = list(pool.map(timed, calls))
+    elapsed = time.perf_counter() - started
+
+    latencies = [seconds for seconds, _ in outcomes]
+    errors = [error for _, error in outcomes if error]
+    if errors:
+        print(f"⚠️  {name}: {len(errors)} errors, e.g. {errors[0][:200]}")
+    return {
+        'phase': name,
+        'requests': len(outcomes),
+        'errors': len(errors),
+        'throughput_rps': round(len(outcomes) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 1)
+    }
+
+def expect(reply: tuple, *accepted: int):
+    """Return an error message unless the status code is accepted."""
+    status = reply[0]
+    return None if status in accepted else f"HTTP {status}"
+
+def expect_success(reply: tuple):
+    """Return an error message unless the reply is JSON with success=true."""
+    status, body = reply
+    if status != 200:
+        return f"HTTP {status}"
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return "Response is not JSON"
+    return None if data.get('success') else data.get('message', 'success=false')
+
+def login_call(username: str, base_url: str):
+    """POST /login with a fresh cookie jar, as a student opening the exam."""
+    def call():
+        client = SessionClient('student', 0, username, base_url)
+        return expect(client.request('POST', '/login', data={'username': username, 'password': PASSWORD}), 302)
+    return call
+
+def upload_csv(teacher_index: int, batch: int, rows: int) -> bytes:
+    """Build a student roster CSV with usernames unique to this upload."""
+    lines = ['exp,name,group'] + [f'up{teacher_index}_{batch}_{r},Uploaded {r},{GROUPS[r % len(GROUPS)]}'
+                                  for r in range(rows)]
+    return '\n'.join(lines).encode()
+
+def build_phases(accounts: dict, args) -> list:
+    """
+    Build the (name, calls) list for every phase in exam-day order.
+
+    Students and teachers get their own logged-in clients, reused across
+    phases like a browser would.
+    """
+    students = [SessionClient('student', sid, username, args.url) for sid, username in accounts['students']]
+    teachers = [SessionClient('teacher', tid, username, args.url) for tid, username in accounts['teachers']]
+    if args.url:
+        for client in students + teachers:
+            client.request('POST', '/login', data={'username': client.username, 'password': PASSWORD})
+
+    answers = {f'q{i}': 'A' if i % 3 else 'B' for i in range(args.questions)}
+    per_category = max(1, args.quiz_questions // len(CATEGORIES))
+    quiz_form = {'quiz_group': ''}
+    for category, key in FORM_KEYS.items():
+        quiz_form[f'num_questions_{key}'] = str(per_category)
+        quiz_form[f'level_{key}'] = 'High School'
+    ajax = {'X-Requested-With': 'XMLHttpRequest'}
+
+    def json_success(client, path, **kwargs):
+        def call():
+            return expect_success(client.request('POST', path, headers=ajax, **kwargs))
+        return call
+
+    def get(client, path, *accepted):
+        return lambda: expect(client.request('GET', path), *(accepted or (200,)))
+
+    def upload(client, t, b):
+        return json_success(client, '/upload', files={
+            'file': (io.BytesIO(upload_csv(t, b, args.upload_rows)), 'students.csv')})
+
+    exports = [get(client, path) for client in teachers for path in ('/download_students_csv',
+                                                                     '/download_results_csv')]
+    return [
+        ('login', [login_call(username, args.url) for _, username in accounts['students'][:args.logins]]),
+        ('quiz', [get(client, '/quiz') for client in students]),
+        ('submit_quiz', [json_success(client, '/submit_quiz', data=answers) for client in students]),
+        ('create_quiz', [json_success(client, '/create_quiz', data=quiz_form)
+                         for client in teachers for _ in range(args.repeat)]),
+        ('upload', [upload(client, t, b) for t, client in enumerate(teachers) for b in range(args.repeat)]),
+        ('csv_exports', exports * args.repeat)
+    ]
+
+# ============================================================================
+# BASELINE
+# ============================================================================
+
+def compare(results: list, baseline: dict, tolerance: float, min_delta_ms: float = 20.0) -> list:
+    """
+    Compare phase results against a baseline.
+
+    Args:
+        results (list): Phase summaries from run_phase()
+        baseline (dict): Parsed baseline file
+        tolerance (float): Allowed relative slowdown, e.g. 0.25 for 25%
+        min_delta_ms (float): p95 increases smaller than this are noise
+
+    Returns:
+        list: Regression messages (empty if none)
+    """
+    previous = {phase['phase']: phase for phase in baseline.get('phases', [])}
+    regressions = []
+    for current in results:
+        old = previous.get(current['phase'])
+        if not old:
+            continue
+        if current['errors'] > old['errors']:
+            regressions.append(f"{current['phase']}: {current['errors']} errors (baseline {old['errors']})")
+        if current['p95_ms'] > max(old['p95_ms'] * (1 + tolerance), old['p95_ms'] + min_delta_ms):
+            regressions.append(f"{current['phase']}: p95 {current['p95_ms']:.1f} ms "
+                               f"(baseline {old['p95_ms']:.1f} ms)")
+        if current['throughput_rps'] < old['throughput_rps'] * (1 - tolerance):
+            regressions.append(f"{current['phase']}: {current['throughput_rps']:.1f} req/s "
+                               f"(baseline {old['throughput_rps']:.1f} req/s)")
+    return regressions
+
+def main():
+    """Seed, run every phase, print the report and check or save the baseline."""
+    parser = argparse.ArgumentParser(description="Load test the exam lifecycle routes")
+    parser.add_argument("-T", "--teachers", type=int, default=5)
+    parser.add_argument("-s", "--students", type=int, default=60, help="Students per teacher")
+    parser.add_argument("-b", "--bank-size", type=int, default=200, help="Bank questions per category and level")
+    parser.add_argument("-q", "--questions", type=int, default=40, help="Questions in the seeded quizzes")
+    parser.add_argument("--quiz-questions", type=int, default=50, help="Questions per /create_quiz request")
+    parser.add_argument("--upload-rows", type=int, default=30, help="Students per uploaded CSV")
+    parser.add_argument("--logins", type=int, default=50, help="Login requests (password hashing is slow)")
+    parser.add_argument("--repeat", type=int, default=3, help="Teacher requests per teacher and phase")
+    parser.add_argument("-t", "--threads", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--url", default=None, help="Base URL of a running server (default: in-process)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="Fail if slower than the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=20.0, help="Ignore smaller p95 increases")
+    args = parser.parse_args()
+
+    print(f"🌱 Seeding {args.teachers} teachers × {args.students} students, "
+          f"{args.bank_size * len(CATEGORIES) * len(LEVELS)} bank questions...")
+    accounts = seed(args.teachers, args.students, args.bank_size, args.questions)
+    phases = build_phases(accounts, args)
+
+    results = []
+    for name, calls in phases:
+        print(f"🔥 {name}: {len(calls)} requests, {args.threads} clients...")
+        results.append(run_phase(name, calls, args.threads))
+
+    print(f"\n📊 {args.teachers} teachers, {args.teachers * args.students} students, "
+          f"{'HTTP ' + args.url if args.url else 'in-process'}")
+    print(f"{'phase':<13} {'requests':>8} {'errors':>7} {'req/s':>8} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9}")
+    for r in results:
+        print(f"{r['phase']:<13} {r['requests']:>8} {r['errors']:>7} {r['throughput_rps']:>8.1f} "
+              f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f}")
+
+    params = {key: getattr(args, key) for key in ('teachers', 'students', 'bank_size', 'questions',
+                                                  'quiz_questions', 'upload_rows', 'logins', 'repeat',
+                                                  'threads', 'url')}
+    status = 0
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"⚠️  No baseline at {args.baseline}; run with --save-baseline first.")
+            status = 1
+        else:
+            with open(args.baseline, encoding='utf-8') as f:
+                baseline = json.load(f)
+            if baseline.get('params') != params:
+                print("⚠️  Baseline was recorded with different parameters; comparison may be meaningless.")
+            regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+            for message in regressions:
+                print(f"❌ Regression: {message}")
+            if regressions:
+                status = 1
+            else:
+                print(f"✅ No regressions beyond {args.tolerance:.0%} of the baseline.")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({
+                'recorded_at': datetime.utcnow().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'database': quizlab.app.config['SQLALCHEMY_DATABASE_URI'].split(':', 1)[0],
+                'params': params,
+                'phases': results
+            }, f, indent=2)
+            f.write('\n')
+        print(f"💾 Baseline saved to {args.baseline}")
+
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Stub Ollama Server
+A small HTTP server speaking enough of the Ollama API (/api/tags,
+/api/generate, /api/chat) to load-test the application without a GPU.
+Responses are well-formed synthetic questions from llm_backends.FakeBackend,
+returned after a configurable generation delay. Requests are served on
+separate threads; --parallel limits how many generations run at once (like
+OLLAMA_NUM_PARALLEL), otherwise the server itself is never the bottleneck.
+
+Usage:
+    python -m benchmarks.stub_ollama --port 11435 --latency 2.0
+    python -m benchmarks.stub_ollama --port 11436 --latency 0.5 --parallel 1
+    AI_BASE_URL=http://localhost:11435 python app.py
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from llm_backends import FakeBackend
+
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    """Answers Ollama API calls with FakeBackend output after a delay."""
+
+    protocol_version = 'HTTP/1.1'
+    backend = FakeBackend()
+    latency = 1.0
+    slots = None  # threading.Semaphore when generations are limited
+
+    def log_message(self, format, *args):
+        """Keep benchmark output readable."""
+
+    def _send_json(self, data: dict, status: int = 200):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/api/tags':
+            self._send_json({'models': [{'name': 'phi3:mini'}]})
+        else:
+            self._send_json({'error': 'not found'}, 404)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length) or b'{}')
+
+        if self.path == '/api/generate':
+            prompt = payload.get('prompt')
+        elif self.path == '/api/chat':
+            prompt = (payload.get('messages') or [{}])[-1].get('content')
+        else:
+            self._send_json({'error': 'not found'}, 404)
+            return
+
+        if not prompt:
+            # Warm-up request: load the model only
+            self._send_json({'model': payload.get('model'), 'response': '', 'done': True, 'load_duration': 0})
+            return
+
+        started = time.perf_counter()
+        options = {'format': payload['format']} if payload.get('format') else {}
+        result = self.backend.generate(prompt, **options)
+        if self.slots:
+            with self.slots:
+                time.sleep(self.latency)
+        else:
+            time.sleep(self.latency)
+        elapsed_ns = int((time.perf_counter() - started) * 1e9)
+
+        data = {
+            'model': payload.get('model'),
+            'done': True,
+            'total_duration': elapsed_ns,
+            'load_duration': 0,
+            'prompt_eval_count': result['stats']['prompt_eval_count'],
+            'eval_count': result['stats']['eval_count'],
+            'eval_duration': elapsed_ns
+        }
+        if self.path == '/api/chat':
+            data['message'] = {'role': 'assistant', 'content': result['response']}
+        else:
+            data['response'] = result['response']
+        self._send_json(data)
+
+
+class StubServer(ThreadingHTTPServer):
+    """Threaded server with a listen backlog deep enough for connection bursts."""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def create_server(port: int = 11435, latency: float = 1.0, host: str = '127.0.0.1',
+                  parallel: int = 0) -> ThreadingHTTPServer:
+    """
+    Create (but do not start) a stub server.
+
+    Args:
+        port (int): Port to listen on (0 picks a free port)
+        latency (float): Seconds each generation takes
+        host (str): Interface to bind
+        parallel (int): Generations served at once, 0 for unlimited
+
+    Returns:
+        ThreadingHTTPServer: Server; call serve_forever() to run it
+    """
+    handler = type('ConfiguredStubOllamaHandler', (StubOllamaHandler,), {
+        'latency': latency,
+        'slots': threading.Semaphore(parallel) if parallel > 0 else None
+    })
+    return StubServer((host, port), handler)
+
+
+def main():
+    """Run the stub server until interrupted."""
+    parser = argparse.ArgumentParser(description="Stub Ollama API server for load tests")
+    parser.add_argument("-p", "--port", type=int, default=11435)
+    parser.add_argument("-l", "--latency", type=float, default=1.0, help="Seconds per generation")
+    parser.add_argument("--host", default='127.0.0.1')
+    parser.add_argument("--parallel", type=int, default=0, help="Generations served at once (0: unlimited)")
+    args = parser.parse_args()
+
+    server = create_server(args.port, args.latency, args.host, args.parallel)
+    print(f"🧪 Stub Ollama listening on http://{args.host}:{server.server_port} "
+          f"({args.latency:g}s per generation)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
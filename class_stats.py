@@ -0,0 +1,222 @@
+from collections import defaultdict
+from math import sqrt
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from models import db, ClassStatistic, Quiz, Result
+
+# Result columns summarized, with the category name they are reported under
+CATEGORY_FIELDS = [
+    ('Mathematics', 'mathematics'),
+    ('Physics', 'physics'),
+    ('Chemistry', 'chemistry'),
+    ('Biology', 'biology'),
+    ('Computer Science', 'computer_science'),
+    ('Total', 'total'),
+]
+
+# Histogram of percentage scores in bins of 10 points (100 % falls in the last bin)
+HISTOGRAM_BINS = 10
+
+# ============================================================================
+# INCREMENTAL UPDATES
+# ============================================================================
+
+def score_samples(result_data):
+    """
+    Turn a result's "correct/total" strings into percentage scores.
+
+    Categories the quiz did not ask about ("0/0") are skipped.
+
+    Args:
+        result_data (dict): Result data from create_result_data(), or a Result row
+
+    Returns:
+        list: (category, percentage, bin) tuples
+    """
+    samples = []
+    for category, field in CATEGORY_FIELDS:
+        value = result_data[field] if isinstance(result_data, dict) else getattr(result_data, field)
+        correct, _, total = (value or '0/0').partition('/')
+        if not total or int(total) == 0:
+            continue
+        score = 100.0 * int(correct) / int(total)
+        samples.append((category, score, min(int(score * HISTOGRAM_BINS // 100), HISTOGRAM_BINS - 1)))
+    return samples
+
+def summarize_results(results):
+    """
+    Aggregate results into per-bin deltas of count, sum and sum of squares.
+
+    Args:
+        results (list): (teacher_id, result) tuples; result is a result data
+            dict or a Result row. Results without a quiz_id or teacher are skipped.
+
+    Returns:
+        dict: {(teacher_id, quiz_id, group, category, bin): [count, score_sum, score_sq_sum]}
+    """
+    deltas = defaultdict(lambda: [0, 0.0, 0.0])
+    for teacher_id, result in results:
+        quiz_id = result['quiz_id'] if isinstance(result, dict) else result.quiz_id
+        group = result['group'] if isinstance(result, dict) else result.group
+        if not quiz_id or teacher_id is None:
+            continue
+        for category, score, bin_index in score_samples(result):
+            delta = deltas[(teacher_id, quiz_id, group, category, bin_index)]
+            delta[0] += 1
+            delta[1] += score
+            delta[2] += score * score
+    return deltas
+
+def record_results(results, sign=1):
+    """
+    Add results to (or, with sign=-1, remove them from) the class statistics.
+
+    Runs in the caller's transaction, so the summary commits or rolls back
+    together with the Result rows. Additions are one native upsert per
+    touched bin (SQLite/PostgreSQL ON CONFLICT, MySQL ON DUPLICATE KEY);
+    removals are plain decrements, and bins left empty are deleted. The
+    caller commits.
+
+    Args:
+        results (list): (teacher_id, result) tuples, see summarize_results()
+        sign (int): 1 when the results were written, -1 when they were deleted
+    """
+    table = ClassStatistic.__table__
+    dialect = db.session.get_bind(ClassStatistic.__mapper__).dialect.name
+
+    for (teacher_id, quiz_id, group, category, bin_index), (count, total, squares) in \
+            sorted(summarize_results(results).items()):  # Fixed order avoids deadlocks between batches
+        key = (table.c.teacher_id == teacher_id, table.c.quiz_id == quiz_id, table.c.group == group,
+               table.c.category == category, table.c.bin == bin_index)
+        increments = {'count': table.c.count + sign * count,
+                      'score_sum': table.c.score_sum + sign * total,
+                      'score_sq_sum': table.c.score_sq_sum + sign * squares}
+        if sign < 0:
+            db.session.execute(update(table).where(*key).values(**increments))
+            # Empty bins would keep a reference to the quiz and block deleting it
+            db.session.execute(delete(table).where(*key, table.c.count <= 0))
+            continue
+
+        values = {'teacher_id': teacher_id, 'quiz_id': quiz_id, 'group': group, 'category': category,
+                  'bin': bin_index, 'count': count, 'score_sum': total, 'score_sq_sum': squares}
+        if dialect in ('sqlite', 'postgresql'):
+            dialect_insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+            statement = dialect_insert(table).values(**values).on_conflict_do_update(
+                index_elements=['teacher_id', 'quiz_id', 'group', 'category', 'bin'], set_=increments)
+            db.session.execute(statement)
+        elif dialect in ('mysql', 'mariadb'):
+            db.session.execute(mysql.insert(table).values(**values).on_duplicate_key_update(**increments))
+        elif db.session.execute(update(table).where(*key).values(**increments)).rowcount == 0:
+            db.session.execute(insert(table).values(**values))
+
+def discard_quiz_statistics(quiz_id):
+    """Delete the summary rows of a quiz about to be deleted. The caller commits."""
+    db.session.execute(delete(ClassStatistic.__table__).where(ClassStatistic.quiz_id == quiz_id))
+
+def quiz_teachers(quiz_ids):
+    """
+    Map quiz IDs to the teachers owning them.
+
+    Args:
+        quiz_ids (iterable): Quiz IDs
+
+    Returns:
+        dict: {quiz_id: teacher_id}
+    """
+    quiz_ids = {quiz_id for quiz_id in quiz_ids if quiz_id}
+    if not quiz_ids:
+        return {}
+    return dict(db.session.execute(select(Quiz.id, Quiz.teacher_id).where(Quiz.id.in_(quiz_ids))).all())
+
+# ============================================================================
+# DASHBOARD READS
+# ============================================================================
+
+def class_statistics(teacher_id, quiz_id=None):
+    """
+    Read score statistics per group and category from the summary table.
+
+    Cost depends on the number of quizzes, groups and bins, not on the
+    number of results.
+
+    Args:
+        teacher_id (int): Teacher ID
+        quiz_id (int, optional): Restrict to one quiz; default: all of the teacher's quizzes
+
+    Returns:
+        dict: {group: {category: {'count', 'mean', 'stdev', 'histogram'}}}, groups sorted
+    """
+    statement = select(ClassStatistic.group, ClassStatistic.category, ClassStatistic.bin,
+                       func.sum(ClassStatistic.count), func.sum(ClassStatistic.score_sum),
+                       func.sum(ClassStatistic.score_sq_sum))\
+        .where(ClassStatistic.teacher_id == teacher_id)\
+        .group_by(ClassStatistic.group, ClassStatistic.category, ClassStatistic.bin)
+    if quiz_id:
+        statement = statement.where(ClassStatistic.quiz_id == quiz_id)
+
+    totals = defaultdict(lambda: {'count': 0, 'sum': 0.0, 'sq_sum': 0.0, 'histogram': [0] * HISTOGRAM_BINS})
+    for group, category, bin_index, count, total, squares in db.session.execute(statement):
+        if not count:
+            continue
+        entry = totals[(group, category)]
+        entry['count'] += count
+        entry['sum'] += total
+        entry['sq_sum'] += squares
+        entry['histogram'][bin_index] += count
+
+    statistics = {}
+    for (group, category), entry in sorted(totals.items()):
+        count = entry['count']
+        mean = entry['sum'] / count
+        variance = max(entry['sq_sum'] / count - mean * mean, 0.0)  # Clamp float rounding
+        statistics.setdefault(group, {})[category] = {
+            'count': count,
+            'mean': round(mean, 1),
+            'stdev': round(sqrt(variance), 1),
+            'histogram': entry['histogram']
+        }
+    return statistics
+
+# ============================================================================
+# REBUILD
+# ============================================================================
+
+def rebuild_class_statistics(teacher_id=None):
+    """
+    Recompute the summary table from the Result rows, e.g. for a backfill.
+
+    Results are read in batches and the table is replaced in one transaction.
+    The caller commits.
+
+    Args:
+        teacher_id (int, optional): Rebuild one teacher's rows; default: all
+
+    Returns:
+        int: Number of results summarized
+    """
+    statement = select(Quiz.teacher_id, Result.quiz_id, Result.group, Result.mathematics, Result.physics,
+                       Result.chemistry, Result.biology, Result.computer_science, Result.total)\
+        .join(Quiz, Result.quiz_id == Quiz.id)
+    clear = delete(ClassStatistic)
+    if teacher_id:
+        statement = statement.where(Quiz.teacher_id == teacher_id)
+        clear = clear.where(ClassStatistic.teacher_id == teacher_id)
+
+    deltas = defaultdict(lambda: [0, 0.0, 0.0])
+    summarized = 0
+    for row in db.session.execute(statement.execution_options(yield_per=1000)):
+        for key, (count, total, squares) in summarize_results([(row.teacher_id, row)]).items():
+            delta = deltas[key]
+            delta[0] += count
+            delta[1] += total
+            delta[2] += squares
+        summarized += 1
+
+    db.session.execute(clear)
+    if deltas:
+        db.session.execute(insert(ClassStatistic.__table__), [
+            {'teacher_id': key[0], 'quiz_id': key[1], 'group': key[2], 'category': key[3], 'bin': key[4],
+             'count': count, 'score_sum': total, 'score_sq_sum': squares}
+            for key, (count, total, squares) in deltas.items()
+        ])
+    return summarized
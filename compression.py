@@ -0,0 +1,197 @@
+import gzip
+import hashlib
+import os
+import threading
+from flask import request
+from metrics import registry as metrics
+
+try:
+    import brotli  # Optional: pip install brotli
+except ImportError:
+    brotli = None
+
+# Mimetypes worth compressing; images and archives are already compressed
+COMPRESSIBLE_MIMETYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript',
+    'application/javascript', 'application/json', 'image/svg+xml'
+}
+
+# ============================================================================
+# RESPONSE COMPRESSION
+# ============================================================================
+
+def choose_encoding(accept_encodings):
+    """
+    Pick the best content coding the client accepts.
+
+    Args:
+        accept_encodings (Accept): Parsed Accept-Encoding header
+
+    Returns:
+        str: 'br', 'gzip' or None
+    """
+    offered = ['br', 'gzip'] if brotli is not None else ['gzip']
+    return accept_encodings.best_match(offered)
+
+def compress_bytes(data, encoding, level=6):
+    """
+    Compress a response body.
+
+    Args:
+        data (bytes): Uncompressed body
+        encoding (str): 'br' or 'gzip'
+        level (int): gzip level 1-9 (brotli uses a comparable quality)
+
+    Returns:
+        bytes: Compressed body
+    """
+    if encoding == 'br':
+        return brotli.compress(data, quality=min(level, 11))
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+class ResponseCompressor:
+    """
+    after_request hook compressing HTML, JSON, CSS and JS responses.
+
+    Streamed responses (e.g. CSV exports, which gzip themselves), responses
+    that already have a Content-Encoding and bodies below the size threshold
+    are sent unchanged. Static files are compressed once per version and kept
+    in memory.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._static_cache = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, response):
+        config = self.app.config
+        if not config.get('COMPRESSION_ENABLED', True):
+            return response
+        if response.status_code != 200 or 'Content-Encoding' in response.headers:
+            return response
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES or 'X-Sendfile' in response.headers:
+            return response
+
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        is_static = request.endpoint == 'static'
+        if response.direct_passthrough:
+            if not is_static:
+                return response
+            # send_file hands over a file wrapper; read it so it can be compressed
+            response.direct_passthrough = False
+        elif response.is_streamed:
+            return response
+
+        length = response.calculate_content_length()
+        if length is not None and length < config.get('COMPRESSION_MIN_SIZE', 500):
+            return response
+
+        level = config.get('COMPRESSION_LEVEL', 6)
+        data = response.get_data()
+        if is_static:
+            body = self._compress_static(data, encoding, level, response.get_etag()[0])
+        else:
+            body = compress_bytes(data, encoding, level)
+
+        metrics.inc('http_compressed_responses_total', encoding=encoding)
+        metrics.inc('http_compression_bytes_in_total', len(data))
+        metrics.inc('http_compression_bytes_out_total', len(body))
+
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            # Same entity, different bytes: a weak validator still matches If-None-Match
+            response.set_etag(etag, weak=True)
+        return response
+
+    def _compress_static(self, data, encoding, level, etag):
+        """Compress a static file once per (content, encoding)."""
+        key = (etag or hashlib.sha1(data).hexdigest(), encoding)
+        with self._lock:
+            body = self._static_cache.get(key)
+        if body is None:
+            body = compress_bytes(data, encoding, level)
+            with self._lock:
+                self._static_cache[key] = body
+        return body
+
+# ============================================================================
+# STATIC ASSET VERSIONING
+# ============================================================================
+
+class StaticVersioner:
+    """
+    Add a content hash to static URLs (?v=<hash>) and serve versioned URLs
+    with far-future cache headers.
+
+    Changing a file changes its hash and therefore its URL, so browsers can
+    cache every version forever.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._hashes = {}
+        self._lock = threading.Lock()
+
+    def version(self, filename):
+        """
+        Return the content hash of a static file, recomputed when it changes.
+
+        Args:
+            filename (str): Path relative to the static folder
+
+        Returns:
+            str: Short hex digest, or None if the file does not exist
+        """
+        path = os.path.join(self.app.static_folder, filename)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+        with self._lock:
+            cached = self._hashes.get(filename)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:12]
+        with self._lock:
+            self._hashes[filename] = (mtime, digest)
+        return digest
+
+    def add_version(self, endpoint, values):
+        """url_defaults callback adding ?v=<hash> to url_for('static', ...)."""
+        if endpoint == 'static' and 'filename' in values and 'v' not in values:
+            digest = self.version(values['filename'])
+            if digest:
+                values['v'] = digest
+
+    def cache_headers(self, response):
+        """after_request hook marking versioned static responses immutable."""
+        if request.endpoint == 'static' and request.args.get('v') and response.status_code in (200, 304):
+            max_age = self.app.config.get('STATIC_MAX_AGE', 31536000)
+            response.headers['Cache-Control'] = f'public, max-age={max_age}, immutable'
+        return response
+
+
+def init_compression(app):
+    """
+    Register response compression and static asset versioning on an app.
+
+    Args:
+        app (Flask): Application to configure
+    """
+    versioner = StaticVersioner(app)
+    app.url_defaults(versioner.add_version)
+    # after_request hooks run in reverse registration order: cache headers first, then compression
+    app.after_request(ResponseCompressor(app))
+    app.after_request(versioner.cache_headers)
+    app.extensions['static_versioner'] = versioner
@@ -1,6 +1,7 @@
 import os
 from dotenv import load_dotenv
 from sqlalchemy import create_engine, text
+from database import build_binds, build_engine_options, configure_engine, sqlite_pragmas
 
 # Get the absolute path of the current directory
 basedir = os.path.abspath(os.path.dirname(__file__))
@@ -14,10 +15,115 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Connection pool (DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+    # DB_POOL_PRE_PING, DB_STATEMENT_TIMEOUT_MS) or SQLite busy timeout
+    SQLALCHEMY_ENGINE_OPTIONS = build_engine_options(SQLALCHEMY_DATABASE_URI, os.environ)
+    # Applied to every new SQLite connection (WAL, busy timeout, ...)
+    SQLITE_PRAGMAS = sqlite_pragmas(os.environ)
+
+    # Optional read replica for read-only routes; reads stay on the primary
+    # for READ_YOUR_WRITES_SECONDS after a client commits a write
+    SQLALCHEMY_BINDS = build_binds(os.environ.get('REPLICA_DATABASE_URL'), os.environ)
+    READ_YOUR_WRITES_SECONDS = int(os.environ.get('READ_YOUR_WRITES_SECONDS', '10'))
+
+    # AI generation backend: ollama, ollama-chat, ollama-client, openai or fake
+    AI_BACKEND = os.environ.get('AI_BACKEND', 'ollama')
+    AI_MODEL = os.environ.get('AI_MODEL', 'phi3:mini')
+    AI_BASE_URL = os.environ.get('AI_BASE_URL')  # None uses the backend default
+    # Several comma-separated AI_BASE_URL values form a load-balanced pool; a failing endpoint
+    # is ejected after AI_POOL_MAX_FAILURES consecutive errors for AI_POOL_EJECT_SECONDS (doubling)
+    AI_POOL_MAX_FAILURES = int(os.environ.get('AI_POOL_MAX_FAILURES', '3'))
+    AI_POOL_EJECT_SECONDS = float(os.environ.get('AI_POOL_EJECT_SECONDS', '30'))
+    AI_API_KEY = os.environ.get('AI_API_KEY')    # Only used by the openai backend
+    # Generate all AI categories of a quiz with one batched prompt
+    AI_BATCHED_GENERATION = os.environ.get('AI_BATCHED_GENERATION', 'false').lower() in ('1', 'true', 'yes')
+    # Request schema-constrained JSON output (text parser is kept as fallback)
+    AI_STRUCTURED_OUTPUT = os.environ.get('AI_STRUCTURED_OUTPUT', 'false').lower() in ('1', 'true', 'yes')
+    # Model warm-up: keep_alive is sent to Ollama with every request
+    AI_KEEP_ALIVE = os.environ.get('AI_KEEP_ALIVE')  # e.g. "30m"; None uses the server default
+    AI_WARMUP_ON_STARTUP = os.environ.get('AI_WARMUP_ON_STARTUP', 'false').lower() in ('1', 'true', 'yes')
+    AI_WARMUP_INTERVAL = int(os.environ.get('AI_WARMUP_INTERVAL', '0'))  # seconds, 0 disables re-warming
+
+    # Fair admission control for AI generation (see ai_scheduler.py)
+    AI_MAX_CONCURRENT = int(os.environ.get('AI_MAX_CONCURRENT', '0'))            # model calls at once, 0: one per endpoint
+    AI_TEACHER_CONCURRENCY = int(os.environ.get('AI_TEACHER_CONCURRENCY', '1'))  # per teacher
+    AI_QUEUE_LIMIT = int(os.environ.get('AI_QUEUE_LIMIT', '20'))                 # waiting requests
+    AI_TEACHER_QUEUE_LIMIT = int(os.environ.get('AI_TEACHER_QUEUE_LIMIT', '2'))  # waiting per teacher
+    AI_MAX_WAIT = float(os.environ.get('AI_MAX_WAIT', '300'))  # seconds; longer estimated waits are rejected
+    AI_TOKEN_BUDGET = int(os.environ.get('AI_TOKEN_BUDGET', '0'))  # tokens per window, 0 disables the budget
+    AI_BUDGET_WINDOW = float(os.environ.get('AI_BUDGET_WINDOW', '60'))  # seconds
+    AI_TOKENS_PER_QUESTION = int(os.environ.get('AI_TOKENS_PER_QUESTION', '150'))  # budget estimate
+
+    # Optional bearer token protecting the /metrics endpoint
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+    # Opt-in per-request SQL profiling (debug headers, /debug/sql, N+1 warnings)
+    SQL_PROFILING = os.environ.get('SQL_PROFILING', 'false').lower() in ('1', 'true', 'yes')
+    SQL_PROFILING_REPEAT_THRESHOLD = int(os.environ.get('SQL_PROFILING_REPEAT_THRESHOLD', '5'))
+
+    # CSV exports: rows fetched per server-side cursor batch, gzip when the client accepts it
+    CSV_EXPORT_BATCH_SIZE = int(os.environ.get('CSV_EXPORT_BATCH_SIZE', '1000'))
+    CSV_EXPORT_GZIP = os.environ.get('CSV_EXPORT_GZIP', 'true').lower() in ('1', 'true', 'yes')
+
+    # Response compression (gzip, plus brotli when the brotli package is installed)
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '500'))  # bytes
+    COMPRESSION_LEVEL = int(os.environ.get('COMPRESSION_LEVEL', '6'))
+    # Cache lifetime of content-hashed static URLs (?v=<hash>)
+    STATIC_MAX_AGE = int(os.environ.get('STATIC_MAX_AGE', '31536000'))  # one year
+
+    # Give every student their own (deterministic) question and option order
+    SHUFFLE_QUESTIONS = os.environ.get('SHUFFLE_QUESTIONS', 'true').lower() in ('1', 'true', 'yes')
+
+    # Quizzes longer than this are delivered page by page from /quiz/questions (0 disables paging)
+    QUIZ_PAGE_SIZE = int(os.environ.get('QUIZ_PAGE_SIZE', '25'))
+
+    # Write-behind submissions: /submit_quiz stores results in a durable local
+    # journal and a background writer flushes them to the database in batches
+    SUBMISSION_WRITE_BEHIND = os.environ.get('SUBMISSION_WRITE_BEHIND', 'false').lower() in ('1', 'true', 'yes')
+    SUBMISSION_JOURNAL_PATH = os.environ.get('SUBMISSION_JOURNAL_PATH', os.path.join(basedir, 'instance', 'submissions.db'))
+    SUBMISSION_BATCH_SIZE = int(os.environ.get('SUBMISSION_BATCH_SIZE', '200'))
+    SUBMISSION_FLUSH_INTERVAL = float(os.environ.get('SUBMISSION_FLUSH_INTERVAL', '1.0'))  # seconds
+    # A failed write is retried after SUBMISSION_RETRY_DELAY seconds, doubling each time
+    SUBMISSION_MAX_ATTEMPTS = int(os.environ.get('SUBMISSION_MAX_ATTEMPTS', '5'))
+    SUBMISSION_RETRY_DELAY = float(os.environ.get('SUBMISSION_RETRY_DELAY', '5.0'))
+
+    # Server-side sessions: the cookie only carries a signed session ID. The store also keeps
+    # one-shot blobs such as the student password sheet (sqlite, filesystem or redis)
+    SERVER_SIDE_SESSIONS = os.environ.get('SERVER_SIDE_SESSIONS', 'true').lower() in ('1', 'true', 'yes')
+    SESSION_STORE = os.environ.get('SESSION_STORE', 'sqlite')
+    # SQLite file, directory or Redis URL; defaults to instance/ for the local stores
+    SESSION_STORE_LOCATION = os.environ.get('SESSION_STORE_LOCATION', {
+        'sqlite': os.path.join(basedir, 'instance', 'sessions.db'),
+        'filesystem': os.path.join(basedir, 'instance', 'sessions')
+    }.get(SESSION_STORE))
+    PASSWORD_SHEET_TTL = int(os.environ.get('PASSWORD_SHEET_TTL', '900'))  # seconds to download it
+
+    # Item analysis of question bank items from recorded responses (see item_analysis.py); items with at
+    # least ITEM_MIN_RESPONSES responses discriminating below ITEM_MIN_DISCRIMINATION are flagged
+    # Each worker would run its own job; prefer a scheduled `python analyze_items.py` (cron)
+    ITEM_ANALYSIS_INTERVAL = float(os.environ.get('ITEM_ANALYSIS_INTERVAL', '0'))  # seconds, 0 disables the job
+    ITEM_MIN_RESPONSES = int(os.environ.get('ITEM_MIN_RESPONSES', '30'))
+    ITEM_MIN_DISCRIMINATION = float(os.environ.get('ITEM_MIN_DISCRIMINATION', '0.1'))
+    ITEM_AUTO_RETIRE = os.environ.get('ITEM_AUTO_RETIRE', 'false').lower() in ('1', 'true', 'yes')  # retire flagged items
+
+    # Semantic question index (see question_index.py): sentence embeddings of the question bank, built
+    # on the CPU by `python index_questions.py` and memory-mapped by the app for "more like this"
+    QUESTION_INDEX_PATH = os.environ.get('QUESTION_INDEX_PATH', os.path.join(basedir, 'instance', 'question_index'))
+    EMBEDDING_BACKEND = os.environ.get('EMBEDDING_BACKEND', 'transformers')  # 'transformers' or 'hashing' (no model)
+    EMBEDDING_MODEL = os.environ.get('EMBEDDING_MODEL', 'sentence-transformers/all-MiniLM-L6-v2')
+    EMBEDDING_BATCH_SIZE = int(os.environ.get('EMBEDDING_BATCH_SIZE', '64'))
+    EMBEDDING_THREADS = int(os.environ.get('EMBEDDING_THREADS', '0'))  # CPU threads for inference, 0 = torch default
+    # Bank quizzes avoid drawing two questions at least this similar (cosine) while others are left;
+    # about 0.85 suits the default model, 0.7 the hashing backend
+    DIVERSE_SAMPLING = os.environ.get('DIVERSE_SAMPLING', 'true').lower() in ('1', 'true', 'yes')
+    SIMILARITY_THRESHOLD = float(os.environ.get('SIMILARITY_THRESHOLD', '0.85'))
+
 def test_connection():
     """Test production database connection."""
     try:
-        engine = create_engine(Config.SQLALCHEMY_DATABASE_URI)
+        engine = create_engine(Config.SQLALCHEMY_DATABASE_URI, **Config.SQLALCHEMY_ENGINE_OPTIONS)
+        configure_engine(engine, Config.SQLITE_PRAGMAS)
         with engine.connect() as conn:
             conn.execute(text("SELECT 1"))
         print("✅ Database connection successful!")
@@ -0,0 +1,236 @@
+import time
+from functools import wraps
+from flask import current_app, g, has_request_context, session
+from flask_sqlalchemy.session import Session as FlaskSession
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+from metrics import registry as metrics
+
+# Bind key used for the read replica in SQLALCHEMY_BINDS
+REPLICA_BIND = 'replica'
+
+# Flask session key holding the time until which reads must use the primary
+PRIMARY_UNTIL_KEY = '_db_primary_until'
+
+# ============================================================================
+# ENGINE OPTIONS
+# ============================================================================
+
+def build_engine_options(database_uri, env):
+    """
+    Build SQLALCHEMY_ENGINE_OPTIONS for the configured database.
+
+    Server databases get an instrumented connection pool; SQLite gets a busy
+    timeout and relies on `configure_engine` for its pragmas.
+
+    Args:
+        database_uri (str): SQLAlchemy database URI
+        env (Mapping): Environment variables to read settings from
+
+    Returns:
+        dict: Keyword arguments for sqlalchemy.create_engine
+    """
+    if not database_uri:
+        return {}
+
+    if database_uri.startswith('sqlite'):
+        busy_timeout_ms = int(env.get('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+        return {
+            'connect_args': {
+                'timeout': busy_timeout_ms / 1000,
+                'check_same_thread': False
+            }
+        }
+
+    options = {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': int(env.get('DB_POOL_SIZE', '10')),
+        'max_overflow': int(env.get('DB_MAX_OVERFLOW', '20')),
+        'pool_timeout': float(env.get('DB_POOL_TIMEOUT', '10')),
+        'pool_recycle': int(env.get('DB_POOL_RECYCLE', '1800')),
+        'pool_pre_ping': env.get('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+    }
+
+    # Server-side statement timeout (PostgreSQL), in milliseconds
+    statement_timeout_ms = int(env.get('DB_STATEMENT_TIMEOUT_MS', '0'))
+    if statement_timeout_ms > 0 and database_uri.startswith('postgresql'):
+        options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout_ms}'}
+
+    return options
+
+def sqlite_pragmas(env):
+    """
+    Return the PRAGMA statements applied to every new SQLite connection.
+
+    Args:
+        env (Mapping): Environment variables to read settings from
+
+    Returns:
+        dict: PRAGMA name -> value
+    """
+    return {
+        'journal_mode': env.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': env.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': int(env.get('SQLITE_BUSY_TIMEOUT_MS', '5000')),
+        'foreign_keys': 'ON',
+        'temp_store': 'MEMORY'
+    }
+
+# ============================================================================
+# POOL INSTRUMENTATION
+# ============================================================================
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long callers wait to check out a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            metrics.inc('db_pool_checkout_failures_total')
+            raise
+        finally:
+            metrics.observe('db_pool_checkout_wait_seconds', time.perf_counter() - started)
+
+def configure_engine(engine, pragmas=None):
+    """
+    Attach SQLite pragmas and pool usage metrics to an engine.
+
+    Args:
+        engine (Engine): Engine created by Flask-SQLAlchemy
+        pragmas (dict, optional): PRAGMA values applied to SQLite connections
+    """
+    name = engine.url.get_backend_name()
+
+    if name == 'sqlite' and pragmas:
+        @event.listens_for(engine, 'connect')
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma, value in pragmas.items():
+                cursor.execute(f'PRAGMA {pragma}={value}')
+            cursor.close()
+
+    @event.listens_for(engine, 'checkout')
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info['checked_out_at'] = time.perf_counter()
+        _record_pool_status(engine)
+
+    @event.listens_for(engine, 'checkin')
+    def on_checkin(dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop('checked_out_at', None)
+        if checked_out_at is not None:
+            metrics.observe('db_connection_use_seconds', time.perf_counter() - checked_out_at)
+        _record_pool_status(engine)
+
+def _record_pool_status(engine):
+    """Publish the current pool occupancy as gauges."""
+    pool = engine.pool
+    if isinstance(pool, QueuePool):
+        metrics.set('db_pool_size', pool.size())
+        metrics.set('db_pool_checked_out', pool.checkedout())
+        metrics.set('db_pool_overflow', max(pool.overflow(), 0))
+
+def init_engines(app, db):
+    """
+    Configure every engine of a Flask-SQLAlchemy instance.
+
+    Args:
+        app (Flask): Application with SQLALCHEMY_* configuration
+        db (SQLAlchemy): Flask-SQLAlchemy extension bound to the app
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            configure_engine(engine, app.config.get('SQLITE_PRAGMAS'))
+
+def create_db_app(config_object=None):
+    """
+    Build a minimal Flask app with only the database configured.
+    
+    For CLI scripts (question import, seeding) that need an app context but
+    not the web routes, AI components or background services.
+    
+    Args:
+        config_object (object, optional): Configuration class; defaults to config.Config
+        
+    Returns:
+        Flask: Application bound to the database extension
+    """
+    from flask import Flask
+    from config import Config
+    from models import db
+
+    app = Flask(__name__)
+    app.config.from_object(config_object or Config)
+    db.init_app(app)
+    init_engines(app, db)
+    return app
+
+# ============================================================================
+# READ REPLICA ROUTING
+# ============================================================================
+
+def build_binds(replica_uri, env):
+    """
+    Build SQLALCHEMY_BINDS with an optional read replica.
+
+    Args:
+        replica_uri (str): Replica database URI, or None to disable routing
+        env (Mapping): Environment variables for engine options
+
+    Returns:
+        dict: Bind configuration for Flask-SQLAlchemy
+    """
+    if not replica_uri:
+        return {}
+    return {REPLICA_BIND: {'url': replica_uri, **build_engine_options(replica_uri, env)}}
+
+class RoutingSession(FlaskSession):
+    """
+    Session that sends reads from read-only routes to the replica engine.
+
+    Everything else, including any flush, goes to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and _reads_from_replica():
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def _reads_from_replica():
+    """Return True if the current request was routed to the replica."""
+    return has_request_context() and g.get('db_read_replica', False)
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _remember_primary_write(db_session):
+    """
+    Pin this client's reads to the primary for a short window after a write.
+
+    Guarantees read-your-writes (e.g. a teacher opening /exam_teacher right
+    after creating a quiz) while the replica catches up.
+    """
+    if not has_request_context():
+        return
+    window = current_app.config.get('READ_YOUR_WRITES_SECONDS', 0)
+    if window and REPLICA_BIND in current_app.config.get('SQLALCHEMY_BINDS', {}):
+        session[PRIMARY_UNTIL_KEY] = time.time() + window
+
+def read_only_route(f):
+    """
+    Decorator routing a view's queries to the read replica, if configured.
+
+    Clients that wrote within READ_YOUR_WRITES_SECONDS keep reading from the primary.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        primary_until = session.get(PRIMARY_UNTIL_KEY)
+        use_replica = primary_until is None or primary_until < time.time()
+        if use_replica and primary_until is not None:
+            # The read-your-writes window has expired
+            session.pop(PRIMARY_UNTIL_KEY)
+        g.db_read_replica = use_replica
+        metrics.inc('db_read_routes_total', target='replica' if use_replica else 'primary')
+        return f(*args, **kwargs)
+    return decorated_function
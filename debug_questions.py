@@ -1,6 +1,8 @@
-from app import app
+from database import create_db_app
 from models import db, QuestionBank
 
+app = create_db_app()
+
 def add_sample_questions():
     """
     Add sample questions to test the system.
@@ -0,0 +1,62 @@
+"""
+Question Index Script
+Embeds the question bank items not yet in the semantic question index
+(QUESTION_INDEX_PATH) on the CPU. The running app picks up new rows on its
+next lookup. migrate_questions.py runs this after importing questions.
+
+Usage:
+    python index_questions.py                       # embed new questions
+    python index_questions.py --rebuild             # re-embed everything (new model, edited questions)
+    python index_questions.py --backend hashing     # no model download
+"""
+
+import argparse
+from config import Config
+from database import create_db_app
+from models import db
+from question_index import QuestionIndex, create_encoder, update_question_index
+
+app = create_db_app()
+
+def index_questions(rebuild=False, backend=None, model=None):
+    """
+    Embed new (or, with rebuild, all) questions and report progress.
+
+    Args:
+        rebuild (bool): Re-embed every question into a new index generation
+        backend (str, optional): Defaults to EMBEDDING_BACKEND
+        model (str, optional): Defaults to EMBEDDING_MODEL
+    """
+    backend = backend or Config.EMBEDDING_BACKEND
+    print(f"🧠 Loading {backend} encoder...")
+    encoder = create_encoder(backend, model or Config.EMBEDDING_MODEL, Config.EMBEDDING_BATCH_SIZE,
+                             Config.EMBEDDING_THREADS)
+    index = QuestionIndex(Config.QUESTION_INDEX_PATH)
+    with app.app_context():
+        summary = update_question_index(index, encoder, rebuild=rebuild)
+    rate = summary['added'] / summary['seconds'] if summary['seconds'] else 0
+    print(f"✅ Embedded {summary['added']} questions in {summary['seconds']:.2f}s ({rate:.0f}/s); "
+          f"{summary['total']} questions indexed in {Config.QUESTION_INDEX_PATH}")
+
+def main():
+    """Update the semantic question index."""
+    parser = argparse.ArgumentParser(description="Embed question bank items for similarity search")
+    parser.add_argument("--rebuild", action="store_true", help="Re-embed all questions")
+    parser.add_argument("--backend", choices=['transformers', 'hashing'], help="Overrides EMBEDDING_BACKEND")
+    parser.add_argument("--model", help="Overrides EMBEDDING_MODEL")
+    args = parser.parse_args()
+
+    print("🚀 AI QuizLab - Question Index")
+    print("=" * 50)
+
+    with app.app_context():
+        db.create_all()
+    try:
+        index_questions(args.rebuild, args.backend, args.model)
+    except (RuntimeError, ValueError) as e:
+        print(f"❌ {e}")
+        if 'rebuild' in str(e):
+            print("💡 Run: python index_questions.py --rebuild")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+import json
+import threading
+import time
+from datetime import datetime
+from itertools import chain
+import numpy as np
+from sqlalchemy import Integer, func, select, type_coerce, update
+from metrics import registry as metrics, log_event
+from models import db, QuestionBank, QuestionResponse, QuizQuestion
+
+# Slots of option_counts: option_a-option_d, then unanswered (QuestionResponse.choice -1)
+OPTION_SLOTS = 5
+
+# ============================================================================
+# VECTORIZED ITEM ANALYSIS
+# ============================================================================
+
+def analyze_items(item_ids, attempt_ids, choices, correct):
+    """
+    Compute difficulty, discrimination and option frequencies per item.
+
+    Each array has one entry per response. Discrimination is the corrected
+    point-biserial correlation: between answering the item correctly and
+    the proportion correct on the other questions of the same attempt, so
+    quizzes of different lengths are comparable and the item does not
+    correlate with itself. Responses with item ID -1 (e.g. AI questions)
+    count toward their attempt's score but are not reported.
+
+    Args:
+        item_ids (ndarray): Item of each response (QuestionBank ID, or -1)
+        attempt_ids (ndarray): Attempt of each response (one value per student and quiz)
+        choices (ndarray): Chosen option 0-3, or -1 when unanswered
+        correct (ndarray): 1 if the response was correct, else 0
+
+    Returns:
+        dict: Arrays indexed like 'items': 'items', 'responses', 'difficulty',
+            'discrimination' (NaN when undefined) and 'option_counts' (items x 5)
+    """
+    x = np.asarray(correct, dtype=np.float64)
+    _, attempt_index = np.unique(attempt_ids, return_inverse=True)
+    attempt_correct = np.bincount(attempt_index, weights=x)
+    attempt_size = np.bincount(attempt_index)
+
+    # Rest score: proportion correct on the attempt's other questions
+    others = attempt_size[attempt_index] - 1
+    has_others = others > 0
+    rest = np.divide(attempt_correct[attempt_index] - x, others, out=np.zeros_like(x), where=has_others)
+
+    reported = np.asarray(item_ids) >= 0
+    items, item_index = np.unique(np.asarray(item_ids)[reported], return_inverse=True)
+    x, rest, has_others = x[reported], rest[reported], has_others[reported]
+    slots = np.asarray(choices)[reported]
+    slots = np.where((slots < 0) | (slots >= OPTION_SLOTS - 1), OPTION_SLOTS - 1, slots)
+
+    size = len(items)
+    responses = np.bincount(item_index, minlength=size)
+    correct_count = np.bincount(item_index, weights=x, minlength=size)
+
+    # Pearson correlation from grouped sums; x is 0/1, so the sum of x squared is the sum of x
+    w = has_others.astype(np.float64)
+    n = np.bincount(item_index, weights=w, minlength=size)
+    sx = np.bincount(item_index, weights=x * w, minlength=size)
+    sy = np.bincount(item_index, weights=rest * w, minlength=size)
+    sxy = np.bincount(item_index, weights=x * rest * w, minlength=size)
+    syy = np.bincount(item_index, weights=rest * rest * w, minlength=size)
+    covariance = n * sxy - sx * sy
+    spread = np.sqrt(np.clip((n * sx - sx * sx) * (n * syy - sy * sy), 0, None))
+    discrimination = np.divide(covariance, spread, out=np.full(size, np.nan), where=spread > 1e-12)
+
+    option_counts = np.bincount(item_index * OPTION_SLOTS + slots, minlength=size * OPTION_SLOTS)
+    return {
+        'items': items,
+        'responses': responses,
+        'difficulty': correct_count / np.maximum(responses, 1),
+        'discrimination': discrimination,
+        'option_counts': option_counts.reshape(size, OPTION_SLOTS)
+    }
+
+def load_responses():
+    """
+    Read all recorded responses as arrays for analyze_items().
+
+    Returns:
+        tuple: (item_ids, attempt_ids, choices, correct) int64 arrays
+    """
+    # Core execution without per-row result processing (ORM rows, Boolean conversion):
+    # it would take most of the time for 100k responses
+    rows = db.session.connection().execute(
+        select(func.coalesce(QuizQuestion.bank_question_id, -1), QuestionResponse.student_id,
+               QuestionResponse.quiz_id, QuestionResponse.choice, type_coerce(QuestionResponse.correct, Integer))
+        .join(QuizQuestion, QuestionResponse.quiz_question_id == QuizQuestion.id)
+    ).fetchall()
+    data = np.fromiter(chain.from_iterable(rows), dtype=np.int64, count=len(rows) * 5).reshape(-1, 5)
+    item_ids, student_ids, quiz_ids, choices, correct = data.T
+    return item_ids, (student_ids << 32) | quiz_ids, choices, correct
+
+def run_item_analysis(min_responses=30, min_discrimination=0.1, retire=False):
+    """
+    Analyze all responses and write the results to QuestionBank.
+
+    Args:
+        min_responses (int): Responses an item needs before it can be flagged
+        min_discrimination (float): Items discriminating less than this are flagged
+        retire (bool): Retire flagged items so they are not used in new quizzes
+
+    Returns:
+        dict: 'items', 'responses', 'flagged' (QuestionBank IDs), 'retired' and 'seconds'
+    """
+    started = time.perf_counter()
+    item_ids, attempt_ids, choices, correct = load_responses()
+    analysis = analyze_items(item_ids, attempt_ids, choices, correct)
+
+    existing = set(db.session.execute(select(QuestionBank.id)).scalars())
+    now = datetime.utcnow()
+    updates, flagged = [], []
+    for item, responses, difficulty, discrimination, counts in zip(
+            analysis['items'].tolist(), analysis['responses'].tolist(), analysis['difficulty'].tolist(),
+            analysis['discrimination'].tolist(), analysis['option_counts'].tolist()):
+        if item not in existing:
+            continue
+        discrimination = None if np.isnan(discrimination) else round(discrimination, 4)
+        updates.append({'id': item, 'response_count': responses, 'difficulty': round(difficulty, 4),
+                        'discrimination': discrimination, 'option_counts': json.dumps(counts),
+                        'analyzed_at': now})
+        # Undefined discrimination (e.g. everyone answered correctly) is no evidence of a poor item
+        if responses >= min_responses and discrimination is not None and discrimination < min_discrimination:
+            flagged.append(item)
+
+    if updates:
+        db.session.execute(update(QuestionBank), updates)
+    retired = 0
+    if retire and flagged:
+        retired = db.session.execute(
+            update(QuestionBank.__table__).where(QuestionBank.id.in_(flagged), QuestionBank.is_retired.is_(False))
+            .values(is_retired=True)
+        ).rowcount
+    db.session.commit()
+
+    seconds = time.perf_counter() - started
+    metrics.observe('item_analysis_seconds', seconds)
+    log_event('item_analysis', items=len(updates), responses=len(item_ids), flagged=len(flagged),
+              retired=retired, seconds=round(seconds, 4))
+    return {'items': len(updates), 'responses': len(item_ids), 'flagged': flagged, 'retired': retired,
+            'seconds': seconds}
+
+# ============================================================================
+# BACKGROUND JOB
+# ============================================================================
+
+class ItemAnalysisJob:
+    """
+    Background thread re-running the item analysis at a fixed interval.
+    """
+
+    def __init__(self, app, interval=3600, **options):
+        """
+        Initialize the job.
+
+        Args:
+            app (Flask): Application providing the database context
+            interval (float): Seconds between runs; the first run waits one interval
+            **options: Passed to run_item_analysis()
+        """
+        self.app = app
+        self.interval = interval
+        self.options = options
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the background thread."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='item-analysis', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the thread after the current run."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=30)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                with self.app.app_context():
+                    run_item_analysis(**self.options)
+            except Exception as e:
+                print(f"⚠️ Item analysis error: {e}")
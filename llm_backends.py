@@ -0,0 +1,934 @@
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+
+import requests
+
+
+# ============================================================================
+# URL HELPERS
+# ============================================================================
+
+def _server_root(url: str) -> str:
+    """
+    Strip a known API path from a URL so backends can build their own endpoints.
+
+    Args:
+        url (str): Base URL or full endpoint URL (e.g. ".../api/generate")
+
+    Returns:
+        str: Server root URL without trailing slash
+    """
+    url = url.rstrip('/')
+    for suffix in ('/api/generate', '/api/chat', '/api/tags', '/api'):
+        if url.endswith(suffix):
+            return url[:-len(suffix)]
+    return url
+
+
+# ============================================================================
+# BACKEND INTERFACE
+# ============================================================================
+
+class LLMBackend:
+    """
+    Base class for text generation backends used by QuizGenerator.
+
+    Subclasses implement `generate` and `check_connection`. `generate` returns
+    a dictionary with the generated text under 'response' and backend-specific
+    timing/token statistics under 'stats'.
+    """
+
+    name = 'base'
+    supports_keep_alive = False
+
+    def __init__(self, model: str = "phi3:mini", base_url: str = None, timeout: int = 60):
+        """
+        Initialize the backend.
+
+        Args:
+            model (str): Model name understood by the backend
+            base_url (str): Server URL for HTTP backends
+            timeout (int): Request timeout in seconds
+        """
+        self.model = model
+        self.base_url = base_url
+        self.timeout = timeout
+        self._async_http = None
+
+    def generate(self, prompt: str, **options) -> dict:
+        """
+        Generate a completion for the given prompt.
+
+        Args:
+            prompt (str): The prompt to send to the model
+            **options: Generation options. `format` ("json" or a JSON schema
+                dict) requests structured output on backends that support it
+
+        Returns:
+            dict: {'response': str, 'stats': dict}
+
+        Raises:
+            ConnectionError: If the backend cannot be reached
+            ValueError: If the backend returns an invalid response
+        """
+        raise NotImplementedError
+
+    def check_connection(self) -> bool:
+        """
+        Check whether the backend is reachable.
+
+        Returns:
+            bool: True if the backend can serve requests, False otherwise
+        """
+        raise NotImplementedError
+
+    async def agenerate(self, prompt: str, **options) -> dict:
+        """
+        Async variant of `generate` for use on an asyncio event loop.
+
+        The default runs `generate` in a worker thread; HTTP backends override
+        it with a non-blocking httpx request.
+
+        Args:
+            prompt (str): The prompt to send to the model
+            **options: Generation options (see `generate`)
+
+        Returns:
+            dict: {'response': str, 'stats': dict}
+        """
+        return await asyncio.to_thread(self.generate, prompt, **options)
+
+    async def acheck_connection(self) -> bool:
+        """Async variant of `check_connection`."""
+        return await asyncio.to_thread(self.check_connection)
+
+    async def aclose(self) -> None:
+        """Close the async HTTP client, if one was opened."""
+        if self._async_http is not None:
+            _, client = self._async_http
+            self._async_http = None
+            await client.aclose()
+
+    def warm_up(self, keep_alive=None) -> dict:
+        """
+        Load the model into memory without generating any text.
+
+        Backends without an explicit load step treat this as a no-op.
+
+        Args:
+            keep_alive (str or int, optional): How long the server should keep
+                the model loaded afterwards (Ollama duration, e.g. "30m")
+
+        Returns:
+            dict: Statistics, including 'load_duration' in seconds when known
+        """
+        return {}
+
+    def _post_json(self, url: str, payload: dict, headers: dict = None) -> dict:
+        """
+        POST a JSON payload and return the decoded JSON body.
+
+        Args:
+            url (str): Endpoint URL
+            payload (dict): JSON request body
+            headers (dict, optional): Extra request headers
+
+        Returns:
+            dict: Decoded JSON response
+
+        Raises:
+            ConnectionError: If the request fails
+            ValueError: If the body is not valid JSON
+        """
+        request_headers = {"Content-Type": "application/json"}
+        if headers:
+            request_headers.update(headers)
+
+        try:
+            response = requests.post(url, headers=request_headers, json=payload, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            raise ConnectionError(f"Error connecting to {self.name} backend: {e}")
+
+        try:
+            return response.json()
+        except Exception as e:
+            raise ValueError(f"Invalid response from {self.name} backend: {e}")
+
+    def _get_ok(self, url: str, headers: dict = None) -> bool:
+        """Return True if a GET request to the URL answers with HTTP 200."""
+        try:
+            response = requests.get(url, headers=headers, timeout=self.timeout)
+            return response.status_code == 200
+        except Exception:
+            return False
+
+    def _async_client(self):
+        """
+        Return the httpx.AsyncClient for the running event loop.
+
+        httpx is imported on first use. Pooled connections belong to one event
+        loop, so a new client is created when the backend is used from another.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_http is None or self._async_http[0] is not loop:
+            import httpx
+            client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=None, max_keepalive_connections=100)
+            )
+            self._async_http = (loop, client)
+        return self._async_http[1]
+
+    async def _apost_json(self, url: str, payload: dict, headers: dict = None) -> dict:
+        """
+        Async variant of `_post_json` using httpx.
+
+        Raises:
+            ConnectionError: If the request fails
+            ValueError: If the body is not valid JSON
+        """
+        import httpx
+
+        request_headers = {"Content-Type": "application/json"}
+        if headers:
+            request_headers.update(headers)
+
+        try:
+            response = await self._async_client().post(url, headers=request_headers, json=payload)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            raise ConnectionError(f"Error connecting to {self.name} backend: {e or type(e).__name__}")
+
+        try:
+            return response.json()
+        except Exception as e:
+            raise ValueError(f"Invalid response from {self.name} backend: {e}")
+
+    async def _aget_ok(self, url: str, headers: dict = None) -> bool:
+        """Async variant of `_get_ok`."""
+        try:
+            response = await self._async_client().get(url, headers=headers)
+            return response.status_code == 200
+        except Exception:
+            return False
+
+
+class HTTPBackend(LLMBackend):
+    """
+    Backend talking JSON over HTTP, with matching sync (requests) and async
+    (httpx) code paths.
+
+    Subclasses describe a generation request with `_generate_request` and
+    decode it with `_parse_response`; `_health_url` is polled by
+    `check_connection`.
+    """
+
+    def _generate_request(self, prompt: str, options: dict) -> tuple:
+        """
+        Build the HTTP request for a prompt.
+
+        Returns:
+            tuple: (url, JSON payload, extra headers or None)
+        """
+        raise NotImplementedError
+
+    def _parse_response(self, response_data: dict) -> dict:
+        """Convert a decoded response into {'response': str, 'stats': dict}."""
+        raise NotImplementedError
+
+    def _health_request(self) -> tuple:
+        """Return (url, headers) of the endpoint used to check connectivity."""
+        raise NotImplementedError
+
+    def generate(self, prompt: str, **options) -> dict:
+        url, payload, headers = self._generate_request(prompt, options)
+        return self._parse_response(self._post_json(url, payload, headers))
+
+    async def agenerate(self, prompt: str, **options) -> dict:
+        url, payload, headers = self._generate_request(prompt, options)
+        return self._parse_response(await self._apost_json(url, payload, headers))
+
+    def check_connection(self) -> bool:
+        return self._get_ok(*self._health_request())
+
+    async def acheck_connection(self) -> bool:
+        return await self._aget_ok(*self._health_request())
+
+
+# ============================================================================
+# OLLAMA BACKENDS
+# ============================================================================
+
+class OllamaGenerateBackend(HTTPBackend):
+    """Ollama `/api/generate` endpoint (single prompt, non-streaming)."""
+
+    name = 'ollama'
+    supports_keep_alive = True
+
+    def __init__(self, model: str = "phi3:mini", base_url: str = "http://localhost:11434", timeout: int = 60):
+        super().__init__(model, _server_root(base_url), timeout)
+
+    def _generate_request(self, prompt: str, options: dict) -> tuple:
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": False
+        }
+        payload.update(options)
+        return f"{self.base_url}/api/generate", payload, None
+
+    def _parse_response(self, response_data: dict) -> dict:
+        return {
+            'response': response_data.get("response", ""),
+            'stats': _ollama_stats(response_data)
+        }
+
+    def _health_request(self) -> tuple:
+        return f"{self.base_url}/api/tags", None
+
+    def warm_up(self, keep_alive=None) -> dict:
+        # A generate request without a prompt only loads the model
+        payload = {"model": self.model, "stream": False}
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+        return _ollama_stats(self._post_json(f"{self.base_url}/api/generate", payload))
+
+
+class OllamaChatBackend(OllamaGenerateBackend):
+    """Ollama `/api/chat` endpoint with the prompt sent as a single user message."""
+
+    name = 'ollama-chat'
+
+    def _generate_request(self, prompt: str, options: dict) -> tuple:
+        payload = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "stream": False
+        }
+        payload.update(options)
+        return f"{self.base_url}/api/chat", payload, None
+
+    def _parse_response(self, response_data: dict) -> dict:
+        message = response_data.get("message") or {}
+        return {
+            'response': message.get("content", ""),
+            'stats': _ollama_stats(response_data)
+        }
+
+
+class OllamaClientBackend(LLMBackend):
+    """Backend built on the official `ollama` Python client package."""
+
+    name = 'ollama-client'
+    supports_keep_alive = True
+
+    def __init__(self, model: str = "phi3:mini", base_url: str = "http://localhost:11434", timeout: int = 60):
+        super().__init__(model, _server_root(base_url), timeout)
+        self._client = None
+
+    @property
+    def client(self):
+        """Lazily create the ollama client so the package is only needed when used."""
+        if self._client is None:
+            import ollama
+            self._client = ollama.Client(host=self.base_url, timeout=self.timeout)
+        return self._client
+
+    def generate(self, prompt: str, **options) -> dict:
+        try:
+            response_data = self.client.generate(model=self.model, prompt=prompt, stream=False, **options)
+        except ImportError:
+            raise
+        except Exception as e:
+            raise ConnectionError(f"Error connecting to {self.name} backend: {e}")
+
+        # Recent client versions return pydantic models; normalize to a dict
+        if hasattr(response_data, 'model_dump'):
+            response_data = response_data.model_dump()
+
+        return {
+            'response': response_data.get("response", "") or "",
+            'stats': _ollama_stats(response_data)
+        }
+
+    def check_connection(self) -> bool:
+        try:
+            self.client.list()
+            return True
+        except Exception:
+            return False
+
+    def warm_up(self, keep_alive=None) -> dict:
+        options = {} if keep_alive is None else {'keep_alive': keep_alive}
+        try:
+            response_data = self.client.generate(model=self.model, prompt='', stream=False, **options)
+        except ImportError:
+            raise
+        except Exception as e:
+            raise ConnectionError(f"Error connecting to {self.name} backend: {e}")
+        if hasattr(response_data, 'model_dump'):
+            response_data = response_data.model_dump()
+        return _ollama_stats(response_data)
+
+
+def _ollama_stats(response_data: dict) -> dict:
+    """
+    Extract timing and token statistics from an Ollama response.
+
+    Ollama reports durations in nanoseconds; they are converted to seconds.
+
+    Args:
+        response_data (dict): Decoded Ollama response
+
+    Returns:
+        dict: Statistics with keys such as 'eval_count' and 'eval_duration'
+    """
+    stats = {}
+    for key in ('prompt_eval_count', 'eval_count'):
+        if response_data.get(key) is not None:
+            stats[key] = response_data[key]
+    for key in ('total_duration', 'load_duration', 'prompt_eval_duration', 'eval_duration'):
+        if response_data.get(key) is not None:
+            stats[key] = response_data[key] / 1e9
+    return stats
+
+
+# ============================================================================
+# OPENAI-COMPATIBLE BACKEND
+# ============================================================================
+
+class OpenAICompatibleBackend(HTTPBackend):
+    """
+    OpenAI-compatible `/v1/chat/completions` server (llama.cpp, vLLM, LM Studio, ...).
+    """
+
+    name = 'openai'
+
+    def __init__(self, model: str = "phi3:mini", base_url: str = "http://localhost:8000/v1",
+                 timeout: int = 60, api_key: str = None):
+        super().__init__(model, base_url.rstrip('/'), timeout)
+        self.api_key = api_key
+
+    def _headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+
+    def _generate_request(self, prompt: str, options: dict) -> tuple:
+        payload = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "stream": False
+        }
+
+        # Translate Ollama-style `format` into OpenAI `response_format`
+        options = dict(options)
+        output_format = options.pop('format', None)
+        if isinstance(output_format, dict):
+            payload["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": "quiz", "schema": output_format}
+            }
+        elif output_format == 'json':
+            payload["response_format"] = {"type": "json_object"}
+        payload.update(options)
+        return f"{self.base_url}/chat/completions", payload, self._headers()
+
+    def _parse_response(self, response_data: dict) -> dict:
+        try:
+            text = response_data["choices"][0]["message"]["content"] or ""
+        except (KeyError, IndexError, TypeError) as e:
+            raise ValueError(f"Invalid response from {self.name} backend: {e}")
+
+        usage = response_data.get("usage") or {}
+        stats = {}
+        if usage.get("prompt_tokens") is not None:
+            stats['prompt_eval_count'] = usage["prompt_tokens"]
+        if usage.get("completion_tokens") is not None:
+            stats['eval_count'] = usage["completion_tokens"]
+
+        return {'response': text, 'stats': stats}
+
+    def _health_request(self) -> tuple:
+        return f"{self.base_url}/models", self._headers()
+
+
+# ============================================================================
+# DETERMINISTIC FAKE BACKEND
+# ============================================================================
+
+class FakeBackend(LLMBackend):
+    """
+    In-process backend that answers prompts with well-formed synthetic questions.
+
+    Output is deterministic for a given seed and call order, which makes it
+    suitable for load-testing concurrency, caching and retry behavior offline.
+    """
+
+    name = 'fake'
+
+    PROMPT_PATTERN = re.compile(
+        r'Generate exactly (\d+) multiple choice questions about "([^"]+)" appropriate for "([^"]+)"'
+    )
+    SECTION_PATTERN = re.compile(
+        r'\[SECTION (\d+)\] (\d+) questions about "([^"]+)" appropriate for "([^"]+)"'
+    )
+
+    def __init__(self, model: str = "fake", base_url: str = None, timeout: int = 60,
+                 latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 malformed_rate: float = 0.0, tokens_per_second: float = 0.0, seed: int = 0,
+                 load_latency: float = 0.0):
+        """
+        Initialize the fake backend.
+
+        Args:
+            latency (float): Fixed delay in seconds added to every call
+            jitter (float): Maximum extra random delay in seconds
+            error_rate (float): Probability (0-1) that a call raises ConnectionError
+            malformed_rate (float): Probability (0-1) that a generated question is malformed
+            tokens_per_second (float): If > 0, simulate decode time from output length
+            seed (int): Seed for the deterministic random generator
+            load_latency (float): Simulated model load time paid by the first call
+        """
+        super().__init__(model, base_url, timeout)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.tokens_per_second = tokens_per_second
+        self.seed = seed
+        self.load_latency = load_latency
+        self.loaded = False
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _claim_load(self) -> float:
+        """Mark the model loaded; return the load time this call has to pay."""
+        with self._lock:
+            if self.loaded:
+                return 0.0
+            self.loaded = True
+        return self.load_latency
+
+    def _load_model(self) -> float:
+        """Simulate a cold model load once; return the load time paid by this call."""
+        load_duration = self._claim_load()
+        if load_duration:
+            time.sleep(load_duration)
+        return load_duration
+
+    def _next_random(self) -> random.Random:
+        """Return a generator seeded from the backend seed and call number."""
+        with self._lock:
+            self.calls += 1
+            call_number = self.calls
+        return random.Random(self.seed * 1_000_003 + call_number)
+
+    def generate(self, prompt: str, **options) -> dict:
+        load_duration = self._load_model()
+        started = time.perf_counter()
+        delay, result = self._respond(prompt, options, load_duration)
+        if delay:
+            time.sleep(delay)
+        return self._finish_response(result, started)
+
+    async def agenerate(self, prompt: str, **options) -> dict:
+        load_duration = self._claim_load()
+        if load_duration:
+            await asyncio.sleep(load_duration)
+        started = time.perf_counter()
+        delay, result = self._respond(prompt, options, load_duration)
+        if delay:
+            await asyncio.sleep(delay)
+        return self._finish_response(result, started)
+
+    async def acheck_connection(self) -> bool:
+        return True
+
+    def _respond(self, prompt: str, options: dict, load_duration: float) -> tuple:
+        """
+        Compute a simulated response and how long to wait before returning it.
+
+        Returns:
+            tuple: (delay in seconds, response dict or ConnectionError to raise)
+        """
+        rng = self._next_random()
+        delay = self.latency + (rng.random() * self.jitter if self.jitter else 0.0)
+        if rng.random() < self.error_rate:
+            return delay, ConnectionError(f"Error connecting to {self.name} backend: simulated failure")
+
+        output_format = options.get('format')
+        if output_format:
+            text = self.render_json_questions(prompt, rng, schema_constrained=isinstance(output_format, dict))
+        else:
+            text = self.render_questions(prompt, rng)
+        eval_count = len(text.split())
+        if self.tokens_per_second > 0:
+            delay += eval_count / self.tokens_per_second
+
+        return delay, {
+            'response': text,
+            'stats': {
+                'prompt_eval_count': len(prompt.split()),
+                'eval_count': eval_count,
+                'load_duration': load_duration
+            }
+        }
+
+    @staticmethod
+    def _finish_response(result, started: float) -> dict:
+        """Raise a simulated failure or stamp the response with its duration."""
+        if isinstance(result, Exception):
+            raise result
+        result['stats']['eval_duration'] = time.perf_counter() - started
+        return result
+
+    def render_questions(self, prompt: str, rng: random.Random) -> str:
+        """
+        Render synthetic questions in the text format requested by `build_prompt`.
+
+        Batch prompts from `build_batch_prompt` are answered with one tagged
+        "### SECTION n" block per section.
+
+        Args:
+            prompt (str): Prompt produced by QuizGenerator.build_prompt
+            rng (random.Random): Random generator for this call
+
+        Returns:
+            str: Questions in "Question: / A) .. D) / Answer:" format
+        """
+        sections = self.SECTION_PATTERN.findall(prompt)
+        if sections:
+            blocks = []
+            for number, count, category, level in sections:
+                questions = [self._render_question(category, level, rng) for _ in range(int(count))]
+                blocks.append(f"### SECTION {number}\n" + "\n\n".join(questions))
+            return "\n\n".join(blocks)
+
+        match = self.PROMPT_PATTERN.search(prompt)
+        if match:
+            num_questions, category, level = int(match.group(1)), match.group(2), match.group(3)
+        else:
+            num_questions, category, level = 1, "General", "Elementary"
+
+        blocks = []
+        for _ in range(num_questions):
+            blocks.append(self._render_question(category, level, rng))
+        return "\n\n".join(blocks)
+
+    def render_json_questions(self, prompt: str, rng: random.Random, schema_constrained: bool = True) -> str:
+        """
+        Render synthetic questions as a JSON document for structured output mode.
+
+        Schema-constrained decoding cannot drop required fields, so malformed
+        items are only produced for plain "json" mode.
+
+        Args:
+            prompt (str): Prompt produced by QuizGenerator.build_json_prompt
+            rng (random.Random): Random generator for this call
+            schema_constrained (bool): Whether a JSON schema was supplied
+
+        Returns:
+            str: JSON text of the form {"questions": [...]}
+        """
+        match = self.PROMPT_PATTERN.search(prompt)
+        if match:
+            num_questions, category, level = int(match.group(1)), match.group(2), match.group(3)
+        else:
+            num_questions, category, level = 1, "General", "Elementary"
+
+        questions = []
+        for _ in range(num_questions):
+            number = rng.randrange(1_000_000)
+            item = {
+                "question": f"{category} ({level}) sample question #{number}?",
+                "options": {letter: f"Option {letter} for #{number}" for letter in 'ABCD'},
+                "answer": rng.choice('ABCD')
+            }
+            if not schema_constrained and rng.random() < self.malformed_rate:
+                del item["answer"]
+            questions.append(item)
+        return json.dumps({"questions": questions})
+
+    def _render_question(self, category: str, level: str, rng: random.Random) -> str:
+        """Render one question block, occasionally malformed on purpose."""
+        number = rng.randrange(1_000_000)
+        answer = rng.choice('ABCD')
+        lines = [
+            f"Question: {category} ({level}) sample question #{number}?",
+            f"A) Option A for #{number}",
+            f"B) Option B for #{number}",
+            f"C) Option C for #{number}",
+            f"D) Option D for #{number}",
+            f"Answer: {answer}"
+        ]
+        if rng.random() < self.malformed_rate:
+            # Drop the answer line, the most common small-model failure
+            lines = lines[:-1]
+        return "\n".join(lines)
+
+    def check_connection(self) -> bool:
+        return True
+
+    def warm_up(self, keep_alive=None) -> dict:
+        return {'load_duration': self._load_model()}
+
+
+# ============================================================================
+# LOAD-BALANCED ENDPOINT POOL
+# ============================================================================
+
+class _Endpoint:
+    """Health and load of one pooled backend."""
+
+    __slots__ = ('backend', 'url', 'outstanding', 'failures', 'ejections', 'ejected_until', 'last_used',
+                 'requests', 'errors')
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.url = backend.base_url
+        self.outstanding = 0
+        self.failures = 0         # consecutive connection failures
+        self.ejections = 0        # consecutive ejections, for the backoff
+        self.ejected_until = 0.0  # 0 while healthy; after it passes, one probe request is allowed
+        self.last_used = 0.0
+        self.requests = 0
+        self.errors = 0
+
+    def available(self, now: float) -> bool:
+        """Healthy, or due for its single probe request after an ejection."""
+        if not self.ejected_until:
+            return True
+        return now >= self.ejected_until and self.outstanding == 0
+
+
+class EndpointPool(LLMBackend):
+    """
+    Several identical servers (e.g. one Ollama per CPU host) behind one backend.
+
+    Each call goes to the available endpoint with the fewest outstanding
+    requests. A connection failure is retried on another endpoint; after
+    `max_failures` consecutive failures an endpoint is ejected for
+    `eject_seconds`, doubling on every further ejection up to
+    `max_eject_seconds`. Once the ejection expires, a single request probes
+    the endpoint and a success restores it. If every endpoint is ejected,
+    calls are still attempted on all of them rather than failing outright.
+    Invalid responses (ValueError) do not count against an endpoint.
+    """
+
+    def __init__(self, backends: list, max_failures: int = 3, eject_seconds: float = 30.0,
+                 max_eject_seconds: float = 300.0):
+        """
+        Initialize the pool.
+
+        Args:
+            backends (list): Backends of the same kind, one per endpoint
+            max_failures (int): Consecutive connection failures before ejecting an endpoint
+            eject_seconds (float): First ejection period in seconds
+            max_eject_seconds (float): Longest ejection period in seconds
+        """
+        if not backends:
+            raise ValueError("EndpointPool needs at least one backend")
+        first = backends[0]
+        super().__init__(first.model, ', '.join(str(backend.base_url) for backend in backends), first.timeout)
+        self.name = first.name
+        self.supports_keep_alive = first.supports_keep_alive
+        self.max_failures = max_failures
+        self.eject_seconds = eject_seconds
+        self.max_eject_seconds = max_eject_seconds
+        self.endpoints = [_Endpoint(backend) for backend in backends]
+        self._lock = threading.Lock()
+
+    def _acquire(self, excluded: set):
+        """Pick the least loaded available endpoint not tried yet and count the request."""
+        with self._lock:
+            now = time.monotonic()
+            candidates = [e for e in self.endpoints if e not in excluded]
+            available = [e for e in candidates if e.available(now)]
+            # Panic mode: with every endpoint ejected, try them anyway
+            endpoint = min(available or candidates, key=lambda e: (e.outstanding, e.last_used), default=None)
+            if endpoint is not None:
+                endpoint.outstanding += 1
+                endpoint.requests += 1
+                endpoint.last_used = now
+            return endpoint
+
+    def _release(self, endpoint: _Endpoint, ok: bool) -> None:
+        """Finish a request and update the endpoint's health."""
+        with self._lock:
+            endpoint.outstanding -= 1
+            if ok:
+                if endpoint.ejected_until:
+                    print(f"✅ AI endpoint {endpoint.url} is back in the pool")
+                endpoint.failures = endpoint.ejections = 0
+                endpoint.ejected_until = 0.0
+                return
+
+            endpoint.errors += 1
+            endpoint.failures += 1
+            # A failed probe re-ejects at once
+            if endpoint.ejected_until or endpoint.failures >= self.max_failures:
+                endpoint.ejections += 1
+                seconds = min(self.eject_seconds * 2 ** (endpoint.ejections - 1), self.max_eject_seconds)
+                endpoint.ejected_until = time.monotonic() + seconds
+                endpoint.failures = 0
+                print(f"⚠️  AI endpoint {endpoint.url} ejected for {seconds:g}s after connection failures")
+
+    def _route(self):
+        """Yield endpoints to try in order; the caller releases each one."""
+        tried = set()
+        while len(tried) < len(self.endpoints):
+            endpoint = self._acquire(tried)
+            if endpoint is None:
+                return
+            tried.add(endpoint)
+            yield endpoint
+
+    def generate(self, prompt: str, **options) -> dict:
+        last_error = None
+        for endpoint in self._route():
+            try:
+                result = endpoint.backend.generate(prompt, **options)
+            except ConnectionError as e:
+                self._release(endpoint, ok=False)
+                last_error = e
+                continue
+            except Exception:
+                self._release(endpoint, ok=True)
+                raise
+            self._release(endpoint, ok=True)
+            return result
+        raise ConnectionError(f"All {len(self.endpoints)} {self.name} endpoints failed: {last_error}")
+
+    async def agenerate(self, prompt: str, **options) -> dict:
+        last_error = None
+        for endpoint in self._route():
+            try:
+                result = await endpoint.backend.agenerate(prompt, **options)
+            except ConnectionError as e:
+                self._release(endpoint, ok=False)
+                last_error = e
+                continue
+            except BaseException:
+                self._release(endpoint, ok=True)
+                raise
+            self._release(endpoint, ok=True)
+            return result
+        raise ConnectionError(f"All {len(self.endpoints)} {self.name} endpoints failed: {last_error}")
+
+    def check_connection(self) -> bool:
+        """Return True as soon as one endpoint answers; unreachable ones count as failures."""
+        for endpoint in self._route():
+            ok = endpoint.backend.check_connection()
+            self._release(endpoint, ok)
+            if ok:
+                return True
+        return False
+
+    async def acheck_connection(self) -> bool:
+        for endpoint in self._route():
+            ok = await endpoint.backend.acheck_connection()
+            self._release(endpoint, ok)
+            if ok:
+                return True
+        return False
+
+    async def aclose(self) -> None:
+        for endpoint in self.endpoints:
+            await endpoint.backend.aclose()
+
+    def warm_up(self, keep_alive=None) -> dict:
+        """Load the model on every endpoint; returns the statistics of the slowest load."""
+        results = []
+        for endpoint in self.endpoints:
+            try:
+                results.append(endpoint.backend.warm_up(keep_alive=keep_alive))
+            except ConnectionError as e:
+                print(f"⚠️  Could not warm up AI endpoint {endpoint.url}: {e}")
+        if not results:
+            raise ConnectionError(f"Could not warm up any {self.name} endpoint")
+        return max(results, key=lambda stats: stats.get('load_duration') or 0)
+
+    def status(self) -> list:
+        """
+        Describe every endpoint.
+
+        Returns:
+            list: One dict per endpoint with url, healthy, outstanding, requests,
+                errors and the seconds left of an ejection
+        """
+        with self._lock:
+            now = time.monotonic()
+            return [{
+                'url': e.url,
+                'healthy': not e.ejected_until,
+                'outstanding': e.outstanding,
+                'requests': e.requests,
+                'errors': e.errors,
+                'ejected_for': round(max(e.ejected_until - now, 0.0), 1) if e.ejected_until else 0.0
+            } for e in self.endpoints]
+
+
+def split_urls(base_url) -> list:
+    """
+    Split an endpoint setting into URLs.
+
+    Args:
+        base_url (str or list): One URL, comma-separated URLs or a list of URLs
+
+    Returns:
+        list: Stripped, non-empty URLs
+    """
+    if base_url is None:
+        return []
+    if isinstance(base_url, str):
+        base_url = base_url.split(',')
+    return [url.strip() for url in base_url if url and url.strip()]
+
+
+# ============================================================================
+# BACKEND FACTORY
+# ============================================================================
+
+BACKENDS = {
+    OllamaGenerateBackend.name: OllamaGenerateBackend,
+    OllamaChatBackend.name: OllamaChatBackend,
+    OllamaClientBackend.name: OllamaClientBackend,
+    OpenAICompatibleBackend.name: OpenAICompatibleBackend,
+    FakeBackend.name: FakeBackend,
+}
+
+
+def create_backend(kind: str = 'ollama', **kwargs) -> LLMBackend:
+    """
+    Create a backend instance by name.
+
+    Several comma-separated URLs (or a list) in `base_url` create an
+    EndpointPool with one backend per URL.
+
+    Args:
+        kind (str): One of the keys in BACKENDS
+        **kwargs: Constructor arguments; None values are ignored so defaults apply.
+            `max_failures` and `eject_seconds` configure an EndpointPool
+
+    Returns:
+        LLMBackend: Configured backend instance or pool
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    backend_class = BACKENDS.get(kind)
+    if backend_class is None:
+        raise ValueError(f"Unknown AI backend '{kind}'. Available: {', '.join(sorted(BACKENDS))}")
+    kwargs = {key: value for key, value in kwargs.items() if value is not None}
+    pool_options = {key: kwargs.pop(key) for key in ('max_failures', 'eject_seconds') if key in kwargs}
+
+    urls = split_urls(kwargs.get('base_url'))
+    if len(urls) > 1:
+        return EndpointPool([backend_class(**{**kwargs, 'base_url': url}) for url in urls], **pool_options)
+    if urls:
+        kwargs['base_url'] = urls[0]
+    return backend_class(**kwargs)
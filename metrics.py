@@ -0,0 +1,219 @@
+import json
+import logging
+import threading
+import time
+
+# ============================================================================
+# METRICS REGISTRY
+# ============================================================================
+
+class MetricsRegistry:
+    """
+    Thread-safe in-process registry for counters, gauges and summaries.
+
+    Metrics are identified by name plus an optional set of labels, e.g.
+    `registry.observe('ai_generation_seconds', 1.2, backend='ollama')`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._summaries = {}
+
+    @staticmethod
+    def _key(name, labels):
+        """Build a hashable key from a metric name and its labels."""
+        return (name, tuple(sorted(labels.items())))
+
+    def inc(self, name, value=1, **labels):
+        """
+        Increment a counter.
+
+        Args:
+            name (str): Metric name
+            value (float): Amount to add (default 1)
+            **labels: Label values for this series
+        """
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        """
+        Set a gauge to a value.
+
+        Args:
+            name (str): Metric name
+            value (float): Current value
+            **labels: Label values for this series
+        """
+        key = self._key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name, value, **labels):
+        """
+        Record one observation of a summary (count, sum, min, max).
+
+        Args:
+            name (str): Metric name
+            value (float): Observed value
+            **labels: Label values for this series
+        """
+        key = self._key(name, labels)
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                summary = {'count': 0, 'sum': 0.0, 'min': value, 'max': value}
+                self._summaries[key] = summary
+            summary['count'] += 1
+            summary['sum'] += value
+            summary['min'] = min(summary['min'], value)
+            summary['max'] = max(summary['max'], value)
+
+    def timer(self, name, **labels):
+        """
+        Context manager that observes the elapsed wall time in seconds.
+
+        Args:
+            name (str): Metric name
+            **labels: Label values for this series
+        """
+        return _Timer(self, name, labels)
+
+    def snapshot(self):
+        """
+        Return a copy of every series.
+
+        Returns:
+            dict: {'counters': {...}, 'gauges': {...}, 'summaries': {...}} keyed by (name, labels)
+        """
+        with self._lock:
+            return {
+                'counters': dict(self._counters),
+                'gauges': dict(self._gauges),
+                'summaries': {key: dict(value) for key, value in self._summaries.items()}
+            }
+
+    def render_prometheus(self):
+        """
+        Render every series in the Prometheus text exposition format.
+
+        Counters and gauges are exported as-is; summaries are exported as
+        `<name>_count` and `<name>_sum` plus a `<name>_max` gauge.
+
+        Returns:
+            str: Exposition text ending with a newline
+        """
+        data = self.snapshot()
+        lines = []
+
+        for metric_type, series in (('counter', data['counters']), ('gauge', data['gauges'])):
+            for name, items in _group_by_name(series):
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in items:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        for name, items in _group_by_name(data['summaries']):
+            lines.append(f"# TYPE {name} summary")
+            for labels, summary in items:
+                label_text = _format_labels(labels)
+                lines.append(f"{name}_count{label_text} {summary['count']}")
+                lines.append(f"{name}_sum{label_text} {_format_value(summary['sum'])}")
+            lines.append(f"# TYPE {name}_max gauge")
+            for labels, summary in items:
+                lines.append(f"{name}_max{_format_labels(labels)} {_format_value(summary['max'])}")
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """Remove all recorded series."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._summaries.clear()
+
+
+class _Timer:
+    """Context manager returned by MetricsRegistry.timer."""
+
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+        self.elapsed = 0.0
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.elapsed = time.perf_counter() - self._started
+        self.registry.observe(self.name, self.elapsed, **self.labels)
+        return False
+
+
+def _group_by_name(series):
+    """Group {(name, labels): value} into sorted [(name, [(labels, value), ...])]."""
+    grouped = {}
+    for (name, labels), value in series.items():
+        grouped.setdefault(name, []).append((labels, value))
+    return sorted((name, sorted(items)) for name, items in grouped.items())
+
+
+def _format_labels(labels):
+    """Format a label tuple as {key="value",...} with Prometheus escaping."""
+    if not labels:
+        return ''
+    parts = []
+    for key, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+def _format_value(value):
+    """Format a numeric sample value."""
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+# ============================================================================
+# STRUCTURED LOGGING
+# ============================================================================
+
+logger = logging.getLogger('ai_quizlab.metrics')
+
+
+def configure_logging(level=logging.INFO):
+    """
+    Send metric log lines to stderr unless a handler is already configured.
+
+    Args:
+        level (int): Logging level for the metrics logger
+    """
+    logger.setLevel(level)
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.propagate = False
+
+
+def log_event(event, **fields):
+    """
+    Emit one JSON log line for an event.
+
+    Args:
+        event (str): Event name, e.g. "ai_generation"
+        **fields: JSON-serializable event fields
+    """
+    record = {'event': event, 'ts': round(time.time(), 3)}
+    record.update(fields)
+    logger.info(json.dumps(record, default=str, sort_keys=True))
+
+
+# Process-wide default registry
+registry = MetricsRegistry()
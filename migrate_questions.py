@@ -5,14 +5,20 @@ Imports question bank data from CSV export file.
 
 import os
 import csv
-from app import app
+from sqlalchemy import text
+from bank_search import create_search_index
+from config import Config
+from database import create_db_app
 from models import db, QuestionBank
+from question_index import QuestionIndex, create_encoder, update_question_index
+
+app = create_db_app()
 
 def check_database_connection():
     """Verify database connection is working."""
     try:
         with app.app_context():
-            result = db.session.execute('SELECT 1')
+            result = db.session.execute(text('SELECT 1'))
             result.close()
         return True
     except Exception as e:
@@ -96,6 +102,19 @@ def load_questions_from_csv():
             print(f"❌ Error during import: {e}")
             return False
 
+def index_new_questions():
+    """Embed the imported questions into the semantic question index (only rows not indexed yet)."""
+    try:
+        print("🧠 Embedding new questions for similarity search...")
+        encoder = create_encoder(Config.EMBEDDING_BACKEND, Config.EMBEDDING_MODEL,
+                                 Config.EMBEDDING_BATCH_SIZE, Config.EMBEDDING_THREADS)
+        with app.app_context():
+            summary = update_question_index(QuestionIndex(Config.QUESTION_INDEX_PATH), encoder)
+        print(f"✅ Embedded {summary['added']} questions in {summary['seconds']:.2f}s")
+    except Exception as e:
+        print(f"⚠️  Question index not updated: {e}")
+        print("💡 Run python index_questions.py later; quizzes are drawn at random until then.")
+
 def show_question_distribution():
     """Display question distribution by category and level."""
     
@@ -131,9 +150,15 @@ def main():
     with app.app_context():
         db.create_all()
         print("✅ Database tables verified")
+        # Databases created before full-text search get their index here; imported
+        # questions are indexed as they are inserted
+        with db.engine.begin() as connection:
+            create_search_index(connection)
+        print("✅ Search index verified")
     
     # Load questions from CSV
     if load_questions_from_csv():
+        index_new_questions()
         print("\n🎉 Migration completed successfully!")
         print("💡 You can now create quizzes using the question bank.")
         print("🔧 Test by creating a quiz with 'Question Bank' sources enabled.")
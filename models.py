@@ -1,8 +1,10 @@
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
+from database import RoutingSession
 
-db = SQLAlchemy()
+# Reads from read-only routes can be routed to a replica bind (see database.py)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class Teacher(db.Model):
     """Teacher model for storing instructor information and authentication."""
@@ -39,7 +41,8 @@ class Student(db.Model):
     teacher_id = db.Column(db.Integer, db.ForeignKey('teachers.id'), nullable=False)
     
     # Relationships
-    results = db.relationship('Result', backref='student', uselist=False)
+    results = db.relationship('Result', backref='student', lazy=True)
+    attempts = db.relationship('QuizAttempt', backref='student', lazy=True, cascade='all, delete-orphan')
 
     def set_password(self, password):
         """Hash and set the student's password."""
@@ -50,11 +53,18 @@ class Student(db.Model):
         return check_password_hash(self.password, password)
 
 class Result(db.Model):
-    """Result model for storing student exam scores by category."""
+    """Result model for storing student exam scores by category, one per (student, quiz)."""
     __tablename__ = 'results'
+    __table_args__ = (
+        # Serves the per-student "already done" check as well as uniqueness
+        db.UniqueConstraint('student_id', 'quiz_id', name='uq_results_student_quiz'),
+        db.Index('ix_results_quiz_id', 'quiz_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    student_id = db.Column(db.Integer, db.ForeignKey('students.id'), unique=True, nullable=False)
+    student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.id'))  # NULL for results recorded before versioned quizzes
+    submitted_at = db.Column(db.DateTime, default=datetime.utcnow)
     name = db.Column(db.String(100), nullable=False)
     group = db.Column(db.String(50), nullable=False)
     
@@ -66,6 +76,63 @@ class Result(db.Model):
     computer_science = db.Column(db.String(20), default='0/0')
     total = db.Column(db.String(20), default='0/0')
 
+class ClassStatistic(db.Model):
+    """
+    Running score summary of one histogram bin of a (teacher, quiz, group, category).
+
+    Maintained incrementally with each result written or reset (see
+    class_stats.py), so dashboard statistics never reparse Result strings.
+    Scores are percentages; bin 0 holds 0-10 %, bin 9 holds 90-100 %.
+    Summing count, score_sum and score_sq_sum over the bins of a key gives
+    its mean and standard deviation. Rebuild with `python rebuild_class_stats.py`.
+    """
+    __tablename__ = 'class_statistics'
+    __table_args__ = (
+        db.UniqueConstraint('teacher_id', 'quiz_id', 'group', 'category', 'bin', name='uq_class_statistics_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    teacher_id = db.Column(db.Integer, db.ForeignKey('teachers.id'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.id'), nullable=False)
+    group = db.Column(db.String(50), nullable=False)
+    category = db.Column(db.String(50), nullable=False)  # One of the five categories or 'Total'
+    bin = db.Column(db.Integer, nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.Float, nullable=False, default=0.0)
+    score_sq_sum = db.Column(db.Float, nullable=False, default=0.0)
+
+class QuestionResponse(db.Model):
+    """
+    One student's answer to one quiz question, recorded with the Result.
+
+    choice is the index of the chosen option in stored order (0-3 for
+    option_a-option_d), or -1 when the question was left unanswered.
+    """
+    __tablename__ = 'question_responses'
+    __table_args__ = (
+        db.Index('ix_question_responses_student_quiz', 'student_id', 'quiz_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.id'), nullable=False)
+    quiz_question_id = db.Column(db.Integer, db.ForeignKey('quiz_questions.id'), nullable=False, index=True)
+    choice = db.Column(db.SmallInteger, nullable=False)
+    correct = db.Column(db.Boolean, nullable=False)
+
+class QuizAttempt(db.Model):
+    """Autosaved answers of a quiz in progress, one row per (student, quiz)."""
+    __tablename__ = 'quiz_attempts'
+    __table_args__ = (
+        db.UniqueConstraint('student_id', 'quiz_id', name='uq_quiz_attempts_student_quiz'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.id'), nullable=False)
+    answers = db.Column(db.Text, nullable=False, default='{}')  # Compact JSON: {"q0": "option text", ...}
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 class QuestionBank(db.Model):
     """Pre-created question bank (replaces JSON files in data/exams/precreated)."""
     __tablename__ = 'question_bank'
@@ -81,6 +148,14 @@ class QuestionBank(db.Model):
     level = db.Column(db.String(50), nullable=False)     # Elementary, Middle School, High School
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Item analysis written by item_analysis.py over all recorded responses
+    response_count = db.Column(db.Integer, nullable=False, default=0)
+    difficulty = db.Column(db.Float)      # Proportion of correct answers (p-value)
+    discrimination = db.Column(db.Float)  # Point-biserial correlation with the rest of the quiz
+    option_counts = db.Column(db.Text)    # JSON [a, b, c, d, unanswered]
+    analyzed_at = db.Column(db.DateTime)
+    is_retired = db.Column(db.Boolean, nullable=False, default=False)  # Excluded from new quizzes
+    
     def to_dict(self):
         """Convert to format compatible with current system."""
         return {
@@ -93,18 +168,37 @@ class QuestionBank(db.Model):
         }
 
 class Quiz(db.Model):
-    """Temporarily generated quizzes (replaces JSON files in data/exams/generated)."""
+    """
+    Versioned quizzes (replaces JSON files in data/exams/generated).
+    
+    A teacher can have several active quizzes, one per student group plus
+    optionally one for all groups (group is NULL). Creating a quiz for a group
+    archives the previous version instead of deleting it, so results keep
+    pointing at the questions they were scored against.
+    """
     __tablename__ = 'quizzes'
+    __table_args__ = (
+        db.Index('ix_quizzes_teacher_active', 'teacher_id', 'is_active', 'group'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     teacher_id = db.Column(db.Integer, db.ForeignKey('teachers.id'), nullable=False)
     name = db.Column(db.String(100), default='Generated Quiz')
     description = db.Column(db.Text)
+    group = db.Column(db.String(50))  # Student group the quiz is assigned to; NULL means all groups
+    version = db.Column(db.Integer, nullable=False, default=1)
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships
     questions = db.relationship('QuizQuestion', backref='quiz', lazy=True, cascade='all, delete-orphan')
+    results = db.relationship('Result', backref='quiz', lazy='dynamic')
+    attempts = db.relationship('QuizAttempt', backref='quiz', lazy=True, cascade='all, delete-orphan')
+    
+    @property
+    def label(self):
+        """Short display name, e.g. "Quiz - Ana v3 (Group A)"."""
+        return f"{self.name} v{self.version} ({self.group or 'All groups'})"
     
     def to_dict(self):
         """Convert complete quiz to JSON format."""
@@ -112,6 +206,9 @@ class Quiz(db.Model):
             'id': self.id,
             'name': self.name,
             'description': self.description,
+            'group': self.group,
+            'version': self.version,
+            'is_active': self.is_active,
             'created_at': self.created_at.isoformat(),
             'questions': [q.to_dict() for q in self.questions]
         }
@@ -121,7 +218,7 @@ class QuizQuestion(db.Model):
     __tablename__ = 'quiz_questions'
     
     id = db.Column(db.Integer, primary_key=True)
-    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.id'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.id'), nullable=False, index=True)
     question = db.Column(db.Text, nullable=False)
     option_a = db.Column(db.String(255), nullable=False)
     option_b = db.Column(db.String(255), nullable=False)
@@ -131,11 +228,13 @@ class QuizQuestion(db.Model):
     category = db.Column(db.String(50), nullable=False)
     level = db.Column(db.String(50), nullable=False)
     source = db.Column(db.String(20), default='AI')  # 'AI' or 'BANK'
+    bank_question_id = db.Column(db.Integer, db.ForeignKey('question_bank.id'), index=True)  # Set for BANK questions
     order_index = db.Column(db.Integer, default=0)
     
     def to_dict(self):
         """Convert to format compatible with current system."""
         return {
+            'question_id': self.id,
             'question': self.question,
             'options': [self.option_a, self.option_b, self.option_c, self.option_d],
             'answer': self.correct_answer,
@@ -0,0 +1,425 @@
+import json
+import os
+import random
+import re
+import time
+import zlib
+import numpy as np
+from sqlalchemy import select
+from models import db, QuestionBank
+
+# Files of one index generation in the index directory; meta.json names the current
+# generation and how many rows of it are complete
+VECTORS_FILE = 'vectors.{generation}.f32'
+IDS_FILE = 'ids.{generation}.i64'
+META_FILE = 'meta.json'
+
+# ============================================================================
+# ENCODERS
+# ============================================================================
+
+def question_text(question, answer):
+    """Text embedded for a bank question: the question and its correct answer."""
+    return f"{question} {answer}"
+
+class TransformerEncoder:
+    """
+    Sentence embeddings from a Hugging Face model on the CPU, mean-pooled and normalized.
+    """
+
+    def __init__(self, model_name='sentence-transformers/all-MiniLM-L6-v2', batch_size=64, threads=0,
+                 max_length=128):
+        """
+        Load the tokenizer and model (downloaded on first use).
+
+        Args:
+            model_name (str): Hugging Face model name or local path
+            batch_size (int): Texts per forward pass
+            threads (int): CPU threads for inference, 0 keeps the torch default
+            max_length (int): Longer texts are truncated to this many tokens
+
+        Raises:
+            RuntimeError: If torch or transformers is not installed
+        """
+        try:
+            import torch
+            from transformers import AutoModel, AutoTokenizer
+        except ImportError as e:
+            raise RuntimeError("The transformers encoder needs torch and transformers "
+                               "(pip install -r requirements.txt)") from e
+        if threads:
+            torch.set_num_threads(threads)
+        self.torch = torch
+        self.model_id = model_name
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModel.from_pretrained(model_name).eval()
+        self.dim = self.model.config.hidden_size
+
+    def encode(self, texts):
+        """
+        Embed texts in batches.
+
+        Args:
+            texts (list): Strings to embed
+
+        Returns:
+            ndarray: float32 array (len(texts), dim) of unit vectors
+        """
+        vectors = np.empty((len(texts), self.dim), dtype=np.float32)
+        # Batches of similar length need little padding
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        with self.torch.inference_mode():
+            for start in range(0, len(order), self.batch_size):
+                batch = order[start:start + self.batch_size]
+                tokens = self.tokenizer([texts[i] for i in batch], padding=True, truncation=True,
+                                        max_length=self.max_length, return_tensors='pt')
+                hidden = self.model(**tokens).last_hidden_state
+                mask = tokens['attention_mask'].unsqueeze(-1).to(hidden.dtype)
+                pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+                vectors[batch] = self.torch.nn.functional.normalize(pooled, dim=1).numpy()
+        return vectors
+
+class HashingEncoder:
+    """
+    Hashed bag of words and word pairs, normalized.
+
+    Needs no model download: for offline installs and benchmarks. It finds
+    questions sharing wording, not paraphrases.
+    """
+
+    def __init__(self, dim=384):
+        """
+        Initialize the encoder.
+
+        Args:
+            dim (int): Vector size
+        """
+        self.model_id = 'hashing'
+        self.dim = dim
+
+    def encode(self, texts):
+        """
+        Embed texts.
+
+        Args:
+            texts (list): Strings to embed
+
+        Returns:
+            ndarray: float32 array (len(texts), dim) of unit vectors (zero for texts without words)
+        """
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = re.findall(r'\w+', text.lower())
+            for feature in words + [f'{a} {b}' for a, b in zip(words, words[1:])]:
+                digest = zlib.crc32(feature.encode('utf-8'))
+                vectors[row, digest % self.dim] += -1.0 if digest & 0x80000000 else 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return np.divide(vectors, norms, out=vectors, where=norms > 0)
+
+def create_encoder(backend='transformers', model=None, batch_size=64, threads=0):
+    """
+    Create the encoder for EMBEDDING_BACKEND.
+
+    Args:
+        backend (str): 'transformers' or 'hashing'
+        model (str, optional): Model name for the transformers backend
+        batch_size (int): Texts per forward pass
+        threads (int): CPU threads for inference, 0 keeps the torch default
+
+    Returns:
+        TransformerEncoder or HashingEncoder: Encoder with model_id, dim and encode()
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    if backend == 'transformers':
+        options = {'model_name': model} if model else {}
+        return TransformerEncoder(batch_size=batch_size, threads=threads, **options)
+    if backend == 'hashing':
+        return HashingEncoder()
+    raise ValueError(f"Unknown embedding backend: {backend}")
+
+# ============================================================================
+# MEMORY-MAPPED INDEX
+# ============================================================================
+
+class _Snapshot:
+    """One published state of the index: mapped rows and their IDs in sorted order."""
+
+    __slots__ = ('meta', 'stamp', 'vectors', 'ids', 'order', 'sorted_ids')
+
+    def __init__(self, meta=None, stamp=None, vectors=None, ids=None):
+        self.meta = meta
+        self.stamp = stamp  # meta.json as mapped; None while it does not exist
+        self.vectors = np.zeros((0, 0), dtype=np.float32) if vectors is None else vectors
+        self.ids = np.zeros(0, dtype=np.int64) if ids is None else ids
+        self.order = np.argsort(self.ids, kind='stable')
+        self.sorted_ids = np.asarray(self.ids)[self.order]
+
+
+class QuestionIndex:
+    """
+    Embeddings of question bank items, stored as memory-mapped arrays.
+
+    Rows are appended to raw float32 (vectors) and int64 (question IDs) files,
+    and meta.json is replaced afterwards to publish them, so readers in the
+    app never see a partial row. A rebuild writes a new generation of files.
+    Readers pick up new rows on their next lookup; one instance can serve
+    many threads, as each lookup works on one immutable snapshot.
+    """
+
+    def __init__(self, path, similarity_threshold=0.85):
+        """
+        Initialize the index; nothing is read until the first lookup.
+
+        Args:
+            path (str): Index directory
+            similarity_threshold (float): Cosine similarity from which diverse_sample()
+                treats two questions as near-duplicates
+        """
+        self.path = path
+        self.similarity_threshold = similarity_threshold
+        self._snapshot = _Snapshot()
+
+    @property
+    def meta(self):
+        """meta.json as last mapped, or None."""
+        return self._snapshot.meta
+
+    # ---- Reading ----
+
+    def _read_meta(self):
+        try:
+            with open(os.path.join(self.path, META_FILE), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def refresh(self):
+        """
+        Map the rows published since the last lookup (cheap when nothing changed).
+
+        Returns:
+            _Snapshot: Current state. A lookup reads everything from the one
+                snapshot it got, as another thread may swap in a newer one
+        """
+        snapshot = self._snapshot
+        try:
+            stat = os.stat(os.path.join(self.path, META_FILE))
+            stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            stamp = None
+        if stamp == snapshot.stamp:
+            return snapshot
+        meta = self._read_meta()
+        count, dim = (meta['count'], meta['dim']) if meta else (0, 0)
+        if count:
+            generation = meta['generation']
+            vectors = np.memmap(os.path.join(self.path, VECTORS_FILE.format(generation=generation)),
+                                dtype=np.float32, mode='r', shape=(count, dim))
+            ids = np.memmap(os.path.join(self.path, IDS_FILE.format(generation=generation)),
+                            dtype=np.int64, mode='r', shape=(count,))
+        else:
+            vectors = np.zeros((0, dim), dtype=np.float32)
+            ids = np.zeros(0, dtype=np.int64)
+        snapshot = _Snapshot(meta, stamp, vectors, ids)
+        self._snapshot = snapshot  # Single assignment: readers see either generation whole
+        return snapshot
+
+    def __len__(self):
+        return len(self.refresh().ids)
+
+    def ids(self):
+        """Return the IDs of all indexed questions as an array."""
+        return np.asarray(self.refresh().ids)
+
+    def vectors_for(self, question_ids):
+        """
+        Look up the vectors of questions.
+
+        Args:
+            question_ids (list): QuestionBank IDs
+
+        Returns:
+            tuple: (vectors, found): float32 array with one row per ID (zeros for
+                IDs not indexed yet) and a boolean array marking indexed IDs
+        """
+        return self._lookup(self.refresh(), question_ids)
+
+    @staticmethod
+    def _lookup(snapshot, question_ids):
+        """vectors_for() on a given snapshot."""
+        wanted = np.asarray(question_ids, dtype=np.int64)
+        positions = np.searchsorted(snapshot.sorted_ids, wanted)
+        found = positions < len(snapshot.sorted_ids)
+        found[found] = snapshot.sorted_ids[positions[found]] == wanted[found]
+        vectors = np.zeros((len(wanted), snapshot.vectors.shape[1]), dtype=np.float32)
+        vectors[found] = snapshot.vectors[snapshot.order[positions[found]]]
+        return vectors, found
+
+    def similar(self, question_id, k=10):
+        """
+        Find the questions most similar to one question ("more like this").
+
+        Args:
+            question_id (int): QuestionBank ID
+            k (int): Number of neighbors
+
+        Returns:
+            list: (question_id, similarity) tuples, most similar first; empty if
+                the question is not indexed
+        """
+        snapshot = self.refresh()
+        vectors, found = self._lookup(snapshot, [question_id])
+        if not found[0]:
+            return []
+        scores = np.asarray(snapshot.vectors @ vectors[0])
+        ids = np.asarray(snapshot.ids)
+        scores[ids == question_id] = -np.inf
+        k = min(k, len(scores) - 1)
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(int(ids[i]), float(scores[i])) for i in top]
+
+    def diverse_sample(self, question_ids, count, threshold=None, rng=random):
+        """
+        Draw questions at random while avoiding near-duplicates.
+
+        Candidates are taken in random order, skipping any whose similarity to
+        an already drawn question reaches the threshold. When too few remain,
+        the least similar of the skipped ones fill the sample. Questions not
+        indexed yet count as unlike every other.
+
+        Args:
+            question_ids (list): Candidate QuestionBank IDs
+            count (int): Number of questions to draw
+            threshold (float, optional): Defaults to the index's similarity_threshold
+            rng (Random): Random generator used to shuffle the candidates
+
+        Returns:
+            list: Drawn QuestionBank IDs, in drawing order
+        """
+        candidates = list(question_ids)
+        rng.shuffle(candidates)
+        snapshot = self.refresh()
+        if count >= len(candidates) or len(snapshot.ids) == 0:
+            return candidates[:count]
+        threshold = self.similarity_threshold if threshold is None else threshold
+
+        vectors, _ = self._lookup(snapshot, candidates)
+        closest = np.full(len(candidates), -np.inf, dtype=np.float32)  # Highest similarity to a drawn question
+        available = np.ones(len(candidates), dtype=bool)
+        drawn = []
+        for _ in range(count):
+            eligible = available & (closest < threshold)
+            if eligible.any():
+                pick = int(np.argmax(eligible))  # First eligible in shuffled order
+            else:
+                pick = int(np.argmin(np.where(available, closest, np.inf)))
+            drawn.append(candidates[pick])
+            available[pick] = False
+            np.maximum(closest, vectors @ vectors[pick], out=closest)
+        return drawn
+
+    # ---- Writing (one writer at a time, e.g. index_questions.py) ----
+
+    def append(self, question_ids, vectors, model_id):
+        """
+        Append embeddings and publish them to readers.
+
+        Args:
+            question_ids (list): QuestionBank IDs
+            vectors (ndarray): float32 array with one row per ID
+            model_id (str): Encoder that produced the vectors
+
+        Raises:
+            ValueError: If the index was built with another encoder or vector size
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        os.makedirs(self.path, exist_ok=True)
+        meta = self._read_meta() or self._new_meta(model_id, vectors.shape[1], generation=0)
+        if meta['model'] != model_id or meta['dim'] != vectors.shape[1]:
+            raise ValueError(f"Index was built with {meta['model']} ({meta['dim']} dimensions); "
+                             f"rebuild it to use {model_id}")
+
+        vectors_path = os.path.join(self.path, VECTORS_FILE.format(generation=meta['generation']))
+        ids_path = os.path.join(self.path, IDS_FILE.format(generation=meta['generation']))
+        for path, data, row_bytes in ((vectors_path, vectors, meta['dim'] * 4),
+                                      (ids_path, np.asarray(question_ids, dtype=np.int64), 8)):
+            with open(path, 'ab') as f:
+                f.truncate(meta['count'] * row_bytes)  # Drop rows of an interrupted append
+                f.write(data.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        meta['count'] += len(vectors)
+        self._write_meta(meta)
+
+    def reset(self, model_id, dim):
+        """
+        Start a new, empty generation of the index; the previous files are removed.
+
+        Args:
+            model_id (str): Encoder of the new generation
+            dim (int): Vector size
+        """
+        old = self._read_meta()
+        generation = old['generation'] + 1 if old else 0
+        self._write_meta(self._new_meta(model_id, dim, generation))
+        if old:
+            # Readers keep their mapping of unlinked files until they refresh
+            for name in (VECTORS_FILE, IDS_FILE):
+                try:
+                    os.remove(os.path.join(self.path, name.format(generation=old['generation'])))
+                except FileNotFoundError:
+                    pass
+
+    @staticmethod
+    def _new_meta(model_id, dim, generation):
+        return {'model': model_id, 'dim': dim, 'generation': generation, 'count': 0}
+
+    def _write_meta(self, meta):
+        os.makedirs(self.path, exist_ok=True)
+        temporary = os.path.join(self.path, META_FILE + '.tmp')
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(temporary, os.path.join(self.path, META_FILE))
+
+# ============================================================================
+# INCREMENTAL UPDATES
+# ============================================================================
+
+def update_question_index(index, encoder, rebuild=False, chunk_size=1000):
+    """
+    Embed the question bank items missing from the index.
+
+    Only new rows are embedded; edited questions keep their vector until a
+    rebuild. Requires an app context.
+
+    Args:
+        index (QuestionIndex): Index to update
+        encoder: Encoder from create_encoder()
+        rebuild (bool): Re-embed every question into a new generation
+        chunk_size (int): Questions embedded and appended at a time
+
+    Returns:
+        dict: 'added', 'total' and 'seconds'
+    """
+    started = time.perf_counter()
+    if rebuild:
+        index.reset(encoder.model_id, encoder.dim)
+    known = set(index.ids().tolist())
+
+    rows = db.session.execute(
+        select(QuestionBank.id, QuestionBank.question, QuestionBank.correct_answer).order_by(QuestionBank.id)
+    ).all()
+    missing = [row for row in rows if row.id not in known]
+    for start in range(0, len(missing), chunk_size):
+        chunk = missing[start:start + chunk_size]
+        vectors = encoder.encode([question_text(row.question, row.correct_answer) for row in chunk])
+        index.append([row.id for row in chunk], vectors, encoder.model_id)
+
+    return {'added': len(missing), 'total': len(index), 'seconds': time.perf_counter() - started}
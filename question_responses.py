@@ -0,0 +1,52 @@
+from sqlalchemy import delete, insert
+from models import db, QuestionResponse
+
+# QuestionResponse.choice of a question left unanswered
+UNANSWERED = -1
+
+# ============================================================================
+# RESPONSE CAPTURE
+# ============================================================================
+
+def response_rows(student_id, quiz_id, responses, stored_questions):
+    """
+    Turn the per-question answers of a scored submission into QuestionResponse rows.
+
+    Options may have been shuffled for the student, so the chosen option is
+    located by its text in the quiz's stored order. An answer matching no
+    option counts as unanswered.
+
+    Args:
+        student_id (int): Student ID
+        quiz_id (int): Quiz ID
+        responses (list): 'responses' from calculate_quiz_scores()
+        stored_questions (list): Question dictionaries of the quiz in stored order
+
+    Returns:
+        list: Row dictionaries for save_responses(); JSON-serializable
+    """
+    options = {question['question_id']: question['options'] for question in stored_questions}
+    rows = []
+    for response in responses:
+        question_options = options.get(response['question_id'])
+        if question_options is None:
+            continue
+        answer = response['answer']
+        rows.append({
+            'student_id': student_id,
+            'quiz_id': quiz_id,
+            'quiz_question_id': response['question_id'],
+            'choice': question_options.index(answer) if answer in question_options else UNANSWERED,
+            'correct': bool(response['correct'])
+        })
+    return rows
+
+def save_responses(rows):
+    """Insert response rows in the caller's transaction. The caller commits."""
+    if rows:
+        db.session.execute(insert(QuestionResponse.__table__), rows)
+
+def discard_responses(student_id, quiz_id):
+    """Delete a student's responses to a quiz, e.g. when the result is reset. The caller commits."""
+    db.session.execute(delete(QuestionResponse.__table__).where(QuestionResponse.student_id == student_id,
+                                                                QuestionResponse.quiz_id == quiz_id))
@@ -0,0 +1,86 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from metrics import registry as metrics
+
+# ============================================================================
+# QUIZ PAYLOAD CACHE
+# ============================================================================
+
+class QuizPayloadCache:
+    """
+    In-process LRU cache of quiz question payloads.
+
+    Quiz questions never change after creation (a new quiz version is created
+    instead), so entries need no invalidation. The key includes the creation
+    time because SQLite may reuse the ID of a deleted quiz.
+    """
+
+    def __init__(self, max_entries=64):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries (int): Number of quizzes kept in memory
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(quiz):
+        """Return the cache key identifying one quiz version."""
+        return (quiz.id, quiz.version, quiz.created_at.isoformat() if quiz.created_at else '')
+
+    def get_questions(self, quiz):
+        """
+        Return the question dictionaries of a quiz in stored order.
+
+        The returned list and dictionaries are shared between requests and
+        must be treated as read-only.
+
+        Args:
+            quiz (Quiz): Quiz to load
+
+        Returns:
+            list: Question dictionaries (see QuizQuestion.to_dict)
+        """
+        key = self.key(quiz)
+        with self._lock:
+            questions = self._entries.get(key)
+            if questions is not None:
+                self._entries.move_to_end(key)
+                metrics.inc('quiz_payload_cache_total', result='hit')
+                return questions
+
+        metrics.inc('quiz_payload_cache_total', result='miss')
+        questions = [q.to_dict() for q in quiz.questions]
+        with self._lock:
+            self._entries[key] = questions
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return questions
+
+    def etag(self, quiz, *parts):
+        """
+        Build an ETag for a response derived from a quiz.
+
+        Args:
+            quiz (Quiz): Quiz the response is built from
+            *parts: Other values the response depends on (student, page, ...)
+
+        Returns:
+            str: Hex digest usable as a strong ETag
+        """
+        raw = ':'.join(str(part) for part in (*self.key(quiz), *parts))
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def clear(self):
+        """Drop all cached payloads."""
+        with self._lock:
+            self._entries.clear()
+
+
+# Process-wide cache used by the quiz routes
+quiz_payloads = QuizPayloadCache()
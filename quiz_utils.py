@@ -1,14 +1,16 @@
 import random
 import csv
+import hashlib
 import os
 import tempfile
-from models import QuestionBank
+from sqlalchemy import func, or_
+from models import db, QuestionBank, Quiz
 
 # ============================================================================
 # QUESTION BANK UTILITIES
 # ============================================================================
 
-def load_questions_from_bank(subject, level, num_needed):
+def load_questions_from_bank(subject, level, num_needed, question_index=None):
     """
     Load questions from the QuestionBank table in the database.
     
@@ -16,6 +18,8 @@ def load_questions_from_bank(subject, level, num_needed):
         subject (str): Subject category (e.g., "Mathematics", "Physics")
         level (str): Difficulty level (e.g., "Elementary", "High School")
         num_needed (int): Number of questions to retrieve
+        question_index (QuestionIndex, optional): Semantic index used to avoid
+            drawing near-identical questions; plain random selection without it
         
     Returns:
         list: List of formatted question dictionaries ready for quiz creation
@@ -24,24 +28,32 @@ def load_questions_from_bank(subject, level, num_needed):
         # Query the QuestionBank table for matching criteria
         all_matching_questions = QuestionBank.query.filter_by(
             category=subject, 
-            level=level
+            level=level,
+            is_retired=False  # Items retired after item analysis
         ).all()
         
         if not all_matching_questions:
             print(f"No questions found in DB for {subject} - {level}")
             return []
 
-        # Shuffle questions to get random selection
-        random.shuffle(all_matching_questions)
-        
-        # Select the required number of questions
-        selected_db_questions = all_matching_questions[:num_needed]
+        if question_index is not None:
+            # Random selection that skips near-duplicates of questions already drawn
+            by_id = {db_q.id: db_q for db_q in all_matching_questions}
+            selected_db_questions = [by_id[question_id] for question_id in
+                                     question_index.diverse_sample(list(by_id), num_needed)]
+        else:
+            # Shuffle questions to get random selection
+            random.shuffle(all_matching_questions)
+            
+            # Select the required number of questions
+            selected_db_questions = all_matching_questions[:num_needed]
         
         # Format questions for compatibility with existing system
         formatted_questions = []
         for i, db_q in enumerate(selected_db_questions):
             formatted_q = {
                 'id': f"BANK-{db_q.id}",
+                'bank_id': db_q.id,
                 'question': db_q.question,
                 'options': [
                     db_q.option_a, 
@@ -177,6 +189,115 @@ def create_generation_report(stats, total_questions):
     
     return report
 
+# ============================================================================
+# QUIZ VERSIONING UTILITIES
+# ============================================================================
+
+def create_quiz_version(teacher, group, name, description):
+    """
+    Add a new active quiz version for a teacher and group.
+    
+    The previously active quiz for the same group is archived, not deleted,
+    so its questions and results stay available. The caller commits.
+    
+    Args:
+        teacher (Teacher): Quiz owner
+        group (str): Student group the quiz is assigned to, or None for all groups
+        name (str): Quiz name
+        description (str): Quiz description
+        
+    Returns:
+        Quiz: New quiz, flushed so its ID is available
+    """
+    group = group or None
+    same_group = Quiz.query.filter_by(teacher_id=teacher.id, group=group)
+    
+    latest_version = same_group.with_entities(func.max(Quiz.version)).scalar() or 0
+    same_group.filter_by(is_active=True).update({'is_active': False}, synchronize_session=False)
+    
+    quiz = Quiz(
+        teacher_id=teacher.id,
+        name=name,
+        description=description,
+        group=group,
+        version=latest_version + 1
+    )
+    db.session.add(quiz)
+    db.session.flush()  # Get quiz ID without committing
+    return quiz
+
+def find_active_quiz(teacher_id, group):
+    """
+    Find the quiz a student of the given group should take.
+    
+    A quiz assigned to the group wins over one assigned to all groups.
+    
+    Args:
+        teacher_id (int): Teacher ID
+        group (str): Student group
+        
+    Returns:
+        Quiz: Active quiz, or None
+    """
+    return Quiz.query.filter(
+        Quiz.teacher_id == teacher_id,
+        Quiz.is_active.is_(True),
+        or_(Quiz.group == group, Quiz.group.is_(None))
+    ).order_by(Quiz.group.is_(None), Quiz.version.desc()).first()
+
+# ============================================================================
+# PER-STUDENT QUESTION ORDER
+# ============================================================================
+
+def seeded_permutation(n, *seed_parts):
+    """
+    Return a deterministic permutation of range(n) for the given seed parts.
+    
+    The seed is a hash of the parts, so the same (quiz, student) always gets
+    the same order and nothing has to be stored. Shuffling is a single
+    Fisher-Yates pass, O(n).
+    
+    Args:
+        n (int): Number of items
+        *seed_parts: Values identifying the permutation, e.g. quiz and student IDs
+        
+    Returns:
+        list: Indexes into the original sequence, in display order
+    """
+    key = ':'.join(str(part) for part in seed_parts).encode()
+    seed = int.from_bytes(hashlib.sha256(key).digest()[:8], 'big')
+    order = list(range(n))
+    random.Random(seed).shuffle(order)
+    return order
+
+def shuffle_quiz_for_student(quiz_questions, quiz_id, student_id, shuffle_options=True):
+    """
+    Reorder quiz questions (and their options) for one student.
+    
+    Apply it both when rendering the quiz and when scoring it: the form field
+    q{i} then refers to the i-th question of the student's own order, which is
+    what calculate_quiz_scores expects. Answers are compared by option text,
+    so reordering options does not affect scoring.
+    
+    Args:
+        quiz_questions (list): Question dictionaries in stored order
+        quiz_id (int): Quiz ID
+        student_id (int): Student ID
+        shuffle_options (bool): Also reorder the options of each question
+        
+    Returns:
+        list: New list of question dictionaries in the student's order
+    """
+    shuffled = []
+    for index in seeded_permutation(len(quiz_questions), quiz_id, student_id):
+        question = quiz_questions[index]
+        options = question.get('options')
+        if shuffle_options and options:
+            question = dict(question)
+            question['options'] = [options[i] for i in seeded_permutation(len(options), quiz_id, student_id, index)]
+        shuffled.append(question)
+    return shuffled
+
 # ============================================================================
 # QUIZ SCORING UTILITIES
 # ============================================================================
@@ -190,7 +311,8 @@ def calculate_quiz_scores(quiz_questions, form_data):
         form_data (dict): Form data containing student's answers
         
     Returns:
-        dict: Scores organized by category with totals
+        dict: Scores organized by category with totals, and 'responses': one
+            {'question_id', 'answer', 'correct'} dict per question for item analysis
     """
     # Initialize scoring structure for all supported categories
     categories = {
@@ -202,33 +324,38 @@ def calculate_quiz_scores(quiz_questions, form_data):
     }
     
     total_correct = 0
+    responses = []
     
     # Process each question and compare with student's answer
     for i, question in enumerate(quiz_questions):
         user_answer = form_data.get(f'q{i}')
         category = question.get('category', 'N/A')
         correct_answer = question.get('answer')
+        is_correct = user_answer == correct_answer
+        responses.append({'question_id': question.get('question_id'), 'answer': user_answer, 'correct': is_correct})
         
         # Update category statistics
         if category in categories:
             categories[category]['total'] += 1
-            if user_answer == correct_answer:
+            if is_correct:
                 categories[category]['correct'] += 1
                 total_correct += 1
     
     return {
         'categories': categories,
         'total_correct': total_correct,
-        'total_questions': len(quiz_questions)
+        'total_questions': len(quiz_questions),
+        'responses': responses
     }
 
-def create_result_data(student, scores):
+def create_result_data(student, scores, quiz_id=None):
     """
     Create result data dictionary for database storage.
     
     Args:
         student (Student): Student object containing student information
         scores (dict): Calculated scores from calculate_quiz_scores()
+        quiz_id (int, optional): Quiz the answers were scored against
         
     Returns:
         dict: Formatted result data ready for Result model creation
@@ -238,6 +365,7 @@ def create_result_data(student, scores):
     # Format scores as "correct/total" strings for database storage
     return {
         'student_id': student.id,
+        'quiz_id': quiz_id,
         'name': student.name,
         'group': student.group,
         'mathematics': f"{categories['Mathematics']['correct']}/{categories['Mathematics']['total']}",
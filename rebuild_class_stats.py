@@ -0,0 +1,41 @@
+"""
+Class Statistics Rebuild Script
+Recomputes the class_statistics summary from all results, e.g. after
+upgrading (results recorded before the table existed) or a manual data fix.
+
+Usage:
+    python rebuild_class_stats.py               # all teachers
+    python rebuild_class_stats.py --teacher 3   # one teacher
+"""
+
+import argparse
+import time
+from class_stats import rebuild_class_statistics
+from database import create_db_app
+from models import db
+
+app = create_db_app()
+
+def main():
+    """Rebuild the summary table in one transaction."""
+    parser = argparse.ArgumentParser(description="Rebuild class statistics from the results table")
+    parser.add_argument("--teacher", type=int, help="Only rebuild this teacher's statistics")
+    args = parser.parse_args()
+
+    print("🚀 AI QuizLab - Class Statistics Rebuild")
+    print("=" * 50)
+
+    with app.app_context():
+        db.create_all()
+        started = time.perf_counter()
+        try:
+            summarized = rebuild_class_statistics(args.teacher)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Rebuild failed: {e}")
+            return
+        print(f"✅ Summarized {summarized} results in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
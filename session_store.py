@@ -0,0 +1,468 @@
+import hashlib
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from flask.sessions import SessionInterface, SessionMixin, session_json_serializer
+from itsdangerous import BadSignature, Signer
+from werkzeug.datastructures import CallbackDict
+
+# ============================================================================
+# EXPIRING KEY-VALUE STORES
+# ============================================================================
+
+class SessionStore:
+    """
+    Expiring key-value store for server-side sessions and one-shot blobs.
+
+    Values are strings; every entry carries a time-to-live and expired
+    entries are never returned. Subclasses implement `get`, `set`, `delete`,
+    `take` and `purge_expired`.
+    """
+
+    name = 'base'
+
+    def get(self, key):
+        """
+        Read an entry.
+
+        Args:
+            key (str): Entry key
+
+        Returns:
+            tuple: (value, expires_at as a Unix timestamp), or None if missing or expired
+        """
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        """
+        Create or replace an entry.
+
+        Args:
+            key (str): Entry key
+            value (str): Value to store
+            ttl (float): Seconds until the entry expires
+        """
+        raise NotImplementedError
+
+    def delete(self, key):
+        """Remove an entry if it exists."""
+        raise NotImplementedError
+
+    def take(self, key):
+        """
+        Read and remove an entry atomically, so only one caller gets it.
+
+        Returns:
+            str: The value, or None if missing or expired
+        """
+        raise NotImplementedError
+
+    def purge_expired(self):
+        """
+        Remove expired entries.
+
+        Returns:
+            int: Number of entries removed (0 when the store expires entries itself)
+        """
+        return 0
+
+    def put_blob(self, data, ttl):
+        """
+        Store JSON-serializable data that can be read exactly once.
+
+        Args:
+            data: JSON-serializable value
+            ttl (float): Seconds until the blob expires unread
+
+        Returns:
+            str: Unguessable token for `take_blob`
+        """
+        token = secrets.token_urlsafe(24)
+        self.set(f'blob:{token}', json.dumps(data), ttl)
+        return token
+
+    def take_blob(self, token):
+        """
+        Return a blob's data and delete it.
+
+        Args:
+            token (str): Token returned by `put_blob`
+
+        Returns:
+            The stored data, or None if the blob was already taken or has expired
+        """
+        if not token:
+            return None
+        value = self.take(f'blob:{token}')
+        return json.loads(value) if value is not None else None
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Store backed by a local SQLite file, shared by all worker processes of one host.
+
+    Expired rows are deleted at most once per `purge_interval` seconds by the
+    next write.
+    """
+
+    name = 'sqlite'
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS session_store (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS ix_session_store_expires ON session_store (expires_at);
+    """
+
+    def __init__(self, path, purge_interval=60.0):
+        """
+        Open (or create) the store file.
+
+        Args:
+            path (str): Path of the SQLite file
+            purge_interval (float): Minimum seconds between purges of expired rows
+        """
+        self.path = path
+        self.purge_interval = purge_interval
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._last_purge = 0.0
+        self._conn().executescript(self.SCHEMA)
+
+    def _conn(self):
+        """Return this thread's autocommit connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            # Sessions can be recreated by logging in again; skip fsync on every write
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute(
+            'SELECT value, expires_at FROM session_store WHERE key = ? AND expires_at > ?', (key, time.time())
+        ).fetchone()
+        return tuple(row) if row else None
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        self._conn().execute(
+            'INSERT INTO session_store (key, value, expires_at) VALUES (?, ?, ?) '
+            'ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at',
+            (key, value, now + ttl)
+        )
+        if now - self._last_purge >= self.purge_interval:
+            self.purge_expired()
+
+    def delete(self, key):
+        self._conn().execute('DELETE FROM session_store WHERE key = ?', (key,))
+
+    def take(self, key):
+        row = self._conn().execute(
+            'DELETE FROM session_store WHERE key = ? RETURNING value, expires_at', (key,)
+        ).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        return row[0]
+
+    def purge_expired(self):
+        self._last_purge = time.time()
+        return self._conn().execute('DELETE FROM session_store WHERE expires_at <= ?', (self._last_purge,)).rowcount
+
+
+class FilesystemSessionStore(SessionStore):
+    """
+    Store keeping one JSON file per entry in a directory.
+
+    Writes go through a temporary file and an atomic rename; `take` claims
+    the file by renaming it first, so concurrent readers cannot both get it.
+    Expired files are deleted at most once per `purge_interval` seconds by
+    the next write.
+    """
+
+    name = 'filesystem'
+
+    def __init__(self, directory, purge_interval=60.0):
+        """
+        Args:
+            directory (str): Directory for the entry files (created if missing)
+            purge_interval (float): Minimum seconds between purges of expired files
+        """
+        self.directory = directory
+        self.purge_interval = purge_interval
+        self._last_purge = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest() + '.json')
+
+    @staticmethod
+    def _read(path):
+        """Return (value, expires_at) from an entry file, or None."""
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry['value'], entry['expires_at']
+
+    def get(self, key):
+        entry = self._read(self._path(key))
+        if entry is None or entry[1] <= time.time():
+            return None
+        return entry
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        path = self._path(key)
+        temp_path = f'{path}.{secrets.token_hex(4)}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'value': value, 'expires_at': now + ttl}, f)
+        os.replace(temp_path, path)
+        if now - self._last_purge >= self.purge_interval:
+            self.purge_expired()
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def take(self, key):
+        path = self._path(key)
+        claimed = f'{path}.{secrets.token_hex(4)}.taken'
+        try:
+            os.rename(path, claimed)
+        except FileNotFoundError:
+            return None
+        entry = self._read(claimed)
+        os.remove(claimed)
+        if entry is None or entry[1] <= time.time():
+            return None
+        return entry[0]
+
+    def purge_expired(self):
+        self._last_purge = now = time.time()
+        removed = 0
+        for filename in os.listdir(self.directory):
+            path = os.path.join(self.directory, filename)
+            if filename.endswith('.json'):
+                entry = self._read(path)
+                expired = entry is None or entry[1] <= now
+            else:
+                # Leftovers of interrupted writes or takes
+                expired = now - os.path.getmtime(path) > self.purge_interval
+            if expired:
+                try:
+                    os.remove(path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Store on a Redis-compatible server (Redis, Valkey, KeyDB, ...), shared by
+    several hosts. Entries expire natively.
+
+    Requires the `redis` package (pip install redis).
+    """
+
+    name = 'redis'
+
+    def __init__(self, url='redis://localhost:6379/0', prefix='quizlab:'):
+        """
+        Args:
+            url (str): Server URL
+            prefix (str): Prefix added to every key
+        """
+        import redis  # Optional: pip install redis
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        pipe = self.client.pipeline()
+        pipe.get(self.prefix + key)
+        pipe.pttl(self.prefix + key)
+        value, ttl_ms = pipe.execute()
+        if value is None:
+            return None
+        return value.decode(), time.time() + max(ttl_ms, 0) / 1000
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, value, px=max(1, int(ttl * 1000)))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def take(self, key):
+        # MULTI/EXEC: GET and DEL run atomically
+        pipe = self.client.pipeline(transaction=True)
+        pipe.get(self.prefix + key)
+        pipe.delete(self.prefix + key)
+        value, _ = pipe.execute()
+        return value.decode() if value is not None else None
+
+
+STORES = {
+    SQLiteSessionStore.name: SQLiteSessionStore,
+    FilesystemSessionStore.name: FilesystemSessionStore,
+    RedisSessionStore.name: RedisSessionStore,
+}
+
+
+def create_session_store(kind='sqlite', location=None):
+    """
+    Create a store by name.
+
+    Args:
+        kind (str): One of the keys in STORES
+        location (str): SQLite file path, directory or Redis URL, depending on the kind
+
+    Returns:
+        SessionStore: Configured store
+
+    Raises:
+        ValueError: If the store name is unknown
+    """
+    store_class = STORES.get(kind)
+    if store_class is None:
+        raise ValueError(f"Unknown session store '{kind}'. Available: {', '.join(sorted(STORES))}")
+    return store_class(location) if location else store_class()
+
+# ============================================================================
+# FLASK SESSION INTERFACE
+# ============================================================================
+
+class ServerSession(CallbackDict, SessionMixin):
+    """Session data kept in a SessionStore; the cookie only carries the signed session ID."""
+
+    def __init__(self, initial=None, sid=None, expires_at=0.0, new=False):
+        def on_update(self):
+            self.modified = True
+            self.accessed = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.expires_at = expires_at
+        self.new = new
+        self.modified = False
+        self.accessed = False
+
+    def __getitem__(self, key):
+        self.accessed = True
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        self.accessed = True
+        return super().get(key, default)
+
+    def setdefault(self, key, default=None):
+        self.accessed = True
+        return super().setdefault(key, default)
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """
+    Flask session interface storing session data server-side.
+
+    The cookie holds a random session ID signed with SECRET_KEY, so forged
+    IDs are rejected without a store lookup. Entries live for
+    PERMANENT_SESSION_LIFETIME; a session that is read but not changed is
+    rewritten only once half of its lifetime has passed, which keeps the
+    sliding expiry without a store write on every request.
+    """
+
+    serializer = session_json_serializer
+
+    def __init__(self, store):
+        """
+        Args:
+            store (SessionStore): Where session data is kept
+        """
+        self.store = store
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt='server-side-session', key_derivation='hmac')
+
+    @staticmethod
+    def _key(sid):
+        return f'session:{sid}'
+
+    def open_session(self, app, request):
+        if not app.secret_key:
+            return None
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if cookie:
+            try:
+                sid = self._signer(app).unsign(cookie).decode()
+            except BadSignature:
+                sid = None
+            stored = self.store.get(self._key(sid)) if sid else None
+            if stored:
+                value, expires_at = stored
+                return ServerSession(self.serializer.loads(value), sid=sid, expires_at=expires_at)
+        return ServerSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        cookie_options = {
+            'domain': self.get_cookie_domain(app),
+            'path': self.get_cookie_path(app),
+            'secure': self.get_cookie_secure(app),
+            'partitioned': self.get_cookie_partitioned(app),
+            'samesite': self.get_cookie_samesite(app),
+            'httponly': self.get_cookie_httponly(app)
+        }
+
+        if session.accessed:
+            response.vary.add('Cookie')
+
+        # An emptied session (logout) is deleted together with its cookie
+        if not session:
+            if session.modified and not session.new:
+                self.store.delete(self._key(session.sid))
+                response.delete_cookie(name, **cookie_options)
+                response.vary.add('Cookie')
+            return
+
+        ttl = app.permanent_session_lifetime.total_seconds()
+        if session.new or session.modified or session.expires_at - time.time() < ttl / 2:
+            self.store.set(self._key(session.sid), self.serializer.dumps(dict(session)), ttl)
+        elif not self.should_set_cookie(app, session):
+            return
+
+        response.set_cookie(name, self._signer(app).sign(session.sid).decode(),
+                            expires=self.get_expiration_time(app, session), **cookie_options)
+        response.vary.add('Cookie')
+
+
+def init_session_store(app):
+    """
+    Create the app's server-side store and, if enabled, move sessions into it.
+
+    The store is always created because one-shot blobs (such as the student
+    password sheet) are kept in it even when sessions stay in cookies.
+
+    Args:
+        app (Flask): Application to configure
+
+    Returns:
+        SessionStore: The store, also available as app.extensions['session_store']
+    """
+    store = create_session_store(app.config.get('SESSION_STORE', 'sqlite'),
+                                 app.config.get('SESSION_STORE_LOCATION'))
+    if app.config.get('SERVER_SIDE_SESSIONS', True):
+        app.session_interface = ServerSideSessionInterface(store)
+    app.extensions['session_store'] = store
+    return store
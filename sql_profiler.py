@@ -0,0 +1,314 @@
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import g, jsonify, request
+from sqlalchemy import event
+from metrics import registry as metrics, log_event
+
+# Profiles collecting the statements of the current request or capture block
+_active_profiles = ContextVar('sql_active_profiles', default=())
+
+# Literals and placeholder lists that differ between otherwise identical statements
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))*\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+# ============================================================================
+# STATEMENT CAPTURE
+# ============================================================================
+
+def fingerprint(statement):
+    """
+    Normalize a SQL statement so repeated executions with different
+    parameters map to the same fingerprint.
+
+    Args:
+        statement (str): SQL text as sent to the driver
+
+    Returns:
+        str: Statement with literals and IN-lists collapsed
+    """
+    text = _STRING_LITERAL.sub('?', statement)
+    text = _NUMBER_LITERAL.sub('?', text)
+    text = _PLACEHOLDER_LIST.sub('(?)', text)
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+class QueryProfile:
+    """Statements executed during one request or capture block."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = {}  # fingerprint -> [executions, seconds]
+
+    def record(self, statement, seconds):
+        """Add one executed statement."""
+        self.count += 1
+        self.seconds += seconds
+        entry = self.statements.setdefault(fingerprint(statement), [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    def repeated(self, threshold=2):
+        """
+        Return statements executed at least `threshold` times, most frequent first.
+
+        Args:
+            threshold (int): Minimum number of executions
+
+        Returns:
+            list: [(fingerprint, executions, seconds)]
+        """
+        items = [(sql, count, seconds) for sql, (count, seconds) in self.statements.items() if count >= threshold]
+        return sorted(items, key=lambda item: item[1], reverse=True)
+
+    def max_repeats(self):
+        """Return the execution count of the most repeated statement."""
+        return max((count for count, _ in self.statements.values()), default=0)
+
+    def describe(self, limit=5):
+        """Return a readable summary listing the most repeated statements."""
+        lines = [f"{self.count} queries in {self.seconds * 1000:.1f} ms"]
+        for sql, count, _ in self.repeated()[:limit]:
+            lines.append(f"  {count}x {sql[:200]}")
+        return '\n'.join(lines)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _active_profiles.get():
+        conn.info.setdefault('sql_profiler_started', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profiles = _active_profiles.get()
+    started = conn.info.get('sql_profiler_started')
+    if not profiles or not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    for profile in profiles:
+        profile.record(statement, elapsed)
+
+def profile_engines(app, db):
+    """
+    Attach the statement listeners to every engine of the app (idempotent).
+
+    Listeners cost a context variable lookup per statement while no profile
+    is active.
+
+    Args:
+        app (Flask): Application with configured engines
+        db (SQLAlchemy): Flask-SQLAlchemy extension bound to the app
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+                event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+                event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+@contextmanager
+def capture_queries():
+    """
+    Collect every statement executed inside the block (in this thread).
+
+    Yields:
+        QueryProfile: Filled in as statements run
+    """
+    profile = QueryProfile()
+    token = _active_profiles.set(_active_profiles.get() + (profile,))
+    try:
+        yield profile
+    finally:
+        _active_profiles.reset(token)
+
+# ============================================================================
+# REQUEST PROFILING
+# ============================================================================
+
+class SQLProfiler:
+    """
+    Per-request query counting with N+1 detection.
+
+    Every response gets X-SQL-Queries, X-SQL-Max-Repeats and a Server-Timing
+    `db` entry (visible in the browser's network panel). Totals per endpoint
+    are aggregated in memory and served by /debug/sql. Requests repeating one
+    statement SQL_PROFILING_REPEAT_THRESHOLD times or more are logged as
+    likely N+1 patterns. Queries issued while a streamed response (CSV
+    export) is sent happen after the headers and are not counted.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def start(self):
+        """before_request hook: begin collecting statements."""
+        profile = QueryProfile()
+        g.sql_profile = profile
+        g.sql_profile_token = _active_profiles.set(_active_profiles.get() + (profile,))
+
+    def finish(self, response):
+        """after_request hook: publish headers, metrics and aggregates."""
+        profile = g.get('sql_profile')
+        if profile is None:
+            return response
+
+        endpoint = request.endpoint or 'unknown'
+        response.headers['X-SQL-Queries'] = str(profile.count)
+        response.headers['X-SQL-Max-Repeats'] = str(profile.max_repeats())
+        response.headers.add('Server-Timing', f'db;dur={profile.seconds * 1000:.1f};desc="{profile.count} queries"')
+
+        metrics.observe('sql_queries_per_request', profile.count, endpoint=endpoint)
+        metrics.observe('sql_seconds_per_request', profile.seconds, endpoint=endpoint)
+
+        threshold = self.app.config.get('SQL_PROFILING_REPEAT_THRESHOLD', 5)
+        suspects = profile.repeated(threshold)
+        if suspects:
+            metrics.inc('sql_n_plus_one_total', endpoint=endpoint)
+            log_event('sql_n_plus_one', endpoint=endpoint, queries=profile.count,
+                      statement=suspects[0][0][:300], executions=suspects[0][1])
+
+        self._aggregate(endpoint, profile)
+        return response
+
+    def stop(self, exc):
+        """teardown_request hook: stop collecting even if the request failed."""
+        token = g.pop('sql_profile_token', None)
+        if token is not None:
+            _active_profiles.reset(token)
+
+    def _aggregate(self, endpoint, profile):
+        """Add one request's profile to the endpoint totals."""
+        with self._lock:
+            totals = self._endpoints.setdefault(endpoint, {
+                'requests': 0, 'queries': 0, 'max_queries': 0, 'seconds': 0.0, 'statements': {}
+            })
+            totals['requests'] += 1
+            totals['queries'] += profile.count
+            totals['max_queries'] = max(totals['max_queries'], profile.count)
+            totals['seconds'] += profile.seconds
+            for sql, (count, _) in profile.statements.items():
+                stats = totals['statements'].setdefault(sql, {'executions': 0, 'max_per_request': 0})
+                stats['executions'] += count
+                stats['max_per_request'] = max(stats['max_per_request'], count)
+
+    def report(self, top=10):
+        """
+        Summarize the profiled requests per endpoint.
+
+        Args:
+            top (int): Statements listed per endpoint, most executed first
+
+        Returns:
+            dict: Endpoint -> requests, average/max queries, DB time and top statements
+        """
+        with self._lock:
+            report = {}
+            for endpoint, totals in sorted(self._endpoints.items()):
+                statements = sorted(totals['statements'].items(), key=lambda item: item[1]['executions'],
+                                    reverse=True)[:top]
+                report[endpoint] = {
+                    'requests': totals['requests'],
+                    'avg_queries': round(totals['queries'] / totals['requests'], 1),
+                    'max_queries': totals['max_queries'],
+                    'avg_db_ms': round(totals['seconds'] * 1000 / totals['requests'], 2),
+                    'statements': [{'sql': sql, **stats} for sql, stats in statements]
+                }
+            return report
+
+    def reset(self):
+        """Drop the aggregated profiles."""
+        with self._lock:
+            self._endpoints.clear()
+
+    def report_endpoint(self):
+        """GET /debug/sql: aggregated profiles (DELETE resets them)."""
+        token = self.app.config.get('METRICS_TOKEN')
+        if token and request.headers.get('Authorization') != f'Bearer {token}':
+            return 'Unauthorized', 401
+        if request.method == 'DELETE':
+            self.reset()
+            return jsonify(success=True)
+        return jsonify(self.report(request.args.get('top', 10, type=int)))
+
+
+def init_sql_profiler(app, db):
+    """
+    Enable per-request SQL profiling and the /debug/sql report.
+
+    Args:
+        app (Flask): Application to profile
+        db (SQLAlchemy): Flask-SQLAlchemy extension bound to the app
+
+    Returns:
+        SQLProfiler: The registered profiler
+    """
+    profile_engines(app, db)
+    profiler = SQLProfiler(app)
+    app.before_request(profiler.start)
+    app.after_request(profiler.finish)
+    app.teardown_request(profiler.stop)
+    app.add_url_rule('/debug/sql', 'debug_sql', profiler.report_endpoint, methods=['GET', 'DELETE'])
+    app.extensions['sql_profiler'] = profiler
+    return profiler
+
+# ============================================================================
+# TEST HELPERS
+# ============================================================================
+
+@contextmanager
+def assert_max_queries(max_queries, max_repeats=None):
+    """
+    Fail if the block executes more statements than its budget.
+
+    Usable from pytest after profile_engines() has been called:
+
+        with assert_max_queries(5, max_repeats=1):
+            client.get('/teacher')
+
+    Args:
+        max_queries (int): Allowed statements in total
+        max_repeats (int, optional): Allowed executions of any one statement
+
+    Yields:
+        QueryProfile: The statements executed so far
+
+    Raises:
+        AssertionError: If the budget is exceeded
+    """
+    with capture_queries() as profile:
+        yield profile
+    if profile.count > max_queries:
+        raise AssertionError(f"Expected at most {max_queries} queries, got {profile.describe()}")
+    if max_repeats is not None and profile.max_repeats() > max_repeats:
+        raise AssertionError(f"A statement ran more than {max_repeats} times (likely N+1): {profile.describe()}")
+
+def assert_route_query_budget(client, path, max_queries, max_repeats=None, method='GET', **kwargs):
+    """
+    Request a route with a Flask test client and assert its query budget.
+
+    Example (pytest):
+
+        def test_teacher_dashboard_queries(client):
+            assert_route_query_budget(client, '/teacher', max_queries=8, max_repeats=1)
+
+    Args:
+        client (FlaskClient): Logged-in test client
+        path (str): Route to request
+        max_queries (int): Allowed statements for the request
+        max_repeats (int, optional): Allowed executions of any one statement
+        method (str): HTTP method
+        **kwargs: Passed to client.open (data, json, headers, ...)
+
+    Returns:
+        TestResponse: The route's response
+
+    Raises:
+        AssertionError: If the route exceeds its budget
+    """
+    with assert_max_queries(max_queries, max_repeats):
+        response = client.open(path, method=method, **kwargs)
+    return response
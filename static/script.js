@@ -358,12 +358,13 @@ document.addEventListener('DOMContentLoaded', function() {
         btn.onclick = function() {
             const row = btn.closest('tr');
             const studentId = row.querySelector('td').textContent;
+            const quizId = btn.dataset.quizId || null;
             
             if (confirm('Are you sure you want to allow this student to retake the quiz? This will delete their previous results.')) {
                 fetch('/reset_student_result', {
                     method: 'POST',
                     headers: {'Content-Type': 'application/json'},
-                    body: JSON.stringify({ id: studentId })
+                    body: JSON.stringify({ id: studentId, quiz_id: quizId })
                 }).then(res => res.json())
                 .then(data => {
                     if (data.success) {
@@ -497,7 +498,11 @@ document.addEventListener('DOMContentLoaded', function() {
                 
                 fetch('/delete_quiz', {
                     method: 'POST',
-                    headers: { 'X-Requested-With': 'XMLHttpRequest' }
+                    headers: {
+                        'X-Requested-With': 'XMLHttpRequest',
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify({ quiz_id: deleteQuizBtn.dataset.quizId })
                 })
                 .then(response => {
                     if (!response.ok) {
@@ -524,17 +529,350 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
+    // ============================================================================
+    // QUESTION BANK BROWSER (Used in question_bank.html)
+    // ============================================================================
+    
+    /**
+     * Search the question bank page by page and hand-pick questions into a quiz.
+     * The selection (in picking order) survives new searches and page changes.
+     */
+    const bankSearchForm = document.getElementById('bankSearchForm');
+    if (bankSearchForm) {
+        const resultsList = document.getElementById('bankResults');
+        const summary = document.getElementById('bankSummary');
+        const prevBtn = document.getElementById('bankPrevPage');
+        const nextBtn = document.getElementById('bankNextPage');
+        const selectedCount = document.getElementById('bankSelectedCount');
+        const createBtn = document.getElementById('bankCreateQuiz');
+        const messageDiv = document.getElementById('bankMessage');
+        const selected = [];  // Question IDs in picking order
+        let currentPage = 1;
+        let totalPages = 0;
+
+        function updateSelection() {
+            selectedCount.textContent = selected.length;
+            createBtn.disabled = selected.length === 0;
+        }
+
+        function renderBankQuestion(q) {
+            const item = document.createElement('label');
+            item.className = 'list-group-item list-group-item-action d-flex align-items-start mb-0';
+
+            const checkbox = document.createElement('input');
+            checkbox.type = 'checkbox';
+            checkbox.className = 'mt-1 mr-3';
+            checkbox.checked = selected.includes(q.id);
+            checkbox.addEventListener('change', () => {
+                const index = selected.indexOf(q.id);
+                if (checkbox.checked && index === -1) selected.push(q.id);
+                if (!checkbox.checked && index !== -1) selected.splice(index, 1);
+                updateSelection();
+            });
+
+            const body = document.createElement('div');
+            body.className = 'flex-fill';
+            const text = document.createElement('p');
+            text.className = 'mb-1';
+            text.textContent = q.question;
+            const options = document.createElement('small');
+            options.className = 'd-block';
+            options.textContent = q.options.map((option, i) => `(${i + 1}) ${option}`).join('  ');
+            const meta = document.createElement('small');
+            meta.className = q.retired ? 'text-danger' : 'text-muted';
+            let details = `#${q.id} | ${q.category} | ${q.level} | Answer: ${q.answer}`;
+            if (q.responses) {
+                details += ` | ${q.responses} responses, ${Math.round(q.difficulty * 100)}% correct`;
+            }
+            if (q.similarity !== undefined) {
+                details += ` | similarity ${q.similarity.toFixed(2)}`;
+            }
+            meta.textContent = q.retired ? `${details} | retired` : details;
+            body.append(text, options, meta);
+
+            const similarBtn = document.createElement('button');
+            similarBtn.type = 'button';
+            similarBtn.className = 'btn btn-sm btn-link text-nowrap';
+            similarBtn.textContent = 'More like this';
+            similarBtn.addEventListener('click', function(e) {
+                e.preventDefault();
+                showSimilar(q);
+            });
+
+            item.append(checkbox, body, similarBtn);
+            return item;
+        }
+
+        function showResults(data, text) {
+            resultsList.innerHTML = '';
+            data.questions.forEach(q => resultsList.appendChild(renderBankQuestion(q)));
+            currentPage = data.page;
+            totalPages = data.pages;
+            summary.textContent = text;
+            prevBtn.disabled = currentPage <= 1;
+            nextBtn.disabled = currentPage >= totalPages;
+        }
+
+        function showSimilar(q) {
+            const includeRetired = document.getElementById('bankIncludeRetired').checked ? '1' : '';
+            summary.textContent = 'Searching...';
+            fetch(`/question_bank/${q.id}/similar?include_retired=${includeRetired}`, {
+                headers: {'X-Requested-With': 'XMLHttpRequest'}
+            })
+            .then(response => response.json())
+            .then(data => {
+                showResults(data, data.total
+                    ? `Questions like #${q.id} - search again to return to your results`
+                    : `No similar questions found for #${q.id}. Is the question index built (python index_questions.py)?`);
+            })
+            .catch(error => {
+                console.error('Similar questions error:', error);
+                summary.textContent = 'Error finding similar questions. Please try again.';
+            });
+        }
+
+        function searchBank(page) {
+            const params = new URLSearchParams({
+                q: document.getElementById('bankQuery').value,
+                category: document.getElementById('bankCategory').value,
+                level: document.getElementById('bankLevel').value,
+                include_retired: document.getElementById('bankIncludeRetired').checked ? '1' : '',
+                page: page
+            });
+            summary.textContent = 'Searching...';
+            fetch(`/question_bank/search?${params}`, {
+                headers: {'X-Requested-With': 'XMLHttpRequest'}
+            })
+            .then(response => response.json())
+            .then(data => {
+                showResults(data, data.total
+                    ? `${data.total} questions - page ${data.page} of ${data.pages}`
+                    : 'No questions found.');
+            })
+            .catch(error => {
+                console.error('Question bank search error:', error);
+                summary.textContent = 'Error searching the question bank. Please try again.';
+            });
+        }
+
+        bankSearchForm.addEventListener('submit', function(e) {
+            e.preventDefault();
+            searchBank(1);
+        });
+        prevBtn.addEventListener('click', () => searchBank(currentPage - 1));
+        nextBtn.addEventListener('click', () => searchBank(currentPage + 1));
+
+        document.getElementById('bankClearSelection').addEventListener('click', function() {
+            selected.length = 0;
+            resultsList.querySelectorAll('input[type="checkbox"]').forEach(box => { box.checked = false; });
+            updateSelection();
+        });
+
+        createBtn.addEventListener('click', function() {
+            createBtn.disabled = true;
+            messageDiv.innerHTML = '<div style="color:blue;">Creating quiz...</div>';
+            fetch('/create_quiz_from_selection', {
+                method: 'POST',
+                headers: {
+                    'X-Requested-With': 'XMLHttpRequest',
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({
+                    question_ids: selected,
+                    quiz_group: document.getElementById('bankQuizGroup').value
+                })
+            })
+            .then(response => response.json())
+            .then(data => {
+                const message = document.createElement('div');
+                message.style.color = data.success ? 'green' : 'red';
+                message.textContent = data.message;
+                messageDiv.innerHTML = '';
+                messageDiv.appendChild(message);
+                if (data.success) {
+                    selected.length = 0;
+                    resultsList.querySelectorAll('input[type="checkbox"]').forEach(box => { box.checked = false; });
+                }
+                updateSelection();
+            })
+            .catch(error => {
+                console.error('Create quiz error:', error);
+                messageDiv.innerHTML = '<div style="color:red;">Error creating quiz. Please try again.</div>';
+                updateSelection();
+            });
+        });
+
+        searchBank(1);
+    }
+
     // ============================================================================
     // STUDENT QUIZ FUNCTIONALITY (Used in quiz.html)
     // ============================================================================
     
+    /**
+     * Paged exam mode: load long quizzes page by page from /quiz/questions.
+     * Loaded pages stay in the form (hidden) so every answer is submitted.
+     */
+    const pagedQuestionList = document.getElementById('pagedQuizQuestions');
+    if (pagedQuestionList) {
+        const totalPages = parseInt(pagedQuestionList.dataset.pages);
+        const savedAnswersElement = document.getElementById('savedAnswers');
+        const savedAnswers = savedAnswersElement ? JSON.parse(savedAnswersElement.textContent) : {};
+        const loadingDiv = document.getElementById('quizPageLoading');
+        const pageIndicator = document.getElementById('quizPageIndicator');
+        const prevBtn = document.getElementById('prevQuizPage');
+        const nextBtn = document.getElementById('nextQuizPage');
+        const submitBtn = document.getElementById('submitPagedQuiz');
+        const loadedPages = {};  // page number -> Promise of its <li> elements
+        let currentPage = 1;
+
+        function renderQuestion(q) {
+            const item = document.createElement('li');
+            item.className = 'list-group-item mb-4 p-3 border rounded shadow-sm';
+
+            const header = document.createElement('div');
+            header.className = 'mb-2';
+            const text = document.createElement('p');
+            text.className = 'font-weight-bold h5';
+            text.textContent = `${q.index + 1}. ${q.question}`;
+            const meta = document.createElement('small');
+            meta.className = 'text-muted';
+            meta.textContent = `Category: ${q.category} | Level: ${q.level}`;
+            header.append(text, meta);
+            item.appendChild(header);
+
+            const options = document.createElement('ul');
+            options.className = 'list-unstyled';
+            q.options.forEach((option, optIdx) => {
+                const optionItem = document.createElement('li');
+                optionItem.className = 'form-check my-2';
+                const input = document.createElement('input');
+                input.className = 'form-check-input';
+                input.type = 'radio';
+                input.name = `q${q.index}`;
+                input.id = `q${q.index}opt${optIdx}`;
+                input.value = option;
+                input.checked = savedAnswers[input.name] === option;
+                const label = document.createElement('label');
+                label.className = 'form-check-label';
+                label.htmlFor = input.id;
+                label.textContent = option;
+                optionItem.append(input, label);
+                options.appendChild(optionItem);
+            });
+            item.appendChild(options);
+            return item;
+        }
+
+        function loadPage(page) {
+            if (!loadedPages[page]) {
+                loadedPages[page] = fetch(`/quiz/questions?page=${page}`, {
+                    headers: {'X-Requested-With': 'XMLHttpRequest'}
+                })
+                .then(response => response.json())
+                .then(data => {
+                    if (!data.success) throw new Error(data.message);
+                    const items = data.questions.map(renderQuestion);
+                    items.forEach(item => {
+                        item.style.display = 'none';
+                        pagedQuestionList.appendChild(item);
+                    });
+                    return items;
+                })
+                .catch(error => {
+                    delete loadedPages[page];  // Allow a retry
+                    throw error;
+                });
+            }
+            return loadedPages[page];
+        }
+
+        function showPage(page) {
+            loadingDiv.style.display = 'block';
+            loadPage(page).then(items => {
+                Object.keys(loadedPages).forEach(p => {
+                    loadedPages[p].then(pageItems => pageItems.forEach(item => { item.style.display = 'none'; }));
+                });
+                items.forEach(item => { item.style.display = ''; });
+                currentPage = page;
+                loadingDiv.style.display = 'none';
+                pageIndicator.textContent = `Page ${page} of ${totalPages}`;
+                prevBtn.disabled = page <= 1;
+                nextBtn.disabled = page >= totalPages;
+                submitBtn.style.display = page >= totalPages ? 'inline-block' : 'none';
+                window.scrollTo(0, 0);
+
+                // Prefetch the next page so navigation feels instant
+                if (page < totalPages) loadPage(page + 1).catch(() => {});
+            })
+            .catch(error => {
+                loadingDiv.textContent = `Error loading questions: ${error.message}`;
+            });
+        }
+
+        prevBtn.addEventListener('click', () => showPage(currentPage - 1));
+        nextBtn.addEventListener('click', () => showPage(currentPage + 1));
+        showPage(1);
+    }
+
     /**
      * Handle student quiz submission via AJAX
      */
     const form = document.getElementById('studentQuizForm');
     if (form) {
+        /**
+         * Autosave: collect changed answers and send them as one small delta
+         * after the student pauses, so a crash or reload loses almost nothing
+         */
+        const AUTOSAVE_DELAY_MS = 2000;
+        const autosaveStatus = document.getElementById('autosaveStatus');
+        const quizIdInput = form.querySelector('input[name="quiz_id"]');
+        let pendingAnswers = {};
+        let autosaveTimer = null;
+        let quizSubmitted = false;
+
+        function flushAutosave(keepalive = false) {
+            clearTimeout(autosaveTimer);
+            autosaveTimer = null;
+            if (quizSubmitted || !quizIdInput || Object.keys(pendingAnswers).length === 0) return;
+
+            const delta = pendingAnswers;
+            pendingAnswers = {};
+            fetch('/autosave', {
+                method: 'POST',
+                headers: {'Content-Type': 'application/json'},
+                body: JSON.stringify({ quiz_id: parseInt(quizIdInput.value), answers: delta }),
+                keepalive: keepalive
+            })
+            .then(response => response.json())
+            .then(data => {
+                if (!autosaveStatus) return;
+                autosaveStatus.textContent = data.success
+                    ? `Answers saved ✓ ${new Date().toLocaleTimeString()}`
+                    : `Autosave failed: ${data.message}`;
+            })
+            .catch(() => {
+                // Keep the unsent answers for the next attempt (newer changes win)
+                pendingAnswers = Object.assign(delta, pendingAnswers);
+                if (autosaveStatus) autosaveStatus.textContent = 'Offline - answers will be saved when the connection returns.';
+            });
+        }
+
+        form.addEventListener('change', function(event) {
+            if (event.target.type !== 'radio') return;
+            pendingAnswers[event.target.name] = event.target.value;
+            clearTimeout(autosaveTimer);
+            autosaveTimer = setTimeout(flushAutosave, AUTOSAVE_DELAY_MS);
+        });
+
+        // Send the last changes when the page is hidden or closed
+        document.addEventListener('visibilitychange', function() {
+            if (document.visibilityState === 'hidden') flushAutosave(true);
+        });
+
         form.addEventListener('submit', function(event) {
             event.preventDefault();
+            clearTimeout(autosaveTimer);
             const formData = new FormData(form);
             
             fetch("/submit_quiz", {
@@ -546,6 +884,7 @@ document.addEventListener('DOMContentLoaded', function() {
             .then(data => {
                 const resultDiv = document.getElementById('quizResult');
                 if (data.success) {
+                    quizSubmitted = true;
                     // Show success message and results summary
                     resultDiv.innerHTML = `<div style="color:green;font-weight:bold;">${data.message}</div><br>${data.summary}`;
                     form.style.display = 'none';
@@ -676,7 +1015,7 @@ document.addEventListener('DOMContentLoaded', function() {
         if (!tbody) return;
         const rows = Array.from(tbody.querySelectorAll('tr'));
 
-        const colSpanForEmpty = table.id === 'studentsTable' ? 6 : 10; // Adjust based on table
+        const colSpanForEmpty = table.id === 'studentsTable' ? 6 : 11; // Adjust based on table
         if (rows.length === 1 && rows[0].querySelectorAll('td').length === 1 && rows[0].querySelector('td').colSpan === colSpanForEmpty) {
             return; 
         }
@@ -763,13 +1102,14 @@ document.addEventListener('DOMContentLoaded', function() {
 
             btn.onclick = function() {
                 const studentId = this.dataset.studentId; // Using data-attribute
+                const quizId = this.dataset.quizId || null; // Empty for results recorded before versioned quizzes
                 const row = this.closest('tr');
                 
                 if (confirm(`Are you sure you want to allow student ID ${studentId} to retake the quiz? This will delete their previous results.`)) {
                     fetch('/reset_student_result', {
                         method: 'POST',
                         headers: {'Content-Type': 'application/json'},
-                        body: JSON.stringify({ id: studentId })
+                        body: JSON.stringify({ id: studentId, quiz_id: quizId })
                     }).then(res => res.json())
                     .then(data => {
                         if (data.success) {
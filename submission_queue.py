@@ -0,0 +1,438 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from metrics import registry as metrics
+
+# ============================================================================
+# DURABLE SUBMISSION JOURNAL
+# ============================================================================
+
+class SubmissionJournal:
+    """
+    Durable local queue of scored quiz submissions backed by an SQLite file.
+
+    Each student can hold at most one entry per quiz, which enforces the
+    one-submission-per-quiz rule before the result reaches the database.
+    Entries move through the states pending -> flushing -> flushed/failed;
+    a failed write goes back to pending until the writer runs out of attempts.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS pending_submissions (
+            student_id INTEGER NOT NULL,
+            quiz_id INTEGER NOT NULL,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            error TEXT,
+            created_at REAL NOT NULL,
+            claimed_at REAL,
+            flushed_at REAL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL,
+            PRIMARY KEY (student_id, quiz_id)
+        );
+        CREATE INDEX IF NOT EXISTS ix_pending_submissions_status ON pending_submissions (status, created_at);
+    """
+
+    def __init__(self, path):
+        """
+        Open (or create) the journal file.
+
+        Args:
+            path (str): Path of the SQLite journal file
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(self.SCHEMA)
+        with self._transaction() as conn:
+            columns = {row['name'] for row in conn.execute('PRAGMA table_info(pending_submissions)')}
+            if 'attempts' not in columns:
+                # Journal written before failed entries were retried
+                conn.execute('ALTER TABLE pending_submissions ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0')
+                conn.execute('ALTER TABLE pending_submissions ADD COLUMN next_attempt_at REAL')
+
+    def _conn(self):
+        """Return this thread's autocommit connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            # FULL: an acknowledged submission survives a power loss
+            conn.execute('PRAGMA synchronous=FULL')
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self):
+        """Return a context manager for a write transaction on this thread's connection."""
+        return _Transaction(self._conn())
+
+    def enqueue(self, result_data):
+        """
+        Durably store a scored submission.
+
+        Args:
+            result_data (dict): Data for the Result row (see create_result_data),
+                including student_id and quiz_id, plus optional 'responses' rows
+                (see question_responses.response_rows)
+
+        An entry the writer gave up on ('failed'), or one already flushed whose
+        result was removed since, is replaced.
+
+        Returns:
+            bool: True if stored, False if the student already has an entry for the quiz
+        """
+        with self._transaction() as conn:
+            stored = conn.execute(
+                """INSERT INTO pending_submissions (student_id, quiz_id, payload, created_at) VALUES (?, ?, ?, ?)
+                   ON CONFLICT (student_id, quiz_id) DO UPDATE SET
+                       payload = excluded.payload, status = 'pending', error = NULL, created_at = excluded.created_at,
+                       claimed_at = NULL, flushed_at = NULL, attempts = 0, next_attempt_at = NULL
+                   WHERE pending_submissions.status IN ('failed', 'flushed')""",
+                (result_data['student_id'], result_data['quiz_id'], json.dumps(result_data), time.time())
+            ).rowcount
+        if not stored:
+            return False
+        metrics.inc('submissions_enqueued_total')
+        return True
+
+    def get(self, student_id, quiz_id):
+        """
+        Return the journal entry for a student's submission to a quiz.
+
+        Args:
+            student_id (int): Student ID
+            quiz_id (int): Quiz ID
+
+        Returns:
+            dict: Entry with 'status', 'result' and 'error' keys, or None
+        """
+        row = self._conn().execute(
+            'SELECT status, payload, error FROM pending_submissions WHERE student_id = ? AND quiz_id = ?',
+            (student_id, quiz_id)
+        ).fetchone()
+        if row is None:
+            return None
+        return {'status': row['status'], 'result': json.loads(row['payload']), 'error': row['error']}
+
+    def discard(self, student_id, quiz_id):
+        """Remove a student's entry for a quiz, e.g. when the teacher resets their result."""
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM pending_submissions WHERE student_id = ? AND quiz_id = ?',
+                         (student_id, quiz_id))
+
+    def claim_batch(self, limit, stale_after=60):
+        """
+        Atomically claim up to `limit` pending entries for flushing.
+
+        Entries stuck in 'flushing' for longer than `stale_after` seconds
+        (e.g. after a crash) are claimed again; entries waiting to retry a
+        failed write are claimed once their delay has passed.
+
+        Args:
+            limit (int): Maximum number of entries to claim
+            stale_after (float): Seconds after which a claim is considered abandoned
+
+        Returns:
+            tuple: (claim token for settle, list of ((student_id, quiz_id), result_data) tuples)
+        """
+        with self._transaction() as conn:
+            now = time.time()  # Taken under the lock: every entry claimed was created before the token
+            rows = conn.execute(
+                """SELECT student_id, quiz_id, payload FROM pending_submissions
+                   WHERE (status = 'pending' AND (next_attempt_at IS NULL OR next_attempt_at <= ?))
+                      OR (status = 'flushing' AND claimed_at < ?)
+                   ORDER BY created_at LIMIT ?""",
+                (now, now - stale_after, limit)
+            ).fetchall()
+            conn.executemany(
+                """UPDATE pending_submissions SET status = 'flushing', claimed_at = ?, attempts = attempts + 1
+                   WHERE student_id = ? AND quiz_id = ?""",
+                [(now, row['student_id'], row['quiz_id']) for row in rows]
+            )
+        return now, [((row['student_id'], row['quiz_id']), json.loads(row['payload'])) for row in rows]
+
+    def settle(self, token, flushed, failed, max_attempts=5, retry_delay=5.0):
+        """
+        Record the outcome of a written batch.
+
+        A failed entry is retried after retry_delay seconds, doubling with
+        each attempt, and marked 'failed' after max_attempts writes.
+        Only entries still claimed under `token` are updated. An entry that
+        was discarded while the batch was being written (a teacher resetting
+        the result), possibly followed by a new submission, is returned so
+        the writer can remove the Result it wrote. Entries re-claimed by
+        another writer after `stale_after` are left to that writer.
+
+        Args:
+            token (float): Claim token returned by claim_batch
+            flushed (list): Keys written to the database
+            failed (list): (key, error) tuples of entries that could not be written
+            max_attempts (int): Writes of an entry before it is given up
+            retry_delay (float): Seconds before the first retry
+
+        Returns:
+            set: Keys whose entry was discarded during the write
+        """
+        outcomes = [(key, 'flushed', None) for key in flushed] + [(key, 'failed', error) for key, error in failed]
+        if not outcomes:
+            return set()
+        now = time.time()
+        discarded = set()
+        with self._transaction() as conn:
+            for (student_id, quiz_id), status, error in outcomes:
+                row = conn.execute(
+                    """SELECT status, created_at, claimed_at, attempts FROM pending_submissions
+                       WHERE student_id = ? AND quiz_id = ?""",
+                    (student_id, quiz_id)
+                ).fetchone()
+                if row is None or row['created_at'] > token:
+                    discarded.add((student_id, quiz_id))
+                    continue
+                if row['status'] != 'flushing' or row['claimed_at'] != token:
+                    continue
+                next_attempt_at = None
+                if status == 'failed' and row['attempts'] < max_attempts:
+                    status, next_attempt_at = 'pending', now + retry_delay * 2 ** (row['attempts'] - 1)
+                conn.execute(
+                    """UPDATE pending_submissions SET status = ?, error = ?, flushed_at = ?, next_attempt_at = ?
+                       WHERE student_id = ? AND quiz_id = ?""",
+                    (status, error, now, next_attempt_at, student_id, quiz_id)
+                )
+        return discarded
+
+    def purge_flushed(self, older_than):
+        """
+        Delete flushed entries older than the given age.
+
+        Args:
+            older_than (float): Age in seconds
+        """
+        with self._transaction() as conn:
+            conn.execute(
+                "DELETE FROM pending_submissions WHERE status = 'flushed' AND flushed_at < ?",
+                (time.time() - older_than,)
+            )
+
+    def backlog(self):
+        """Return the number of entries not yet written to the database."""
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM pending_submissions WHERE status IN ('pending', 'flushing')"
+        ).fetchone()[0]
+
+
+class _Transaction:
+    """Context manager running a block in an immediate SQLite transaction."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+        return False
+
+# ============================================================================
+# BACKGROUND WRITER
+# ============================================================================
+
+class SubmissionWriter:
+    """
+    Background thread that flushes journaled submissions in batched transactions.
+    """
+
+    def __init__(self, app, journal, batch_size=200, interval=1.0, retention=86400, max_attempts=5, retry_delay=5.0):
+        """
+        Initialize the writer.
+
+        Args:
+            app (Flask): Application providing the database context
+            journal (SubmissionJournal): Journal to drain
+            batch_size (int): Maximum results inserted per transaction
+            interval (float): Seconds to wait between polls when the journal is empty
+            retention (float): Seconds to keep flushed entries for status checks
+            max_attempts (int): Writes of an entry before it is marked failed
+            retry_delay (float): Seconds before retrying a failed write, doubled per attempt
+        """
+        self.app = app
+        self.journal = journal
+        self.batch_size = batch_size
+        self.interval = interval
+        self.retention = retention
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the background flushing thread."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='submission-writer', daemon=True)
+            self._thread.start()
+
+    def stop(self, flush=True):
+        """
+        Stop the thread, optionally draining the journal first.
+
+        Args:
+            flush (bool): Write all pending entries before returning
+        """
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=30)
+        if flush:
+            while self.flush():
+                pass
+
+    def notify(self):
+        """Wake the writer early, e.g. right after an enqueue."""
+        self._wake.set()
+
+    def _run(self):
+        last_purge = time.time()
+        while not self._stop.is_set():
+            try:
+                flushed = self.flush()
+            except Exception as e:
+                print(f"⚠️ Submission writer error: {e}")
+                flushed = 0
+
+            if time.time() - last_purge > 3600:
+                self.journal.purge_flushed(self.retention)
+                last_purge = time.time()
+
+            # Keep draining while there is work; otherwise sleep until woken
+            if flushed < self.batch_size:
+                self._wake.wait(self.interval)
+                self._wake.clear()
+
+    def flush(self):
+        """
+        Write one batch of pending submissions to the database.
+
+        Returns:
+            int: Number of entries processed
+        """
+        token, batch = self.journal.claim_batch(self.batch_size)
+        if not batch:
+            metrics.set('submission_backlog', 0)
+            return 0
+
+        started = time.perf_counter()
+        with self.app.app_context():
+            # The journal is not locked while writing, so submissions are acknowledged meanwhile
+            flushed, failed, written = write_results(batch)
+            discarded = self.journal.settle(token, flushed, failed, self.max_attempts, self.retry_delay)
+            if discarded:
+                remove_results([written[key] for key in discarded if key in written])
+
+        metrics.observe('submission_flush_seconds', time.perf_counter() - started)
+        metrics.observe('submission_flush_batch_size', len(batch))
+        metrics.inc('submissions_flushed_total', len(flushed))
+        metrics.inc('submissions_failed_total', len(failed))
+        metrics.set('submission_backlog', self.journal.backlog())
+        return len(batch)
+
+
+def write_results(batch):
+    """
+    Insert a batch of results, their per-question responses and class
+    statistics in one transaction, skipping submissions already saved.
+
+    If the batch transaction fails, entries are retried one by one so a single
+    bad row cannot block the rest. Must run inside an application context.
+
+    Args:
+        batch (list): List of ((student_id, quiz_id), result_data) tuples
+
+    Returns:
+        tuple: (list of flushed keys, list of (key, error) tuples,
+            dict of {key: Result ID} for the rows inserted by this call)
+    """
+    from models import db, Result  # Import here to avoid circular imports
+    from class_stats import quiz_teachers, record_results
+    from question_responses import save_responses
+
+    if not batch:
+        return [], [], {}
+    keys = [key for key, _ in batch]
+    student_ids = {student_id for student_id, _ in keys}
+    existing = {
+        (student_id, quiz_id) for student_id, quiz_id in
+        db.session.query(Result.student_id, Result.quiz_id).filter(Result.student_id.in_(student_ids))
+    }
+    to_insert = [(key, data) for key, data in batch if key not in existing]
+    teachers = quiz_teachers(quiz_id for _, quiz_id in keys)
+    responses = {key: data.pop('responses', []) for key, data in to_insert}
+
+    try:
+        results = {key: Result(**data) for key, data in to_insert}
+        db.session.add_all(results.values())
+        save_responses([row for key, _ in to_insert for row in responses[key]])
+        record_results([(teachers.get(data['quiz_id']), data) for _, data in to_insert])
+        db.session.flush()
+        written = {key: result.id for key, result in results.items()}  # Read before commit expires them
+        db.session.commit()
+        return keys, [], written
+    except Exception:
+        db.session.rollback()
+
+    flushed, failed, written = [key for key in keys if key in existing], [], {}
+    for key, data in to_insert:
+        try:
+            result = Result(**data)
+            db.session.add(result)
+            save_responses(responses[key])
+            record_results([(teachers.get(data['quiz_id']), data)])
+            db.session.flush()
+            result_id = result.id
+            db.session.commit()
+            flushed.append(key)
+            written[key] = result_id
+        except Exception as e:
+            db.session.rollback()
+            failed.append((key, str(e)))
+    return flushed, failed, written
+
+
+def remove_results(result_ids):
+    """
+    Delete results written for journal entries that were discarded during
+    the flush, with their responses and class statistics, as a teacher
+    reset does. Must run inside an application context.
+
+    Args:
+        result_ids (list): IDs of the Result rows to delete
+
+    Returns:
+        int: Number of results deleted
+    """
+    from sqlalchemy import delete
+    from models import db, Result
+    from class_stats import quiz_teachers, record_results
+    from question_responses import discard_responses
+
+    if not result_ids:
+        return 0
+    results = Result.query.filter(Result.id.in_(result_ids)).all()
+    teachers = quiz_teachers(result.quiz_id for result in results)
+    removed = 0
+    for result in results:
+        # The reset that discarded the entry may have deleted the row already; undo the statistics once
+        if db.session.execute(delete(Result.__table__).where(Result.id == result.id)).rowcount:
+            record_results([(teachers.get(result.quiz_id), result)], sign=-1)
+            discard_responses(result.student_id, result.quiz_id)
+            removed += 1
+    db.session.commit()
+    return removed
@@ -4,7 +4,8 @@ import string
 import os
 import json
 import io
-from flask import send_file
+import zlib
+from flask import Response, stream_with_context
 
 # ============================================================================
 # FILE PATH UTILITIES
@@ -101,21 +102,88 @@ def create_csv_response(data, headers, filename):
     Returns:
         flask.Response: Flask response object configured for CSV file download
     """
-    # Create in-memory CSV content
-    output = io.StringIO()
-    writer = csv.writer(output)
+    return stream_csv_response(data, headers, filename)
+
+def iter_csv_chunks(rows, headers, chunk_rows=500):
+    """
+    Encode rows as CSV text in bounded chunks.
     
-    # Write headers and data rows
+    Only one chunk of rows is held in memory at a time, so the caller can
+    pass a database cursor or any other lazy iterable.
+    
+    Args:
+        rows (iterable): Iterable of rows (lists or tuples of column values)
+        headers (list): List of column header names
+        chunk_rows (int, optional): Rows per yielded chunk. Defaults to 500.
+        
+    Yields:
+        bytes: UTF-8 encoded CSV data
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
     writer.writerow(headers)
-    writer.writerows(data)
-    output.seek(0)
     
-    # Convert to bytes and create downloadable response
-    return send_file(
-        io.BytesIO(output.getvalue().encode('utf-8')),
+    pending = 1
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue().encode('utf-8')
+            # Reuse the buffer instead of growing it
+            buffer.seek(0)
+            buffer.truncate(0)
+            pending = 0
+    
+    if pending:
+        yield buffer.getvalue().encode('utf-8')
+
+def gzip_chunks(chunks, level=6):
+    """
+    Compress an iterable of byte chunks into a gzip stream.
+    
+    Args:
+        chunks (iterable): Iterable of bytes
+        level (int, optional): zlib compression level. Defaults to 6.
+        
+    Yields:
+        bytes: gzip-encoded data
+    """
+    # wbits=31 selects the gzip container format
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def stream_csv_response(rows, headers, filename, compress=False):
+    """
+    Create a streaming CSV download response.
+    
+    Rows are encoded and sent as they are produced, so memory use stays flat
+    regardless of the number of rows.
+    
+    Args:
+        rows (iterable): Iterable of rows, e.g. a server-side database cursor
+        headers (list): List of column header names
+        filename (str): Name for the downloaded file
+        compress (bool, optional): Send the body with Content-Encoding: gzip
+        
+    Returns:
+        flask.Response: Streaming response configured for CSV file download
+    """
+    body = iter_csv_chunks(rows, headers)
+    response_headers = {'Content-Disposition': f'attachment; filename="{filename}"'}
+    
+    if compress:
+        body = gzip_chunks(body)
+        response_headers['Content-Encoding'] = 'gzip'
+        response_headers['Vary'] = 'Accept-Encoding'
+    
+    return Response(
+        stream_with_context(body),
         mimetype='text/csv',
-        as_attachment=True,
-        download_name=filename
+        headers=response_headers
     )
 
 # ============================================================================